@@ -0,0 +1 @@
+"""Scripted performance scenarios for the headless World (see benchmarks/run.py)."""
@@ -0,0 +1,95 @@
+"""Memory and attribute-access benchmark for the game_core entity classes.
+
+Each class is measured as shipped (__slots__) and as a dict-backed clone
+(same methods, no __slots__), so the saving is visible on any machine:
+
+    python -m benchmarks.entities --count 20000 --out entities.json
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+from simulation import init_headless
+
+
+def dict_backed(cls):
+    """Copy of cls without __slots__ (instances get a regular __dict__)."""
+    ns = {k: v for k, v in cls.__dict__.items() if k not in ('__slots__', '__dict__', '__weakref__')
+          and k not in getattr(cls, '__slots__', ())}
+    return type(cls.__name__ + 'Dict', cls.__bases__, ns)
+
+
+def _factories():
+    from game_core import Bullet, Crate, Grenade, Particle, Soldier
+    rng = random.Random(0)
+    return {
+        'Soldier': (Soldier, lambda c: c(100.0, 200.0, (255, 0, 0), 'rifle', name='Bench', rng=rng)),
+        'Bullet': (Bullet, lambda c: c(10.0, 10.0, 300.0, 200.0, (255, 0, 0))),
+        'Grenade': (Grenade, lambda c: c(10.0, 10.0, 300.0, 200.0)),
+        'Particle': (Particle, lambda c: c(10.0, 10.0, 1.0, -1.0, 12, (255, 200, 100))),
+        'Crate': (Crate, lambda c: c(10.0, 10.0, 'heal')),
+    }
+
+
+def bytes_per_instance(cls, make, count):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [make(cls) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # the list holding them is not part of the entity cost
+    per = (after - before - sys.getsizeof(objs)) / count
+    del objs
+    return per
+
+
+def attr_ns(obj, rounds):
+    """ns per attribute read and per read-modify-write of obj.x / obj.y."""
+    clock = time.perf_counter
+    t0 = clock()
+    for _ in range(rounds):
+        obj.x; obj.y; obj.x; obj.y; obj.x; obj.y; obj.x; obj.y; obj.x; obj.y
+    t1 = clock()
+    for _ in range(rounds):
+        obj.x += 1.0; obj.y -= 1.0; obj.x -= 1.0; obj.y += 1.0; obj.x += 0.0
+    t2 = clock()
+    return (t1 - t0) / (rounds * 10) * 1e9, (t2 - t1) / (rounds * 5) * 1e9
+
+
+def run(count, rounds):
+    results = {}
+    for name, (cls, make) in _factories().items():
+        row = {}
+        for variant, c in (('slots', cls), ('dict', dict_backed(cls))):
+            read, write = attr_ns(make(c), rounds)
+            row[variant] = {'bytes_per_instance': bytes_per_instance(c, make, count), 'read_ns': read, 'write_ns': write}
+        row['saving_percent'] = (1.0 - row['slots']['bytes_per_instance'] / row['dict']['bytes_per_instance']) * 100.0
+        results[name] = row
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Bytes per instance and attribute access time of entity classes.')
+    ap.add_argument('--count', type=int, default=20000, help='instances allocated per class')
+    ap.add_argument('--rounds', type=int, default=200000, help='attribute access loop iterations')
+    ap.add_argument('--out', default=None, help='write JSON results here')
+    args = ap.parse_args(argv)
+
+    init_headless()
+    results = run(args.count, args.rounds)
+    for name, row in results.items():
+        s, d = row['slots'], row['dict']
+        print(f"{name:<9} {s['bytes_per_instance']:7.0f} B (dict {d['bytes_per_instance']:7.0f} B, -{row['saving_percent']:4.1f}%)  "
+              f"read {s['read_ns']:5.1f} ns (dict {d['read_ns']:5.1f})  write {s['write_ns']:5.1f} ns (dict {d['write_ns']:5.1f})")
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
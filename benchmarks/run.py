@@ -0,0 +1,141 @@
+"""Run the benchmark scenarios and report ms/frame per simulation phase.
+
+    python -m benchmarks.run --frames 600 --out bench.json
+    python -m benchmarks.run --compare bench.json      # exit 1 on regressions
+
+Each scenario also reports over_budget, the share of frames slower than
+World.frame_budget_ms. The 'battle' scenario is the standing stress
+workload: battle mode's default 200v200 role mix.
+
+Phases come from World.timings (player, ai, projectiles, separation,
+bullet_hits, explosions, other; ai_think is the part of ai spent in the
+decide/apply phase that picks each thinking soldier's target, crate, cover
+and patient); 'draw' is main.draw_world onto an offscreen surface.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from simulation import init_headless
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+def run_scenario(factory, frames, warmup=30, draw=True):
+    import pygame
+    from main import draw_world
+    world, per_frame = factory()
+    surface = pygame.Surface((world.width, world.height)) if draw else None
+    fonts = {'_default_font': pygame.font.SysFont(None, 20), '_small_font': pygame.font.SysFont(None, 18),
+             '_ammo_font': pygame.font.SysFont(None, 22), '_title_font': pygame.font.SysFont(None, 64)}
+    clock = time.perf_counter
+    totals = {}
+    counts = {'soldiers': 0, 'bullets': 0, 'particles': 0}
+    over = 0
+    for i in range(warmup + frames):
+        measuring = i >= warmup
+        if per_frame is not None:
+            per_frame(world)
+        world.timings = {} if measuring else None
+        t0 = clock()
+        world.step(1.0)
+        t1 = clock()
+        if surface is not None:
+            draw_world(surface, world, fonts)
+        t2 = clock()
+        if not measuring:
+            continue
+        for k, v in world.timings.items():
+            totals[k] = totals.get(k, 0.0) + v
+        totals['step'] = totals.get('step', 0.0) + (t1 - t0)
+        if (t2 - t0) * 1000.0 > world.frame_budget_ms:
+            over += 1
+        if surface is not None:
+            totals['draw'] = totals.get('draw', 0.0) + (t2 - t1)
+        counts['soldiers'] += len(world.soldiers)
+        counts['bullets'] += len(world.bullets)
+        counts['particles'] += len(world.particles)
+    world.timings = None
+    ms = {k: v * 1000.0 / frames for k, v in totals.items()}
+    ms['total'] = ms.get('step', 0.0) + ms.get('draw', 0.0)
+    return {
+        'frames': frames,
+        'ms_per_frame': dict(sorted(ms.items())),
+        'avg_counts': {k: v / frames for k, v in counts.items()},
+        # share of frames (step + draw) slower than the World's frame budget
+        'frame_budget_ms': world.frame_budget_ms,
+        'over_budget': over / frames,
+        # one-off cost of the map's visibility table (built in World.start)
+        'vis_build_ms': world.visibility().build_ms,
+    }
+
+
+def compare(old, new, threshold):
+    """Print per-phase deltas; return the list of regressions above threshold percent."""
+    regressions = []
+    for name, res in new['scenarios'].items():
+        base = old.get('scenarios', {}).get(name)
+        if not base:
+            continue
+        print(f"{name}:")
+        for phase, ms in res['ms_per_frame'].items():
+            before = base['ms_per_frame'].get(phase)
+            if before is None:
+                continue
+            delta = (ms - before) / before * 100.0 if before > 0 else 0.0
+            flag = ''
+            # ignore sub-0.05 ms phases; their noise dwarfs any real change
+            if delta > threshold and ms - before > 0.05:
+                flag = '  REGRESSION'
+                regressions.append((name, phase, before, ms))
+            print(f"  {phase:<12} {before:8.3f} -> {ms:8.3f} ms  ({delta:+6.1f}%){flag}")
+    return regressions
+
+
+def main(argv=None):
+    from benchmarks.scenarios import SCENARIOS
+    ap = argparse.ArgumentParser(description='Per-phase frame timings for scripted scenarios.')
+    ap.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help='run only these (repeatable)')
+    ap.add_argument('--frames', type=int, default=300)
+    ap.add_argument('--warmup', type=int, default=30)
+    ap.add_argument('--no-draw', action='store_true', help='skip the draw phase')
+    ap.add_argument('--out', default=None, help='write JSON results here (default: stdout)')
+    ap.add_argument('--compare', default=None, help='baseline JSON to diff against')
+    ap.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent')
+    args = ap.parse_args(argv)
+
+    init_headless()
+    results = {
+        'meta': {'commit': _git_rev(), 'python': platform.python_version(), 'platform': platform.platform(),
+                 'frames': args.frames},
+        'scenarios': {},
+    }
+    for name in (args.scenario or list(SCENARIOS)):
+        res = run_scenario(SCENARIOS[name], args.frames, args.warmup, draw=not args.no_draw)
+        results['scenarios'][name] = res
+        print(f"{name:<16} {res['ms_per_frame']['total']:8.3f} ms/frame  {res['over_budget'] * 100:5.1f}% over "
+              f"{res['frame_budget_ms']:.1f} ms", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text)
+    elif not args.compare:
+        print(text)
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+        if compare(old, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark scenarios.
+
+Each scenario builds a seeded World and may top up a workload every frame
+(e.g. keep 200 bullets in flight) so the measured frames stay comparable
+between runs and commits.
+"""
+from helpers import make_roguelike_covers
+from simulation import World, RED, BLUE
+
+WIDTH, HEIGHT = 1280, 720
+
+
+def _world(seed, team_size=5, think_hz=None, mode='simulation'):
+    world = World(WIDTH, HEIGHT, seed=seed, verbose=False, think_hz=think_hz)
+    world.team_size = team_size
+    world.start(mode)
+    return world
+
+
+def _top_up_bullets(world, n):
+    rng = world.rng
+    i = 0
+    while len(world.bullets) < n:
+        color = RED if i % 2 == 0 else BLUE
+        x = rng.uniform(60, 200) if color == RED else rng.uniform(WIDTH - 200, WIDTH - 60)
+        y = rng.uniform(40, HEIGHT - 40)
+        world.bullets.spawn(x, y, WIDTH - x, rng.uniform(40, HEIGHT - 40), color, damage=0)
+        i += 1
+
+
+def _top_up_particles(world, n):
+    rng = world.fx_rng
+    while len(world.particles) < n:
+        world.particles.emit(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT), rng.uniform(-2, 2), rng.uniform(-2, 2),
+                             rng.randint(20, 60), (255, 200, 100))
+
+
+def default_5v5():
+    return _world(1), None
+
+
+def battle_50v50():
+    return _world(2, team_size=50), None
+
+
+def battle_100v100():
+    return _world(7, team_size=100), None
+
+
+def battle_100v100_think15():
+    # same battle with AI decisions at 15 Hz (staggered) instead of every tick
+    return _world(7, team_size=100, think_hz=15), None
+
+
+def battle_mode():
+    # the menu's Battle mode: BATTLE_TEAM_SIZE per side with the default role mix
+    return _world(8, mode='battle'), None
+
+
+def bullets_200():
+    world = _world(3)
+    return world, lambda w: _top_up_bullets(w, 200)
+
+
+def particles_1200():
+    world = _world(4)
+    return world, lambda w: _top_up_particles(w, 1200)
+
+
+def particles_20000():
+    world = _world(6)
+    return world, lambda w: _top_up_particles(w, 20000)
+
+
+def covers_40():
+    world = _world(5)
+    covers = make_roguelike_covers(WIDTH, HEIGHT, cell=96, fill_prob=0.65, rng=world.rng)
+    world.covers = covers[:40]
+    return world, None
+
+
+# name -> factory returning (world, per_frame callback or None)
+SCENARIOS = {
+    '5v5': default_5v5,
+    '50v50': battle_50v50,
+    '100v100': battle_100v100,
+    '100v100_think15': battle_100v100_think15,
+    'battle': battle_mode,
+    'bullets_200': bullets_200,
+    'particles_1200': particles_1200,
+    'particles_20000': particles_20000,
+    'covers_40': covers_40,
+}
@@ -39,17 +39,18 @@ import random
 from game_core import Soldier
 
 
-def spawn_pawn(mx, my, color, role, team_list, sprite=None, weapon_img=None, weapon_key=None):
+def spawn_pawn(mx, my, color, role, team_list, sprite=None, weapon_img=None, weapon_key=None, rng=None):
     """Spawn a pawn at (mx,my) with given properties and append to team_list.
     Returns the created Soldier.
     """
-    s = Soldier(mx, my, color, role=role)
+    s = Soldier(mx, my, color, role=role, rng=rng)
     if sprite is not None:
         s.sprite = sprite
     if weapon_img is not None:
         s.weapon_img = weapon_img
     if weapon_key is not None:
         s.weapon_key = weapon_key
+    s.prepare_sprites()
     team_list.append(s)
     return s
 
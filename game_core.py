@@ -2,6 +2,9 @@ import pygame
 import random
 import math
 
+from los import segment_blocked
+from sprite_cache import sprite_cache
+
 # small helper so modules inside game_core can play sounds using available mixer channels
 def play_sound_local(snd):
     try:
@@ -26,7 +29,7 @@ def set_screen_size(w: int, h: int) -> None:
     SCREEN_W, SCREEN_H = int(w), int(h)
 
 
-# FRAME_SCALE: 1.0 ~= 60 FPS. Main loop should call set_frame_scale(dt_ms / (1000/60))
+# FRAME_SCALE: 1.0 ~= one 60 FPS frame. World.step() sets it per logic step (main runs a fixed 60 Hz step)
 FRAME_SCALE = 1.0
 
 
@@ -37,6 +40,12 @@ def set_frame_scale(scale: float) -> None:
     except Exception:
         FRAME_SCALE = 1.0
 
+# grenade damage radius (px)
+GRENADE_BLAST_RADIUS = 80
+
+# blocked soldiers farther than this (px) from their enemy follow the enemy team's flow field
+FLOW_FAR = 160
+
 # Default reload/fire cadence for all soldiers (frames)
 DEFAULT_RELOAD_TIME = 45
 
@@ -45,32 +54,24 @@ def clamp(v, a, b):
     return max(a, min(b, v))
 
 
+# pawn labels (name, ammo, side, speech) share one Font per size instead of a SysFont per draw
+_LABEL_FONTS = {}
+
+
+def _label_font(size):
+    font = _LABEL_FONTS.get(size)
+    if font is None:
+        font = _LABEL_FONTS[size] = pygame.font.SysFont(None, size)
+    return font
+
+
 def _line_blocked_by_covers(x1, y1, x2, y2, covers):
     # return True if any cover rect intersects the segment (x1,y1)-(x2,y2)
-    # Use a conservative sampling approach (step along the line) to avoid
-    # corner-case misses from integer clipping and thin intersections.
+    # exact slab test against each cover box (see los.py)
     try:
-        if not covers:
-            return False
-        dx = x2 - x1; dy = y2 - y1
-        dist = math.hypot(dx, dy) or 1.0
-        # sample roughly every 4 pixels along the segment
-        step = max(1, int(dist // 4))
-        steps = max(1, int(dist / step))
-        for i in range(steps + 1):
-            t = i / float(steps)
-            sx = x1 + dx * t
-            sy = y1 + dy * t
-            for c in covers:
-                if c.rect.collidepoint(sx, sy):
-                    return True
-        # final fallback: also try clipline as a quick check
-        for c in covers:
-            if c.rect.clipline((int(x1), int(y1), int(x2), int(y2))):
-                return True
+        return segment_blocked(x1, y1, x2, y2, covers)
     except Exception:
-        pass
-    return False
+        return False
 
 # Small pool of bot names
 BOT_NAMES = [
@@ -78,9 +79,9 @@ BOT_NAMES = [
     'Drift','Sable','Onyx','Jinx','Kite','Frost','Atlas','Crimson','Byte','Volt'
 ]
 
-def random_bot_name():
+def random_bot_name(rng=None):
     try:
-        return random.choice(BOT_NAMES)
+        return (rng or random).choice(BOT_NAMES)
     except Exception:
         return 'Bot'
 
@@ -94,6 +95,8 @@ class Cover:
 
 
 class Crate:
+    __slots__ = ('x', 'y', 'kind', 'radius', 'timer')
+
     def __init__(self, x, y, kind: str = 'heal'):
         self.x = float(x)
         self.y = float(y)
@@ -107,6 +110,8 @@ class Crate:
 
 
 class Particle:
+    __slots__ = ('x', 'y', 'vx', 'vy', 'life', 'color', 'radius')
+
     def __init__(self, x, y, vx, vy, life, color, radius=2):
         self.x = float(x)
         self.y = float(y)
@@ -130,9 +135,14 @@ class Particle:
 
 
 class Grenade:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'timer', 'radius', 'bounce', 'owner')
+
     def __init__(self, x, y, tx, ty, owner=None):
         self.x = float(x)
         self.y = float(y)
+        # position before the last logic step (render interpolation)
+        self.prev_x = self.x
+        self.prev_y = self.y
         dx = float(tx) - self.x
         dy = float(ty) - self.y
         dist = math.hypot(dx, dy) or 1.0
@@ -159,7 +169,7 @@ class Grenade:
     def explode(self, soldiers, particles):
         # grey shrapnel particle effect removed (visuals are handled centrally in main.spawn_explosion)
         for s in soldiers:
-            if math.hypot(self.x - s.x, self.y - s.y) < 80:
+            if math.hypot(self.x - s.x, self.y - s.y) < GRENADE_BLAST_RADIUS:
                 # attribute owner (if present) for kill feed
                 try:
                     if getattr(self, 'owner', None) is not None:
@@ -176,9 +186,14 @@ class Grenade:
 
 
 class Bullet:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'vx', 'vy', 'color', 'radius', 'damage', 'owner')
+
     def __init__(self, x, y, tx, ty, color, damage=10, owner=None):
         self.x = float(x)
         self.y = float(y)
+        # position before the last logic step (render interpolation)
+        self.prev_x = self.x
+        self.prev_y = self.y
         dx = float(tx) - self.x
         dy = float(ty) - self.y
         dist = math.hypot(dx, dy) or 1.0
@@ -198,13 +213,38 @@ class Bullet:
 
 
 class Soldier:
-    def __init__(self, x, y, color, role='rifle', name=None):
+    # every field is declared here; setting an undeclared attribute raises AttributeError
+    __slots__ = (
+        'x', 'y', 'prev_x', 'prev_y', 'color', 'role', 'rng', 'name', 'radius',
+        'max_hp', 'hp', 'speed', 'damage', 'range', 'shield',
+        # firing / ammo
+        'reload_counter', 'reload_time', 'reload_time_base', 'mag_capacity', 'mag', 'reserve',
+        'reloading', 'reload_time_frames', 'reload_timer', 'recoil_timer', '_debug_fire_cooldown',
+        # movement / AI state
+        'temporary_retreat_frames', 'temporary_retreat_target', 'retreating',
+        'dodge_cooldown_frames', 'dodge_timer', 'melee_cooldown_frames', 'melee_timer', 'melee_damage',
+        '_last_pos_check_x', '_last_pos_check_y', '_stuck_frames',
+        # decisions cached by think() between think ticks
+        'ai_target', 'ai_crate', 'ai_cover', 'ai_patient', 'think_slot',
+        # presentation
+        'weapon_length', 'face_expression', 'speech_timer', 'speech_text', 'facing_right',
+        'sprite', 'weapon_img', 'weapon_key', 'weapon_sound',
+        # match state assigned by make_team / the World
+        'side', 'controlled', 'carrying_bomb', 'last_attacker',
+    )
+
+    def __init__(self, x, y, color, role='rifle', name=None, rng=None):
         self.x = float(x)
         self.y = float(y)
+        # position before the last logic step (render interpolation)
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.color = color
         self.role = role
+        # per-match random.Random from the World (global random module when None)
+        self.rng = rng or random
         # assign a readable name for kill notifications and debug
-        self.name = name if name else random_bot_name()
+        self.name = name if name else random_bot_name(self.rng)
         # slightly larger pawns for better visibility
         self.radius = 17
         self.max_hp = 100
@@ -212,7 +252,7 @@ class Soldier:
         self.speed = 1.5
         # firing cooldown (frames) and counter
         # start with a randomized counter so not all pawns fire at the same time
-        self.reload_counter = random.uniform(0.0, DEFAULT_RELOAD_TIME)
+        self.reload_counter = self.rng.uniform(0.0, DEFAULT_RELOAD_TIME)
         # temporary retreat when too close to an enemy
         self.temporary_retreat_frames = 0
         self.temporary_retreat_target = None
@@ -244,10 +284,22 @@ class Soldier:
         self._debug_fire_cooldown = 0.0
         # bomb carrying flag (used by bomb game mode)
         self.carrying_bomb = False
+        # assigned after construction by make_team / spawn_pawn / the World
+        self.side = None
+        self.sprite = None
+        self.weapon_img = None
+        self.weapon_key = None
+        self.weapon_sound = None
+        self.last_attacker = None
         # simple stuck detection: remember recent positions
         self._last_pos_check_x = self.x
         self._last_pos_check_y = self.y
         self._stuck_frames = 0
+        self.ai_target = None
+        self.ai_crate = None
+        self.ai_cover = None
+        self.ai_patient = None
+        self.think_slot = None
 
         # role based tuning (unified reload/fire rate)
         self.reload_time = DEFAULT_RELOAD_TIME
@@ -280,17 +332,20 @@ class Soldier:
             self.reload_time_base = float(DEFAULT_RELOAD_TIME)
         # initialize reload counter based on the finalized base so AI are staggered
         try:
-            self.reload_counter = random.uniform(0.0, max(1.0, self.reload_time_base))
+            self.reload_counter = self.rng.uniform(0.0, max(1.0, self.reload_time_base))
         except Exception:
-            self.reload_counter = random.uniform(0.0, DEFAULT_RELOAD_TIME)
+            self.reload_counter = self.rng.uniform(0.0, DEFAULT_RELOAD_TIME)
 
     def in_cover(self, covers):
+        contains = getattr(covers, 'contains', None)
+        if contains is not None:
+            return contains(self.x, self.y)
         for c in covers:
             if c.rect.collidepoint(self.x, self.y):
                 return True
         return False
 
-    def move_towards(self, target, covers):
+    def move_towards(self, target, covers, nav=None):
         # move toward target but avoid entering cover rectangles
         dx = target.x - self.x
         dy = target.y - self.y
@@ -301,7 +356,8 @@ class Soldier:
             # prefer full step if not blocked
             if not self.blocked_by_covers(step_x, step_y, covers):
                 self.x = step_x; self.y = step_y
-            else:
+            # blocked: follow the nav grid route around the cover when there is one
+            elif nav is None or not self._follow_route(target, covers, nav):
                 # try smaller steps and axis-aligned moves to slide along obstacles
                 tried = False
                 for factor in (0.6, 0.4, 0.2):
@@ -320,9 +376,34 @@ class Soldier:
                             self.y = sy
         self.stay_in_bounds()
 
+    def _follow_route(self, target, covers, nav):
+        # step toward the next cell of a route to target; True if we moved. Shared objectives
+        # (the dropped bomb, far-away enemies -> their team's centroid) read the World's flow
+        # fields, anything else gets its own cached A* route
+        router = nav
+        flows = getattr(nav, 'flows', None)
+        if flows is not None:
+            name = getattr(target, 'flow', None)
+            if name is None and getattr(target, 'color', None) is not None \
+                    and math.hypot(target.x - self.x, target.y - self.y) > FLOW_FAR:
+                name = 'red' if target.color == (255, 0, 0) else 'blue'
+            field = flows.get(name) if name else None
+            if field is not None:
+                router = field
+        wp = router.waypoint(self.x, self.y, target.x, target.y)
+        if wp is None:
+            return False
+        dx = wp[0] - self.x; dy = wp[1] - self.y
+        d = math.hypot(dx, dy) or 1.0
+        step = min(d, self.speed * FRAME_SCALE)
+        return self.try_move_to(self.x + dx / d * step, self.y + dy / d * step, covers)
+
     def blocked_by_covers(self, x, y, covers):
         # returns True if the point (x,y) would be inside any cover rect
         try:
+            contains = getattr(covers, 'contains', None)
+            if contains is not None:
+                return contains(x, y)
             for c in covers:
                 if c.rect.collidepoint(x, y):
                     return True
@@ -349,9 +430,17 @@ class Soldier:
             self.dodge_timer -= FRAME_SCALE
             self.dodge_timer = max(0.0, self.dodge_timer)
             return
-        for b in bullets:
-            dx = b.x - self.x
-            dy = b.y - self.y
+        # only bullets flying toward us; BulletPool answers from its per-tick threat index,
+        # plain lists are scanned
+        first_threat = getattr(bullets, 'first_threat', None)
+        if first_threat is not None:
+            found = first_threat(self.x, self.y, 40)
+            near = [found] if found is not None else []
+        else:
+            near = [(b.x, b.y) for b in bullets if (self.x - b.x) * b.vx + (self.y - b.y) * b.vy > 0]
+        for bx, by in near:
+            dx = bx - self.x
+            dy = by - self.y
             dist = math.hypot(dx, dy) or 1.0
             # reduced detection radius
             if dist < 40:
@@ -370,10 +459,40 @@ class Soldier:
         self.x = clamp(self.x, self.radius, SCREEN_W - self.radius)
         self.y = clamp(self.y, self.radius, SCREEN_H - self.radius)
 
-    def update(self, enemies, bullets, grenades, covers, crates, allies, sounds, bomb=None):
+    def has_los(self, target, covers, los=None):
+        # shared LOS engine (per-tick pair cache) when the World provides one
+        if los is not None:
+            return los.clear(self, target)
+        return not _line_blocked_by_covers(self.x, self.y, target.x, target.y, covers)
+
+    def think(self, enemies, crates, covers, allies):
+        # the expensive decisions (scans over enemies, crates, covers and allies); the World
+        # may run this less often than update(), which acts on the cached choices every tick
+        self.ai_target = min(enemies, key=lambda e: math.hypot(e.x - self.x, e.y - self.y)) if enemies else None
+        self.ai_crate = min(crates, key=lambda c: math.hypot(c.x - self.x, c.y - self.y)) if crates else None
+        self.ai_cover = None
+        if covers:
+            try:
+                self.ai_cover = min(covers, key=lambda c: math.hypot(c.rect.centerx - self.x, c.rect.centery - self.y))
+            except Exception:
+                pass
+        self.ai_patient = None
+        if self.role == 'medic' and allies:
+            damaged = [a for a in allies if a is not self and a.hp > 0 and a.hp <= a.max_hp - 10]
+            if damaged:
+                self.ai_patient = min(damaged, key=lambda a: math.hypot(a.x - self.x, a.y - self.y))
+
+    def think_due(self):
+        # re-think before the next scheduled think when the cached target is gone
+        return self.ai_target is None or self.ai_target.hp <= 0
+
+    def update(self, enemies, bullets, grenades, covers, crates, allies, sounds, bomb=None, los=None, nav=None, think=True):
         # Basic per-frame updates for soldiers with cover-aware movement
+        # think=False: act on the decisions of the last think() call
+        if think:
+            self.think(enemies, crates, covers, allies)
         # Retreat if alone occasionally
-        if allies is not None and len(allies) <= 1 and random.random() < 0.02:
+        if allies is not None and len(allies) <= 1 and self.rng.random() < 0.02:
             self.retreating = True
 
         if self.retreating:
@@ -383,29 +502,28 @@ class Soldier:
                 self.try_move_to(self.x + math.copysign(self.speed * 1.5 * FRAME_SCALE, dx), self.y, covers)
             self.stay_in_bounds()
             # cancel retreat if enemy nearby
-            if enemies:
-                nearest_enemy = min(enemies, key=lambda e: math.hypot(e.x - self.x, e.y - self.y))
+            nearest_enemy = self.ai_target
+            if enemies and nearest_enemy is not None:
                 if math.hypot(nearest_enemy.x - self.x, nearest_enemy.y - self.y) < 220:
                     self.retreating = False
 
         # dodge bullets (cover-aware)
         self.dodge_bullets(bullets, covers)
 
-        # find nearest enemy
-        target = None
-        if enemies:
-            target = min(enemies, key=lambda e: math.hypot(e.x - self.x, e.y - self.y))
+        # nearest enemy (as of the last think)
+        target = self.ai_target if enemies else None
+        if target is not None:
             try:
                 self.facing_right = (target.x > self.x)
             except Exception:
                 pass
 
         # seek crates
-        if crates:
+        nearest_crate = self.ai_crate
+        if crates and nearest_crate is not None and nearest_crate in crates:
             try:
-                nearest_crate = min(crates, key=lambda c: math.hypot(c.x - self.x, c.y - self.y))
                 if math.hypot(nearest_crate.x - self.x, nearest_crate.y - self.y) < (140 * FRAME_SCALE):
-                    self.move_towards(nearest_crate, covers)
+                    self.move_towards(nearest_crate, covers, nav)
             except Exception:
                 pass
 
@@ -428,10 +546,10 @@ class Soldier:
                     cand_y = self.y + (dy / d) * (self.speed * FRAME_SCALE)
                     self.try_move_to(cand_x, cand_y, covers)
                 else:
-                    self.move_towards(target, covers)
+                    self.move_towards(target, covers, nav)
             else:
                 if dist_to_target > (desired + 20):
-                    self.move_towards(target, covers)
+                    self.move_towards(target, covers, nav)
                 elif dist_to_target < max(12, (desired * 0.5)) and self.role != 'heavy' and not getattr(self,'controlled',False):
                     # create distance: set temporary retreat target
                     dx = self.x - target.x; dy = self.y - target.y
@@ -443,9 +561,9 @@ class Soldier:
                     self.temporary_retreat_frames = int(30 * FRAME_SCALE) if FRAME_SCALE>0 else 30
                     self.try_move_to(self.x + (dx / dd) * (self.speed * 1.5 * FRAME_SCALE), self.y + (dy / dd) * (self.speed * 1.5 * FRAME_SCALE), covers)
                 # if reloading, seek cover while reloading
-                if self.reloading and covers:
+                if self.reloading and covers and self.ai_cover is not None:
                     try:
-                        nearest_cover = min(covers, key=lambda c: math.hypot(c.rect.centerx - self.x, c.rect.centery - self.y))
+                        nearest_cover = self.ai_cover
                         dx = nearest_cover.rect.centerx - self.x; dy = nearest_cover.rect.centery - self.y
                         d = math.hypot(dx, dy) or 1.0
                         self.try_move_to(self.x + (dx / d) * (self.speed * FRAME_SCALE), self.y + (dy / d) * (self.speed * FRAME_SCALE), covers)
@@ -467,10 +585,9 @@ class Soldier:
 
         # medic heals
         if self.role == 'medic' and self.reload_counter >= self.reload_time:
-            if allies:
-                damaged = [a for a in allies if a is not self and a.hp > 0 and a.hp <= a.max_hp - 10]
-                if damaged:
-                    ally = min(damaged, key=lambda a: math.hypot(a.x - self.x, a.y - self.y))
+            ally = self.ai_patient
+            if allies and ally is not None:
+                if ally.hp > 0 and ally.hp <= ally.max_hp - 10:
                     if math.hypot(ally.x - self.x, ally.y - self.y) < 100:
                         ally.hp = min(ally.max_hp, ally.hp + 25)
                         self.face_expression = 'shooting'
@@ -484,10 +601,10 @@ class Soldier:
                         self.reloading = True; self.reload_timer = self.reload_time_frames
                 else:
                     did_fire = False
-                    if self.role == 'grenadier' and random.random() < 0.25:
+                    if self.role == 'grenadier' and self.rng.random() < 0.25:
                         if self.mag > 0:
                             # do not lob grenades through solid cover
-                            if not _line_blocked_by_covers(self.x, self.y, target.x, target.y, covers):
+                            if self.has_los(target, covers, los):
                                 # ensure grenade spawn point isn't inside a cover
                                 if not self.blocked_by_covers(self.x, self.y, covers):
                                     grenades.append(Grenade(self.x, self.y, target.x, target.y, owner=self))
@@ -496,7 +613,7 @@ class Soldier:
                                     self.try_move_to(self.x + (self.speed * FRAME_SCALE), self.y, covers)
                             else:
                                 # try a minor lateral sidestep to get LOS
-                                self.try_move_to(self.x + (self.speed * FRAME_SCALE) * (1 if random.random()<0.5 else -1), self.y, covers)
+                                self.try_move_to(self.x + (self.speed * FRAME_SCALE) * (1 if self.rng.random()<0.5 else -1), self.y, covers)
                             if sounds and sounds.get('grenade'):
                                 try: play_sound_local(sounds['grenade'])
                                 except Exception: pass
@@ -505,9 +622,9 @@ class Soldier:
                             if self.reserve > 0 and not self.reloading:
                                 self.reloading = True; self.reload_timer = self.reload_time_frames
                                 self.speech_text = 'RELOADING'; self.speech_timer = 60; self.retreating = True
-                                if covers:
+                                if covers and self.ai_cover is not None:
                                     try:
-                                        nc = min(covers, key=lambda c: math.hypot(c.rect.centerx - self.x, c.rect.centery - self.y))
+                                        nc = self.ai_cover
                                         dx = nc.rect.centerx - self.x; dy = nc.rect.centery - self.y
                                         d = math.hypot(dx, dy) or 1.0
                                         self.try_move_to(self.x + (dx / d) * (self.speed * FRAME_SCALE), self.y + (dy / d) * (self.speed * FRAME_SCALE), covers)
@@ -515,7 +632,7 @@ class Soldier:
                     else:
                         if self.mag > 0:
                             # do not shoot through cover; require line-of-sight
-                            if not _line_blocked_by_covers(self.x, self.y, target.x, target.y, covers):
+                            if self.has_los(target, covers, los):
                                 bdx = self.weapon_length if self.color == (255,0,0) else -self.weapon_length
                                 spawn_x = self.x + bdx
                                 spawn_y = self.y
@@ -537,10 +654,10 @@ class Soldier:
                                         pass
                                 else:
                                     # weapon muzzle would be inside cover; try a small sidestep
-                                    self.try_move_to(self.x + (self.speed * FRAME_SCALE) * (1 if random.random()<0.5 else -1), self.y, covers)
+                                    self.try_move_to(self.x + (self.speed * FRAME_SCALE) * (1 if self.rng.random()<0.5 else -1), self.y, covers)
                             else:
                                 # attempt small lateral sidestep to acquire LOS
-                                self.try_move_to(self.x + (self.speed * FRAME_SCALE) * (1 if random.random()<0.5 else -1), self.y, covers)
+                                self.try_move_to(self.x + (self.speed * FRAME_SCALE) * (1 if self.rng.random()<0.5 else -1), self.y, covers)
                                 try:
                                     if sounds is not None:
                                         s = None
@@ -558,9 +675,9 @@ class Soldier:
                             if self.reserve > 0 and not self.reloading:
                                 self.reloading = True; self.reload_timer = self.reload_time_frames
                                 self.speech_text = 'RELOADING'; self.speech_timer = 60; self.retreating = True
-                                if covers:
+                                if covers and self.ai_cover is not None:
                                     try:
-                                        nc = min(covers, key=lambda c: math.hypot(c.rect.centerx - self.x, c.rect.centery - self.y))
+                                        nc = self.ai_cover
                                         dx = nc.rect.centerx - self.x; dy = nc.rect.centery - self.y
                                         d = math.hypot(dx, dy) or 1.0
                                         self.try_move_to(self.x + (dx / d) * (self.speed * FRAME_SCALE), self.y + (dy / d) * (self.speed * FRAME_SCALE), covers)
@@ -571,7 +688,7 @@ class Soldier:
                         self.reload_counter = 0
                         # jitter reload_time between 85% and 135% of base
                         try:
-                            self.reload_time = max(2, int(self.reload_time_base * random.uniform(0.85, 1.35)))
+                            self.reload_time = max(2, int(self.reload_time_base * self.rng.uniform(0.85, 1.35)))
                         except Exception:
                             self.reload_time = self.reload_time_base
                         self.face_expression = 'shooting'; self.speech_text = 'Bang!'; self.speech_timer = 30; self.recoil_timer = 3
@@ -609,8 +726,8 @@ class Soldier:
             self._last_pos_check_x = self.x; self._last_pos_check_y = self.y
             if self._stuck_frames > max(20, int(10 * FRAME_SCALE)):
                 # apply a small random jitter to try to free the pawn
-                jitter_x = random.uniform(-8.0, 8.0)
-                jitter_y = random.uniform(-8.0, 8.0)
+                jitter_x = self.rng.uniform(-8.0, 8.0)
+                jitter_y = self.rng.uniform(-8.0, 8.0)
                 self.try_move_to(self.x + jitter_x, self.y + jitter_y, covers)
                 self._stuck_frames = 0
         except Exception:
@@ -636,7 +753,7 @@ class Soldier:
                     elif dist < 300:
                         # attempt to move toward bomb but avoid entering covers
                         try:
-                            self.move_towards(type('P', (), {'x': bx, 'y': by})(), covers)
+                            self.move_towards(type('P', (), {'x': bx, 'y': by, 'flow': 'bomb'})(), covers, nav)
                         except Exception:
                             pass
         except Exception:
@@ -644,80 +761,90 @@ class Soldier:
 
     def avoid_covers(self, covers):
         # if soldier is inside any cover rect, move them to the nearest exterior edge
+        point_cover = getattr(covers, 'point_cover', None)
+        if point_cover is not None:
+            # same covers, same order as the scan below; re-queried after each push
+            i = point_cover(self.x, self.y)
+            while i is not None:
+                self._push_out_of(covers[i])
+                i = point_cover(self.x, self.y, i + 1)
+            return
         for c in covers:
             if c.rect.collidepoint(self.x, self.y):
-                left = c.rect.left - self.radius
-                right = c.rect.right + self.radius
-                top = c.rect.top - self.radius
-                bottom = c.rect.bottom + self.radius
-                # compute distances to each candidate exterior x/y
-                dx_left = abs(self.x - left)
-                dx_right = abs(self.x - right)
-                dy_top = abs(self.y - top)
-                dy_bottom = abs(self.y - bottom)
-                # choose smallest movement axis
-                min_dx = min(dx_left, dx_right)
-                min_dy = min(dy_top, dy_bottom)
-                if min_dx < min_dy:
-                    # push horizontally
-                    self.x = left if dx_left < dx_right else right
-                else:
-                    # push vertically
-                    self.y = top if dy_top < dy_bottom else bottom
-                # ensure still in bounds
-                self.stay_in_bounds()
+                self._push_out_of(c)
+
+    def _push_out_of(self, c):
+        # move out through the nearest edge of cover c (plus radius)
+        left = c.rect.left - self.radius
+        right = c.rect.right + self.radius
+        top = c.rect.top - self.radius
+        bottom = c.rect.bottom + self.radius
+        # compute distances to each candidate exterior x/y
+        dx_left = abs(self.x - left)
+        dx_right = abs(self.x - right)
+        dy_top = abs(self.y - top)
+        dy_bottom = abs(self.y - bottom)
+        # choose smallest movement axis
+        min_dx = min(dx_left, dx_right)
+        min_dy = min(dy_top, dy_bottom)
+        if min_dx < min_dy:
+            # push horizontally
+            self.x = left if dx_left < dx_right else right
+        else:
+            # push vertically
+            self.y = top if dy_top < dy_bottom else bottom
+        # ensure still in bounds
+        self.stay_in_bounds()
+
+    def _body_size(self, img):
+        # body sprite height follows the radius; width keeps the image's aspect ratio
+        size = max(12, int(self.radius * 2 + 8))
+        try:
+            orig_w, orig_h = img.get_size()
+            return int(orig_w / orig_h * size), size
+        except Exception:
+            return size, size
+
+    def _weapon_size(self):
+        return max(8, int(self.radius * 2)), max(6, int(self.radius))
+
+    def prepare_sprites(self):
+        """Render the scaled (and mirrored) body and weapon images into the sprite cache
+        so draw() only blits. Call again after changing sprite, weapon_img or radius."""
+        img = getattr(self, 'sprite', None)
+        wimg = getattr(self, 'weapon_img', None)
+        for flip in (False, True):
+            if img:
+                sprite_cache.sized(img, *self._body_size(img), flip=flip)
+            if wimg:
+                sprite_cache.sized(wimg, *self._weapon_size(), flip=flip)
+
+    def _draw_weapon(self, screen, wimg, sx, sy):
+        facing_right = getattr(self, 'facing_right', True)
+        wdraw = sprite_cache.sized(wimg, *self._weapon_size(), flip=not facing_right)
+        recoil_off = -1 if self.recoil_timer > 0 else 0
+        wx = sx + (int(self.weapon_length / 2) + recoil_off) if facing_right else sx - (int(self.weapon_length / 2) + recoil_off)
+        screen.blit(wdraw, wdraw.get_rect(center=(wx, sy)))
 
     def draw(self, screen):
         sx, sy = int(self.x), int(self.y)
         img = getattr(self, 'sprite', None)
+        wimg = getattr(self, 'weapon_img', None)
         if img:
-            try:
-                orig_w, orig_h = img.get_size()
-                size = max(12, int(self.radius * 2 + 8))
-                scale_w = int(orig_w / orig_h * size)
-                scaled = pygame.transform.smoothscale(img, (scale_w, size))
-            except Exception:
-                scaled = pygame.transform.smoothscale(img, (size, size))
-            draw_img = scaled if getattr(self, 'facing_right', True) else pygame.transform.flip(scaled, True, False)
-            rect = draw_img.get_rect(center=(sx, sy))
-            screen.blit(draw_img, rect)
+            # scaled/mirrored copies come from the sprite cache (see prepare_sprites)
+            draw_img = sprite_cache.sized(img, *self._body_size(img), flip=not getattr(self, 'facing_right', True))
+            screen.blit(draw_img, draw_img.get_rect(center=(sx, sy)))
             # draw weapon image if available (on top of sprite)
-            wimg = getattr(self, 'weapon_img', None)
             if wimg:
-                try:
-                    ow, oh = wimg.get_size()
-                    tw = max(8, int(self.radius * 2))
-                    th = max(6, int(self.radius))
-                    wscaled = pygame.transform.smoothscale(wimg, (tw, th))
-                except Exception:
-                    wscaled = pygame.transform.smoothscale(wimg, (max(8, self.radius * 2), max(6, self.radius)))
-                wdraw = wscaled if getattr(self, 'facing_right', True) else pygame.transform.flip(wscaled, True, False)
-                recoil_off = -1 if self.recoil_timer > 0 else 0
-                wx = sx + (int(self.weapon_length / 2) + recoil_off) if getattr(self, 'facing_right', True) else sx - (int(self.weapon_length / 2) + recoil_off)
-                wy = sy
-                wrect = wdraw.get_rect(center=(wx, wy))
-                screen.blit(wdraw, wrect)
+                self._draw_weapon(screen, wimg, sx, sy)
         else:
             pygame.draw.circle(screen, self.color, (sx, sy), self.radius)
             recoil = -1 if self.recoil_timer > 0 else 0
             weapon_end_x = int(self.x + (self.weapon_length if self.color == (255, 0, 0) else -self.weapon_length) + recoil)
             pygame.draw.line(screen, (0, 0, 0), (sx, sy), (weapon_end_x, sy), 3)
             # if no sprite, still draw weapon image when available
-            wimg = getattr(self, 'weapon_img', None)
             if wimg:
-                try:
-                    ow, oh = wimg.get_size()
-                    tw = max(8, int(self.radius * 2))
-                    th = max(6, int(self.radius))
-                    wscaled = pygame.transform.smoothscale(wimg, (tw, th))
-                except Exception:
-                    wscaled = pygame.transform.smoothscale(wimg, (max(8, self.radius * 2), max(6, self.radius)))
-                wdraw = wscaled if getattr(self, 'facing_right', True) else pygame.transform.flip(wscaled, True, False)
-                recoil_off = -1 if self.recoil_timer > 0 else 0
-                wx = sx + (int(self.weapon_length / 2) + recoil_off) if getattr(self, 'facing_right', True) else sx - (int(self.weapon_length / 2) + recoil_off)
-                wy = sy
-                wrect = wdraw.get_rect(center=(wx, wy))
-                screen.blit(wdraw, wrect)
+                self._draw_weapon(screen, wimg, sx, sy)
 
         # health bar
         pygame.draw.rect(screen, (0, 0, 0), (sx - 10, sy - 15, 20, 4))
@@ -725,7 +852,7 @@ class Soldier:
 
         # ammo overlay
         try:
-            ammo_font = pygame.font.SysFont(None, 14)
+            ammo_font = _label_font(14)
             ammo_text = f"{self.mag}/{self.reserve}"
             ammo_s = ammo_font.render(ammo_text, True, (255, 255, 0))
             ammo_x = sx - ammo_s.get_width() // 2
@@ -737,7 +864,7 @@ class Soldier:
 
         # draw name above pawn (slightly above the sprite)
         try:
-            name_font = pygame.font.SysFont(None, 14)
+            name_font = _label_font(14)
             name_s = name_font.render(str(getattr(self, 'name', '')), True, (230,230,230))
             nx = sx - name_s.get_width() // 2
             ny = sy - 30
@@ -748,7 +875,7 @@ class Soldier:
         # draw speech text above the name so it's visually on top
         if self.speech_text:
             try:
-                font = pygame.font.SysFont(None, 16)
+                font = _label_font(16)
                 text_surf = font.render(self.speech_text, True, (255, 255, 255))
                 tx = sx - text_surf.get_width() // 2
                 ty = sy - 52
@@ -768,7 +895,7 @@ class Soldier:
         try:
             side = getattr(self, 'side', None)
             if side:
-                font = pygame.font.SysFont(None, 14)
+                font = _label_font(14)
                 side_text = 'CT' if side == 'CT' else 'T'
                 s_surf = font.render(side_text, True, (200,200,255) if side_text=='CT' else (200,100,100))
                 # place label to lower-left of the pawn
@@ -6,6 +6,10 @@ from typing import List, Tuple
 # Import game_core types only as needed to avoid heavy coupling
 from game_core import Soldier
 
+# size range of explosion image particles (main prewarms the sprite cache for it)
+IMAGE_PARTICLE_SCALE = (0.3, 1.2)
+
+
 def play_sound_obj(snd, sounds=None):
     """Play a pygame Sound on an available channel, with optional debug logging using `sounds` dict.
     snd: a pygame.mixer.Sound-like object
@@ -45,30 +49,33 @@ def play_sound_obj(snd, sounds=None):
             pass
 
 
-def spawn_explosion(x, y, explosion_frames: List, generic_images: List, explosion_anims: List, image_particles: List, magnitude=1.0):
+def spawn_explosion(x, y, explosion_frames: List, generic_images: List, explosion_anims: List, image_particles: List, magnitude=1.0, rng=None):
     """Spawn an explosion animation and image-particles using the provided resource lists.
     This is separated so main can maintain the resource lists while keeping logic here.
+    rng: optional random.Random owned by the match (defaults to the global random module)
     """
+    rng = rng or random
     if explosion_frames:
-        explosion_anims.append({'x': x + random.uniform(-4, 4), 'y': y + random.uniform(-4, 4), 'frame': 0, 'tick': 2.0})
+        explosion_anims.append({'x': x + rng.uniform(-4, 4), 'y': y + rng.uniform(-4, 4), 'frame': 0, 'tick': 2.0})
     if generic_images:
-        for _ in range(random.randint(8, 15)):
-            img = random.choice(generic_images)
+        for _ in range(rng.randint(8, 15)):
+            img = rng.choice(generic_images)
             ip = {
                 'img': img,
-                'x': x + random.uniform(-12 * magnitude, 12 * magnitude),
-                'y': y + random.uniform(-12 * magnitude, 12 * magnitude),
-                'vx': random.uniform(-3, 3),
-                'vy': random.uniform(-3, 3),
-                'life': random.randint(24, 90),
-                'rot': random.uniform(0, 360),
-                'rot_speed': random.uniform(-6, 6),
-                'scale': random.uniform(0.3, 1.2)
+                'x': x + rng.uniform(-12 * magnitude, 12 * magnitude),
+                'y': y + rng.uniform(-12 * magnitude, 12 * magnitude),
+                'vx': rng.uniform(-3, 3),
+                'vy': rng.uniform(-3, 3),
+                'life': rng.randint(24, 90),
+                'rot': rng.uniform(0, 360),
+                'rot_speed': rng.uniform(-6, 6),
+                'scale': rng.uniform(*IMAGE_PARTICLE_SCALE)
             }
             image_particles.append(ip)
 
 
-def make_roguelike_covers(w, h, cell=96, fill_prob=0.18):
+def make_roguelike_covers(w, h, cell=96, fill_prob=0.18, rng=None):
+    rng = rng or random
     cols = max(4, w // cell)
     rows = max(3, h // cell)
     covers = []
@@ -79,26 +86,46 @@ def make_roguelike_covers(w, h, cell=96, fill_prob=0.18):
             cy = int((r + 0.5) * (h / rows))
             if cx < 140 or cx > w - 140:
                 continue
-            if random.random() < fill_prob:
-                ww = random.randint(int(cell*0.5), int(cell*0.95))
-                hh = random.randint(int(cell*0.4), int(cell*0.9))
+            if rng.random() < fill_prob:
+                ww = rng.randint(int(cell*0.5), int(cell*0.95))
+                hh = rng.randint(int(cell*0.4), int(cell*0.9))
                 covers.append(Cover(cx - ww//2, cy - hh//2, ww, hh))
     for _ in range(3):
-        ww = random.randint(80, 180); hh = random.randint(40, 140)
-        x = random.randint(160, max(160, w-200)); y = random.randint(60, max(60, h-120))
+        ww = rng.randint(80, 180); hh = rng.randint(40, 140)
+        x = rng.randint(160, max(160, w-200)); y = rng.randint(60, max(60, h-120))
         covers.append(Cover(x, y, ww, hh))
     return covers
 
 
-def make_team(xmin, xmax, color, n=5, side=None, sprite_red=None, sprite_green=None, weapon_ak=None, weapon_m4=None, sounds=None, screen_h=720):
+def role_mix(n, mix, rng=None):
+    """n roles in the proportions of mix ({role: weight}), shuffled.
+    Leftover slots go to the largest remainders (earlier roles first on ties)."""
+    rng = rng or random
+    total = float(sum(mix.values())) or 1.0
+    quotas = [(role, n * w / total) for role, w in mix.items()]
+    counts = {role: int(q) for role, q in quotas}
+    by_remainder = sorted(quotas, key=lambda rq: -(rq[1] - int(rq[1])))
+    for role, _ in by_remainder[:n - sum(counts.values())]:
+        counts[role] += 1
+    roles = [role for role in mix for _ in range(counts[role])]
+    rng.shuffle(roles)
+    return roles
+
+
+def make_team(xmin, xmax, color, n=5, side=None, sprite_red=None, sprite_green=None, weapon_ak=None, weapon_m4=None, sounds=None, screen_h=720, verbose=True, rng=None, roles=None):
     """Create a team of Soldier instances. This helper accepts the images and sounds the caller uses.
     Returns a list of Soldier objects.
+    rng: optional random.Random owned by the match; also handed to each Soldier
+    roles: optional {role: weight} mix (exact proportions, see role_mix); by default each
+        soldier draws from rifle/rifle/grenadier/medic/heavy
     """
-    roles = ['rifle','rifle','grenadier','medic','heavy']
+    rng = rng or random
+    assigned = role_mix(n, roles, rng) if roles else None
+    pool = ['rifle','rifle','grenadier','medic','heavy']
     team = []
     for i in range(n):
-        role = random.choice(roles)
-        s = Soldier(random.randint(xmin,xmax), random.randint(50,screen_h-50), color, role=role)
+        role = assigned[i] if assigned else rng.choice(pool)
+        s = Soldier(rng.randint(xmin,xmax), rng.randint(50,screen_h-50), color, role=role, rng=rng)
         if color == (255,0,0):
             s.sprite = sprite_red
         else:
@@ -111,6 +138,8 @@ def make_team(xmin, xmax, color, n=5, side=None, sprite_red=None, sprite_green=N
             s.weapon_img = weapon_m4
             s.weapon_sound = (sounds.get('m4a1') if sounds else None) or ((sounds.get('shoot_blue') if sounds else None) if color==(0,0,255) else (sounds.get('shoot_red') if sounds else None))
             s.weapon_key = 'm4a1'
+        # scaled/flipped body and weapon images are rendered once, not every frame
+        s.prepare_sprites()
         team.append(s)
         try:
             wk = getattr(s, 'weapon_key', None)
@@ -121,7 +150,8 @@ def make_team(xmin, xmax, color, n=5, side=None, sprite_red=None, sprite_green=N
                     s.side = 'T'
                 else:
                     s.side = 'CT'
-            print(f"SPAWN_SOLDIER: name={s.name} role={role} weapon_key={wk} side={getattr(s,'side',None)} sound_loaded={'yes' if (wk and sounds and sounds.get(wk)) else 'no'}")
+            if verbose:
+                print(f"SPAWN_SOLDIER: name={s.name} role={role} weapon_key={wk} side={getattr(s,'side',None)} sound_loaded={'yes' if (wk and sounds and sounds.get(wk)) else 'no'}")
         except Exception:
             pass
     return team
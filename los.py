@@ -0,0 +1,116 @@
+"""Line of sight against covers.
+
+Segments are tested exactly against each cover's axis-aligned box with the
+slab method, so a query costs O(covers on the path) (with a
+spatial.CoverIndex) instead of sampling the segment every few pixels.
+
+LineOfSight is the one engine World hands to AI targeting, grenade lobbing
+and player fire. Soldier-to-soldier answers are cached per tick by
+unordered pair: when B checks A after A checked B in the same tick it gets
+A's answer. With a visibility.VisibilityTable for the map, pairs whose cells
+can never see each other are rejected before any ray is cast.
+"""
+
+# up to this many covers a segment is tested against every cover box
+LOS_SCAN_MAX = 16
+
+
+def segment_hits_box(x1, y1, x2, y2, left, top, right, bottom):
+    """True if the segment (x1, y1)-(x2, y2) touches the closed box [left, right] x [top, bottom]."""
+    t0 = 0.0
+    t1 = 1.0
+    dx = x2 - x1
+    if dx == 0.0:
+        if x1 < left or x1 > right:
+            return False
+    else:
+        ta = (left - x1) / dx
+        tb = (right - x1) / dx
+        if ta > tb:
+            ta, tb = tb, ta
+        if ta > t0:
+            t0 = ta
+        if tb < t1:
+            t1 = tb
+        if t0 > t1:
+            return False
+    dy = y2 - y1
+    if dy == 0.0:
+        return top <= y1 <= bottom
+    ta = (top - y1) / dy
+    tb = (bottom - y1) / dy
+    if ta > tb:
+        ta, tb = tb, ta
+    if ta > t0:
+        t0 = ta
+    if tb < t1:
+        t1 = tb
+    return t0 <= t1
+
+
+def segment_blocked(x1, y1, x2, y2, covers):
+    """True if any cover rect intersects the segment (x1, y1)-(x2, y2)."""
+    if not covers:
+        return False
+    # with a spatial.CoverIndex of many covers, walk the cells along the segment and
+    # stop at the first hit; for a handful of covers testing every box is cheaper
+    cells = getattr(covers, 'cells', None)
+    if cells is not None and len(covers) > LOS_SCAN_MAX:
+        seen = set()
+        for key in covers.segment_cells(x1, y1, x2, y2):
+            bucket = cells.get(key)
+            if not bucket:
+                continue
+            for i in bucket:
+                if i in seen:
+                    continue
+                seen.add(i)
+                r = covers[i].rect
+                if segment_hits_box(x1, y1, x2, y2, r.left, r.top, r.right, r.bottom):
+                    return True
+        return False
+    for c in covers:
+        r = c.rect
+        if segment_hits_box(x1, y1, x2, y2, r.left, r.top, r.right, r.bottom):
+            return True
+    return False
+
+
+class LineOfSight:
+    """Shared LOS queries for one match; call new_tick() at the start of every tick."""
+
+    def __init__(self, covers=(), visibility=None):
+        self.covers = covers
+        self.visibility = visibility
+        self.cache = {}
+        self.queries = 0
+        self.hits = 0
+        self.rejects = 0
+
+    def new_tick(self, covers=None, visibility=None):
+        if covers is not None:
+            self.covers = covers
+        if visibility is not None:
+            self.visibility = visibility
+        self.cache.clear()
+
+    def blocked(self, x1, y1, x2, y2):
+        """Uncached segment query (e.g. player fire toward the mouse)."""
+        vis = self.visibility
+        if vis is not None and not vis.maybe_visible(x1, y1, x2, y2):
+            self.rejects += 1
+            return True
+        return segment_blocked(x1, y1, x2, y2, self.covers)
+
+    def clear(self, a, b):
+        """True if nothing blocks the line between soldiers a and b (cached for this tick)."""
+        ia = id(a); ib = id(b)
+        key = (ia, ib) if ia < ib else (ib, ia)
+        self.queries += 1
+        res = self.cache.get(key)
+        if res is None:
+            res = not self.blocked(a.x, a.y, b.x, b.y)
+            self.cache[key] = res
+        else:
+            self.hits += 1
+        return res
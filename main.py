@@ -1,5 +1,5 @@
 # Full rewrite: menu + play & simulation modes + ammo/reload + enlarged start window
-import pygame, random, math, os, sys, re
+import pygame, random, os, sys, re, time
 from resources import load_sound_prefer_source, load_image_prefer_source
 
 # Basic settings
@@ -8,15 +8,155 @@ WINDOWED_DEFAULT = (1280, 720)
 # Start fullscreen at this resolution
 START_FULLSCREEN_SIZE = (1920, 1080)
 FPS = 144
+# game logic runs at a fixed rate; rendering interpolates between the last two logic states
+LOGIC_HZ = 60
+# drop accumulated time beyond this (ms) after a long hitch instead of spiralling
+MAX_FRAME_MS = 250
+# at most this many logic steps per rendered frame; a slower machine runs the game slower instead of stalling
+MAX_STEPS_PER_FRAME = 5
+# record every match as a compact input replay (python main.py --record); see replay.py
+RECORD_REPLAYS = '--record' in sys.argv
+REPLAY_DIR = 'replays'
+# per-map visibility tables (visibility.py) are cached here
+VIS_CACHE_DIR = '.vis_cache'
 # runtime screen size (updates when toggling fullscreen)
 screen_w, screen_h = WINDOWED_DEFAULT
 
-from game_core import Cover, Crate, Particle, Grenade, Bullet, Soldier, set_screen_size, set_frame_scale, _line_blocked_by_covers
+from game_core import set_screen_size
 from concurrent.futures import ThreadPoolExecutor
-from helpers import play_sound_obj, spawn_explosion, make_roguelike_covers, make_team
+from helpers import play_sound_obj, IMAGE_PARTICLE_SCALE
 from debug_tools import spawn_pawn, spawn_bomb_carrier_sandbox, give_bomb_to_random_team, clear_entities
-from bomb import draw_bomb, drop_bomb_at, reset_round_bomb
+from bomb import draw_bomb, drop_bomb_at
 from ui import draw_hud
+from simulation import World
+from replay import ReplayRecorder
+from sprite_cache import sprite_cache, scale_range
+
+
+def read_controls():
+    """Poll keyboard/mouse once and return the player input dict World.step() expects."""
+    keys = pygame.key.get_pressed()
+    mbuttons = pygame.mouse.get_pressed()
+    mx, my = pygame.mouse.get_pos()
+    return {
+        'up': bool(keys[pygame.K_w] or keys[pygame.K_UP]),
+        'down': bool(keys[pygame.K_s] or keys[pygame.K_DOWN]),
+        'left': bool(keys[pygame.K_a] or keys[pygame.K_LEFT]),
+        'right': bool(keys[pygame.K_d] or keys[pygame.K_RIGHT]),
+        'reload': bool(keys[pygame.K_r]),
+        'fire': bool(mbuttons[0]),
+        'mx': mx,
+        'my': my,
+        'keys': keys,
+    }
+
+
+def _save_replay(recorder, world):
+    if recorder is None or recorder.ticks == 0:
+        return
+    try:
+        path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{recorder.mode}_{recorder.seed}.sgr")
+        recorder.save(path, world)
+        print(f"REPLAY: saved {path} ({recorder.ticks} ticks)")
+    except Exception as e:
+        print(f"REPLAY: failed to save ({e})")
+
+
+def _interpolate_positions(objs, alpha):
+    """Move objs to their position between the previous and current logic step.
+    Returns the real positions so the caller can restore them after drawing.
+    """
+    saved = []
+    for o in objs:
+        saved.append((o, o.x, o.y))
+        o.x = o.prev_x + (o.x - o.prev_x) * alpha
+        o.y = o.prev_y + (o.y - o.prev_y) * alpha
+    return saved
+
+
+def draw_world(screen, world, fonts, bomb_img=None, alpha=1.0):
+    """Render the current World state (map, pawns, projectiles, effects, HUD).
+    alpha: fraction of a logic step elapsed since the last World.step (1.0 draws the latest state)
+    """
+    saved = _interpolate_positions(world.soldiers + world.grenades, alpha) if alpha < 1.0 else []
+    try:
+        _draw_world(screen, world, fonts, bomb_img, alpha)
+    finally:
+        for o, x, y in saved:
+            o.x = x; o.y = y
+
+
+def _draw_world(screen, world, fonts, bomb_img=None, alpha=1.0):
+    screen_w, screen_h = world.width, world.height
+    screen.fill((50,50,50))
+
+    # draw a visible map border so the playable area is clear
+    try:
+        # compute inset based on the largest soldier radius so the border matches clamping
+        all_soldiers = world.soldiers
+        default_inset = 10
+        if all_soldiers:
+            max_radius = max(getattr(s, 'radius', default_inset) for s in all_soldiers)
+        else:
+            max_radius = default_inset
+        # inset equals pawn radius so clamp matches exactly
+        border_inset = int(max_radius)
+        # draw a 1px inner rect showing playable/clamped area exactly
+        inner_left = border_inset
+        inner_top = border_inset
+        inner_w = max(0, screen_w - border_inset*2)
+        inner_h = max(0, screen_h - border_inset*2)
+        try:
+            color = (255, 120, 50)
+            rect = pygame.Rect(inner_left, inner_top, inner_w, inner_h)
+            # draw an inner rect border (1 px). Using rect fixes asymmetric off-by-one issues.
+            pygame.draw.rect(screen, color, rect, 1)
+        except Exception:
+            pass
+    except Exception:
+        pass
+    for c in world.covers: c.draw(screen)
+    for s in world.soldiers: s.draw(screen)
+    world.bullets.draw(screen, alpha)
+    for g in world.grenades: g.draw(screen)
+    world.particles.draw(screen)
+    # draw explosion animations (if frames available)
+    explosion_frames = world.explosion_frames
+    if explosion_frames:
+        for ea in world.explosion_anims:
+            fi = ea['frame']
+            if 0 <= fi < len(explosion_frames):
+                img = explosion_frames[fi]
+                try:
+                    rect = img.get_rect(center=(int(ea['x']), int(ea['y'])))
+                    screen.blit(img, rect)
+                except Exception:
+                    pass
+    # draw image particles
+    for ip in world.image_particles:
+        try:
+            # pre-scaled, pre-rotated copy (quantized scale/angle) from the sprite cache
+            srf = sprite_cache.get(ip['img'], ip['scale'], ip['rot'], min_size=4)
+            r = srf.get_rect(center=(int(ip['x']), int(ip['y'])))
+            screen.blit(srf, r)
+        except Exception:
+            pass
+
+    for cr in world.crates: cr.draw(screen)
+    # draw bomb indicators & carrier visuals (delegated to bomb module)
+    try:
+        draw_bomb(screen, world.bomb, bomb_img)
+    except Exception:
+        pass
+
+    # draw HUD and overlays via ui module (centralizes HUD code)
+    try:
+        state = {'screen_w': screen_w, 'screen_h': screen_h, 'mode': world.mode, 'round_state': world.round_state, 'rounds': world.rounds, 'kill_feed': world.kill_feed, 'explosion_frames': explosion_frames, 'generic_images': world.generic_images, 'explosion_anims': world.explosion_anims, 'image_particles': world.image_particles, 'player': world.player, 'death_text_timer': world.death_text_timer, 'hit_marks': world.hit_marks,
+                 'soldiers': (len(world.red_team), len(world.blue_team)), 'step_ms': world.step_ms, 'frame_budget_ms': world.frame_budget_ms, 'over_budget': world.over_budget()}
+        draw_hud(screen, fonts, state)
+    except Exception:
+        pass
+
 
 # Main
 def main():
@@ -145,51 +285,36 @@ def main():
             img = None
         if img is not None:
             generic_images.append(img)
+    # render every scale/rotation an explosion can use before the first match
+    sprite_cache.prewarm(generic_images, scale_range(*IMAGE_PARTICLE_SCALE), min_size=4)
 
     # spawn_explosion helper is provided by helpers.py; call with resource lists where used
 
-    # team and cover helpers are provided by helpers.py (make_team, make_roguelike_covers)
+    # all match state and per-frame game logic lives in simulation.World
+    assets = {'sprite_red': sprite_red, 'sprite_green': sprite_green, 'weapon_ak': weapon_ak, 'weapon_m4': weapon_m4}
+    world = World(screen_w, screen_h, sounds=sounds, assets=assets, executor=executor, vis_cache_dir=VIS_CACHE_DIR)
+    world.explosion_frames = explosion_frames
+    world.generic_images = generic_images
+    fonts = {'_default_font': _default_font, '_small_font': _small_font, '_ammo_font': _ammo_font, '_title_font': _title_font}
 
     # Menu state
-    mode = 'menu'  # 'menu', 'play', 'simulation', 'sandbox'
-    menu_options = ['Play', 'Simulation', 'Sandbox']
+    mode = 'menu'  # 'menu', 'play', 'simulation', 'battle', 'sandbox'
+    menu_options = ['Play', 'Simulation', 'Battle', 'Sandbox']
     menu_idx = 0
 
-    bullets = []
-    grenades = []
-    particles = []
-    explosion_anims = []
-    image_particles = []
-    crates = []
-    hit_marks = []  # small markers for player-hit impact points
-    kill_feed = []  # list of {'text': str, 'life': int}
-    death_text_timer = 0
-
-    # round/score
-    rounds = {'red':0,'blue':0}
-    round_state = 1
-    round_timer = 0
-    best_of = 5
-
-    camera_shake = 0
-
     running = True
-    red_team = []
-    blue_team = []
-    player = None
-    covers = []
-    # bomb state: carried_by -> Soldier or None; planted boolean and site_rect
-    bomb = {'carried_by': None, 'planted': False, 'planted_by': None, 'x': None, 'y': None, 'site_rect': None}
+    step_ms = 1000.0 / LOGIC_HZ
+    # FRAME_SCALE 1.0 == one 60 FPS frame
+    step_scale = 60.0 / LOGIC_HZ
+    accumulator = 0.0
+    recorder = None
 
     while running:
-        # compute frame_scale based on actual ms per frame vs baseline 60fps
+        # fixed-timestep accumulator: logic always advances in whole LOGIC_HZ steps
         dt_ms = clock.tick(FPS)
-        baseline_ms = 1000.0 / 60.0
-        frame_scale = max(0.01, dt_ms / baseline_ms)
-        try:
-            set_frame_scale(frame_scale)
-        except Exception:
-            pass
+        # time spent in the menu is not owed to the next match
+        if mode != 'menu':
+            accumulator += min(dt_ms, MAX_FRAME_MS)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -198,7 +323,7 @@ def main():
                 if not fullscreen:
                     screen = pygame.display.set_mode(windowed_size, pygame.RESIZABLE)
                     screen_w, screen_h = windowed_size
-                    set_screen_size(screen_w, screen_h)
+                    world.resize(screen_w, screen_h)
             elif event.type == pygame.KEYDOWN:
                 # F: toggle fullscreen/windowed
                 if event.key == pygame.K_f:
@@ -212,7 +337,7 @@ def main():
                             screen = pygame.display.set_mode((info.current_w, info.current_h), pygame.FULLSCREEN)
                             screen_w, screen_h = info.current_w, info.current_h
                             fullscreen = True
-                        set_screen_size(screen_w, screen_h)
+                        world.resize(screen_w, screen_h)
                     except Exception:
                         pass
                 # ESC returns to main menu from any mode
@@ -220,13 +345,8 @@ def main():
                     # reset state and go back to menu
                     mode = 'menu'
                     menu_idx = 0
-                    bullets.clear(); grenades.clear(); particles.clear(); crates.clear()
-                    red_team = []
-                    blue_team = []
-                    player = None
-                    round_state = 1
-                    round_timer = 0
-                    rounds = {'red':0,'blue':0}
+                    _save_replay(recorder, world); recorder = None
+                    world.reset()
                     continue
                 # menu navigation
                 if mode == 'menu':
@@ -235,88 +355,16 @@ def main():
                     elif event.key == pygame.K_DOWN:
                         menu_idx = (menu_idx+1) % len(menu_options)
                     elif event.key == pygame.K_RETURN or event.key == pygame.K_KP_ENTER:
-                        choice = menu_options[menu_idx]
-                        # initialize game depending on choice
-                        # generate roguelike-style covers for more walls
-                        covers = make_roguelike_covers(screen_w, screen_h, cell=96, fill_prob=0.18)
-                        bullets.clear(); grenades.clear(); particles.clear(); crates.clear()
-                        if choice == 'Play':
-                            # pick randomly which color becomes T (they'll carry/plant the bomb)
-                            # red_color and blue_color refer to sprite color; T/CT assignment is per-team
-                            # we'll make either red or blue the Terrorist (T) side for this match
-                            t_color = random.choice([(255,0,0), (0,0,255)])
-                            ct_color = (0,0,255) if t_color == (255,0,0) else (255,0,0)
-                            # when creating teams, pass the side so all members share it
-                            if t_color == (255,0,0):
-                                red_team = make_team(50, int(screen_w*0.25), (255,0,0), 5, side='T', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                                blue_team = make_team(int(screen_w*0.75), screen_w-50, (0,0,255), 5, side='CT', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                            else:
-                                red_team = make_team(50, int(screen_w*0.25), (255,0,0), 5, side='CT', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                                blue_team = make_team(int(screen_w*0.75), screen_w-50, (0,0,255), 5, side='T', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                            # create a player soldier
-                            player = Soldier(100, screen_h//2, (255,0,0), role='rifle')
-                            player.controlled = True
-                            player.mag_capacity = 30; player.mag = 30; player.reserve = 90
-                            # make player's rifle effectively full-auto by reducing the per-shot cooldown
-                            # but keep a realistic reload duration (~3 seconds)
-                            player.reload_time_frames = 180
-                            player.reload_time = 6
-                            player.sprite = sprite_red; player.weapon_img = weapon_m4; player.weapon_sound = sounds.get('m4a1')
-                            player.weapon_key = 'm4a1'
-                            try:
-                                print(f"SPAWN_PLAYER: name={player.name} weapon_key={getattr(player,'weapon_key',None)} sound_loaded={'yes' if sounds.get(getattr(player,'weapon_key',None)) else 'no'}")
-                            except Exception:
-                                pass
-                            # replace one AI with player so player is part of the 5-member red team
-                            if red_team:
-                                red_team[0] = player
-                            # create a bomb site on the CT spawn and give the bomb to a random T soldier
-                            try:
-                                # determine which color is CT to place the site in their spawn area
-                                if (red_team and getattr(red_team[0], 'side', None) == 'CT'):
-                                    bomb_site = pygame.Rect(20, screen_h//2 - 48, 96, 96)
-                                else:
-                                    bomb_site = pygame.Rect(screen_w-20-96, screen_h//2 - 48, 96, 96)
-                                bomb['site_rect'] = bomb_site
-                                bomb['planted'] = False; bomb['planted_by'] = None; bomb['carried_by'] = None
-                                # give the bomb to a random T team soldier
-                                t_candidates = [s for s in (red_team + blue_team) if getattr(s, 'side', None) == 'T']
-                                if t_candidates:
-                                    carrier = random.choice(t_candidates)
-                                    carrier.carrying_bomb = True
-                                    bomb['carried_by'] = carrier
-                            except Exception:
-                                pass
-                        elif choice == 'Simulation':
-                            # simulation: full AI 5v5, no player control
-                            # pick randomly which color is T
-                            t_color = random.choice([(255,0,0), (0,0,255)])
-                            if t_color == (255,0,0):
-                                red_team = make_team(50, int(screen_w*0.25), (255,0,0), 5, side='T', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                                blue_team = make_team(int(screen_w*0.75), screen_w-50, (0,0,255), 5, side='CT', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                            else:
-                                red_team = make_team(50, int(screen_w*0.25), (255,0,0), 5, side='CT', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                                blue_team = make_team(int(screen_w*0.75), screen_w-50, (0,0,255), 5, side='T', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                            # ensure no player object remains and no soldier is marked controlled
-                            player = None
-                            for s in red_team+blue_team:
-                                s.controlled = False
-                                s.mag_capacity = 30; s.mag = 30; s.reserve = 90; s.reload_time_frames = 90
-                        elif choice == 'Sandbox':
-                            # sandbox: empty scene for debugging; no teams, start empty and let user spawn via debug keys
-                            red_team = []
-                            blue_team = []
-                            player = None
-                            bullets.clear(); grenades.clear(); particles.clear(); crates.clear(); explosion_anims.clear(); image_particles.clear()
-                            # ensure no bomb in sandbox
-                            bomb['carried_by'] = None; bomb['planted'] = False; bomb['planted_by'] = None; bomb['site_rect'] = None
-                        # reset round state and scores
-                        round_state = 1; rounds = {'red':0,'blue':0}
-                        mode = choice.lower()
+                        # initialize the match (covers, teams, bomb) for the chosen mode
+                        mode = menu_options[menu_idx].lower()
+                        # fresh seed per match so a replay can reproduce it
+                        world.start(mode, seed=random.randrange(2 ** 32))
+                        accumulator = 0.0
+                        recorder = ReplayRecorder(world, LOGIC_HZ) if RECORD_REPLAYS else None
                 # debug keys available while in a mode (not in menu)
                 if event.key == pygame.K_e and mode != 'menu':
                     mx, my = pygame.mouse.get_pos()
-                    spawn_explosion(mx, my, explosion_frames, generic_images, explosion_anims, image_particles, magnitude=1.0)
+                    world.explode_at(mx, my, magnitude=1.0)
                 if event.key == pygame.K_g and mode != 'menu':
                     # spawn only generic image particles at mouse
                     mx, my = pygame.mouse.get_pos()
@@ -334,36 +382,26 @@ def main():
                                 'rot_speed': random.uniform(-6, 6),
                                 'scale': random.uniform(0.3, 1.4)
                             }
-                            image_particles.append(ip)
+                            world.image_particles.append(ip)
                 # spawn a test pawn in Sandbox with K
                 if event.key == pygame.K_k and mode == 'sandbox':
                     mx, my = pygame.mouse.get_pos()
                     # spawn a test rifleman for the active side (blue)
-                    spawn_pawn(mx, my, (0,0,255), 'rifle', blue_team, sprite_green, weapon_m4, 'm4a1')
+                    spawn_pawn(mx, my, (0,0,255), 'rifle', world.blue_team, sprite_green, weapon_m4, 'm4a1', rng=world.rng)
                 # spawn a red test pawn in sandbox (Y)
                 if event.key == pygame.K_y and mode == 'sandbox':
                     mx, my = pygame.mouse.get_pos()
-                    spawn_pawn(mx, my, (255,0,0), 'rifle', red_team, sprite_red, weapon_m4, 'm4a1')
+                    spawn_pawn(mx, my, (255,0,0), 'rifle', world.red_team, sprite_red, weapon_m4, 'm4a1', rng=world.rng)
                 # spawn a red bomb-carrying pawn in sandbox (U)
                 if event.key == pygame.K_u and mode == 'sandbox':
                     mx, my = pygame.mouse.get_pos()
-                    s = spawn_pawn(mx, my, (255,0,0), 'rifle', red_team, sprite_red, weapon_m4, 'm4a1')
+                    s = spawn_pawn(mx, my, (255,0,0), 'rifle', world.red_team, sprite_red, weapon_m4, 'm4a1', rng=world.rng)
                     s.carrying_bomb = True
-                    bomb['carried_by'] = s
+                    world.bomb['carried_by'] = s
                 # plant bomb (P) if carrying and inside site
                 if event.key == pygame.K_p and mode != 'menu':
                     try:
-                        if bomb.get('carried_by') is not None and bomb.get('site_rect') is not None:
-                            cb = bomb['carried_by']
-                            if bomb['site_rect'].collidepoint(int(cb.x), int(cb.y)):
-                                bomb['planted'] = True
-                                bomb['planted_by'] = cb
-                                bomb['carried_by'] = None
-                                # award round to planting team and advance round
-                                team_name = 'blue' if getattr(cb, 'color', None) == (0,0,255) else 'red'
-                                rounds[team_name] = rounds.get(team_name, 0) + 1
-                                round_state = 2; round_timer = 180
-                                print(f"BOMB: planted by {getattr(cb,'name',None)} team={team_name}")
+                        world.plant_bomb()
                     except Exception:
                         pass
                 # debug: give bomb to a soldier or spawn a bomb-carrying soldier in sandbox (B)
@@ -371,45 +409,35 @@ def main():
                     try:
                         mx,my = pygame.mouse.get_pos()
                         if mode == 'sandbox':
-                            spawn_bomb_carrier_sandbox(mx, my, blue_team, sprite_green, weapon_m4, 'm4a1', bomb)
+                            spawn_bomb_carrier_sandbox(mx, my, world.blue_team, sprite_green, weapon_m4, 'm4a1', world.bomb)
                         else:
                             # in play/simulation, give the bomb to a random blue soldier if exists
-                            give_bomb_to_random_team(blue_team, bomb)
+                            give_bomb_to_random_team(world.blue_team, world.bomb)
                     except Exception:
                         pass
                 # drop bomb at mouse (O) — if carried, drop it here; otherwise place a dropped bomb
                 if event.key == pygame.K_o and mode != 'menu':
                     try:
                         mx, my = pygame.mouse.get_pos()
-                        # if a carrier exists, force-drop at mouse
-                        cb = bomb.get('carried_by')
-                        if cb is not None:
-                            try:
-                                cb.carrying_bomb = False
-                            except Exception:
-                                pass
-                            bomb['carried_by'] = None
-                        bomb['x'] = int(mx); bomb['y'] = int(my); bomb['planted'] = False
-                        print(f"DEBUG: bomb dropped at {bomb['x']},{bomb['y']}")
+                        drop_bomb_at(world.bomb, mx, my)
+                        print(f"DEBUG: bomb dropped at {world.bomb['x']},{world.bomb['y']}")
                     except Exception:
                         pass
                 # give bomb to a random T-side pawn (G)
                 if event.key == pygame.K_g and mode != 'menu':
                     try:
-                        t_candidates = [s for s in (red_team + blue_team) if getattr(s, 'side', None) == 'T']
+                        t_candidates = [s for s in world.soldiers if getattr(s, 'side', None) == 'T']
                         if t_candidates:
-                            give_bomb_to_random_team(t_candidates, bomb)
+                            give_bomb_to_random_team(t_candidates, world.bomb)
                     except Exception:
                         pass
                 # clear bullets/grenades/particles (C)
                 if event.key == pygame.K_c and mode != 'menu':
                     try:
-                        clear_entities(bullets, grenades, particles)
+                        clear_entities(world.bullets, world.grenades, world.particles)
                         print('DEBUG: cleared bullets, grenades, and particles')
                     except Exception:
                         pass
-                    except Exception:
-                        pass
                 # allow forcing weapon sounds in sandbox/debug modes
                 if event.key == pygame.K_h and mode != 'menu':
                     if sounds.get('m4a1'):
@@ -437,443 +465,32 @@ def main():
             screen.blit(inst, (10, screen_h-30))
             pygame.display.flip(); continue
 
-        # spawn occasional crate (rate scales with frame_scale)
-        if random.random() < 0.002 * frame_scale and len(crates) < 3:
-            kind = random.choice(['heal','fast_reload','shield'])
-            crates.append(Crate(random.randint(100,screen_w-100), random.randint(50,screen_h-50), kind))
-
-        # player input handling (if any) - only while player exists and is alive
-        keys = pygame.key.get_pressed()
-        mbuttons = pygame.mouse.get_pressed()
-        mx, my = pygame.mouse.get_pos()
+        # player input is polled once per frame and handed to the world
+        controls = read_controls()
+        player = world.player
         if mode == 'play' and player and getattr(player, 'hp', 0) > 0:
-            # movement WASD
-            mvx = mvy = 0
-            if keys[pygame.K_w] or keys[pygame.K_UP]: mvy -= player.speed*1.8
-            if keys[pygame.K_s] or keys[pygame.K_DOWN]: mvy += player.speed*1.8
-            if keys[pygame.K_a] or keys[pygame.K_LEFT]: mvx -= player.speed*1.8
-            if keys[pygame.K_d] or keys[pygame.K_RIGHT]: mvx += player.speed*1.8
-            # attempt movement but avoid entering covers (slide along if blocked)
-            cand_x = player.x + mvx
-            cand_y = player.y + mvy
-            blocked = False
-            for cov in covers:
-                try:
-                    if cov.rect.collidepoint(cand_x, cand_y):
-                        blocked = True
-                        break
-                except Exception:
-                    pass
-            if not blocked:
-                player.x = cand_x; player.y = cand_y
-            else:
-                # try sliding on X only
-                cand_x2 = player.x + mvx
-                blocked_x = any((cov.rect.collidepoint(cand_x2, player.y) for cov in covers))
-                cand_y2 = player.y + mvy
-                blocked_y = any((cov.rect.collidepoint(player.x, cand_y2) for cov in covers))
-                if not blocked_x:
-                    player.x = cand_x2
-                elif not blocked_y:
-                    player.y = cand_y2
-            player.stay_in_bounds()
-            # face based on mouse position so the texture mirrors correctly
-            try:
-                player.facing_right = (mx > player.x)
-            except Exception:
-                pass
-            # reload key
-            if keys[pygame.K_r] and not player.reloading and player.mag < player.mag_capacity and player.reserve>0:
-                player.reloading = True; player.reload_timer = player.reload_time_frames
-            # AUTO-RELOAD: if mag empty and there is reserve, start reload automatically
-            if player.mag <= 0 and player.reserve > 0 and not player.reloading:
-                player.reloading = True
-                player.reload_timer = player.reload_time_frames
-            # shooting with left mouse
-            # use frame-scaled timing (matches AI which uses FRAME_SCALE)
-            player.reload_counter += frame_scale
-            if mbuttons[0] and not player.reloading and player.reload_counter >= player.reload_time and player.mag>0:
-                # prevent player shooting through solid covers
-                if not _line_blocked_by_covers(player.x, player.y, mx, my, covers):
-                    bullets.append(Bullet(player.x + player.weapon_length, player.y, mx, my, player.color, damage=player.damage, owner=player))
-                try:
-                    # prefer weapon_key mapping to avoid accidental explosion sound usage
-                    wk = getattr(player, 'weapon_key', None)
-                    s = None
-                    if wk and sounds.get(wk):
-                        s = sounds.get(wk)
-                    else:
-                        s = (sounds.get('shoot_red') if player.color == (255,0,0) else sounds.get('shoot_blue'))
-                    if s and s is not sounds.get('explosion') and s is not sounds.get('grenade'):
-                        play_sound_obj(s, sounds)
-                except Exception:
-                    pass
-                player.mag -= 1
-                player.reload_counter = 0
-            # debug: force play weapon sounds
-            if keys[pygame.K_h]:
+            # debug: force play weapon sounds while held
+            if controls['keys'][pygame.K_h]:
                 if sounds.get('m4a1'):
                     try: play_sound_obj(sounds['m4a1'], sounds)
                     except Exception: pass
-            if keys[pygame.K_j]:
+            if controls['keys'][pygame.K_j]:
                 if sounds.get('ak47'):
                     try: play_sound_obj(sounds['ak47'], sounds)
                     except Exception: pass
                 player.recoil_timer = 3
-            # handle player reload timer if reloading (frame-scaled)
-            if player.reloading:
-                player.reload_timer -= frame_scale
-                if player.reload_timer <= 0:
-                    needed = max(0, player.mag_capacity - player.mag)
-                    to_load = min(needed, player.reserve)
-                    player.reserve -= to_load
-                    player.mag += to_load
-                    player.reloading = False
-
-        # update entities (skip controlled player as it's handled above)
-        for s in list(red_team):
-            if getattr(s, 'controlled', False):
-                continue
-            s.update(blue_team, bullets, grenades, covers, crates, red_team, sounds, bomb)
-        for s in list(blue_team):
-            s.update(red_team, bullets, grenades, covers, crates, blue_team, sounds, bomb)
-
-        # parallel updates for cheap objects - safe because these do not access pygame surfaces
-        try:
-            if bullets:
-                list(executor.map(lambda o: o.update(), bullets))
-            if grenades:
-                list(executor.map(lambda o: o.update(), grenades))
-            if particles:
-                # cap particle count for performance
-                if len(particles) > 1200:
-                    del particles[1200:]
-                list(executor.map(lambda o: o.update(), particles))
-        except Exception:
-            for b in bullets: b.update()
-            for g in grenades: g.update()
-            for p in particles: p.update()
-
-        # Collision resolution and melee handling (pairwise)
-        # Prevent any soldiers (including teammates) from occupying the same space.
-        # If two opposing soldiers overlap, a melee attack is attempted (subject to melee cooldown).
-        all_soldiers = red_team + blue_team
-        n = len(all_soldiers)
-        for i in range(n):
-            for j in range(i+1, n):
-                a = all_soldiers[i]
-                b = all_soldiers[j]
-                dx = b.x - a.x; dy = b.y - a.y
-                dist = math.hypot(dx, dy) or 0.001
-                min_dist = a.radius + b.radius
-                if dist < min_dist:
-                    # separate them equally so they no longer overlap
-                    overlap = (min_dist - dist) / 2.0
-                    nx, ny = dx/dist, dy/dist
-                    a.x -= nx * overlap
-                    a.y -= ny * overlap
-                    b.x += nx * overlap
-                    b.y += ny * overlap
-                    a.stay_in_bounds(); b.stay_in_bounds()
-                    # If they're on opposing teams, resolve melee (cooldown enforced)
-                    if getattr(a, 'color', None) is not None and getattr(b, 'color', None) is not None and a.color != b.color:
-                        try:
-                            if getattr(a, 'melee_timer', 0) <= 0:
-                                b.hp -= getattr(a, 'melee_damage', 10)
-                                a.melee_timer = getattr(a, 'melee_cooldown_frames', 180)
-                                a.face_expression = 'hit'; a.speech_text = 'Slash!'; a.speech_timer = 20
-                            if getattr(b, 'melee_timer', 0) <= 0:
-                                a.hp -= getattr(b, 'melee_damage', 10)
-                                b.melee_timer = getattr(b, 'melee_cooldown_frames', 180)
-                                b.face_expression = 'hit'; b.speech_text = 'Slash!'; b.speech_timer = 20
-                        except Exception:
-                            pass
-
-        for b in bullets[:]:
-            # remove offscreen
-            if b.x<0 or b.x>screen_w or b.y<0 or b.y>screen_h:
-                try: bullets.remove(b)
-                except: pass
-                continue
-            # cover collision: bullets are blocked by covers (act like walls)
-            blocked = False
-            for cov in covers:
-                try:
-                    if cov.rect.collidepoint(b.x, b.y):
-                        # spawn small impact particles and remove bullet
-                        for _ in range(4): particles.append(Particle(b.x, b.y, random.uniform(-1.5,1.5), random.uniform(-1.5,1.5), random.randint(6,12), (180,180,180)))
-                        try: bullets.remove(b)
-                        except: pass
-                        blocked = True
-                        break
-                except Exception:
-                    pass
-            if blocked:
-                continue
-            hit = False
-            for team in [red_team, blue_team]:
-                for s in team:
-                    if b.color != s.color and math.hypot(b.x-s.x, b.y-s.y) < b.radius + s.radius:
-                        if not s.in_cover(covers):
-                            if s.shield>0:
-                                s.shield -=1
-                            else:
-                                # record last attacker for kill feed
-                                try:
-                                    s.last_attacker = getattr(b.owner, 'name', None)
-                                except Exception:
-                                    s.last_attacker = None
-                                s.hp -= b.damage
-                                s.face_expression = 'hit'; s.speech_text = 'Ouch!'; s.speech_timer = 30
-                                # if soldier was carrying the bomb, drop it here
-                                try:
-                                    if getattr(s, 'carrying_bomb', False):
-                                        s.carrying_bomb = False
-                                        if bomb.get('carried_by') is s:
-                                            bomb['carried_by'] = None
-                                            # place dropped bomb near soldier
-                                            bomb['x'] = int(s.x + random.randint(-8,8))
-                                            bomb['y'] = int(s.y + random.randint(-8,8))
-                                            bomb['planted'] = False
-                                except Exception:
-                                    pass
-                                # play damage sound if available
-                                try:
-                                    if sounds.get('damage'):
-                                        try: play_sound_obj(sounds['damage'], sounds)
-                                        except Exception: pass
-                                except Exception:
-                                    pass
-                                # spawn a hit mark if this bullet was fired by the player in play mode
-                                try:
-                                    if mode == 'play' and b.owner is not None and getattr(b.owner, 'controlled', False):
-                                        hit_marks.append({'x': b.x, 'y': b.y, 'life': 30})
-                                except Exception:
-                                    pass
-                        # particles
-                        for _ in range(6): particles.append(Particle(b.x, b.y, random.uniform(-2,2), random.uniform(-2,2), random.randint(8,16), (255,200,100)))
-                        if b in bullets: bullets.remove(b)
-                        hit = True
-                        break
-                if hit: break
-
-        for g in grenades[:]:
-            if g.timer <= 0:
-                # explosion logic: handle damage and small particles (in grenades.explode)
-                g.explode(red_team+blue_team, particles)
-                if sounds.get('explosion'):
-                    try: play_sound_obj(sounds['explosion'], sounds)
-                    except Exception: pass
-                camera_shake = 12
-                # spawn visuals using the shared helper (faster animation + random generic images)
-                spawn_explosion(g.x, g.y, explosion_frames, generic_images, explosion_anims, image_particles, magnitude=1.0)
-                # remove grenade
-                try: grenades.remove(g)
-                except Exception: pass
-
-        # update particles (removals only; updates happened above)
-        for p in particles[:]:
-            if p.life <= 0:
-                try: particles.remove(p)
-                except: pass
-
-        # update explosion animations
-        for ea in explosion_anims[:]:
-            # advance tick scaled by frame_scale so animation speed is stable across fps
-            try:
-                ea['tick'] -= frame_scale
-            except Exception:
-                ea['tick'] -= 1
-            if ea['tick'] <= 0:
-                ea['frame'] += 1
-                ea['tick'] = 2.0
-            if ea['frame'] >= len(explosion_frames):
-                try: explosion_anims.remove(ea)
-                except: pass
-
-        # update image particles
-        for ip in image_particles[:]:
-            ip['x'] += ip['vx'] * frame_scale
-            ip['y'] += ip['vy'] * frame_scale
-            ip['vy'] += 0.05 * frame_scale  # slight gravity
-            ip['rot'] += ip['rot_speed'] * frame_scale
-            ip['life'] -= 1 * frame_scale
-            if ip['life'] <= 0:
-                try: image_particles.remove(ip)
-                except: pass
-
-        # update hit marks
-        for hm in hit_marks[:]:
-            hm['life'] -= 1
-            if hm['life'] <= 0:
-                try: hit_marks.remove(hm)
-                except: pass
-
-        # crates pickup
-        for c in crates[:]:
-            c.timer -=1
-            if c.timer<=0: crates.remove(c); continue
-            for team in [red_team, blue_team]:
-                for s in team:
-                    if math.hypot(c.x-s.x, c.y-s.y) < 20:
-                        if c.kind=='heal': s.hp = min(s.max_hp, s.hp+40)
-                        elif c.kind=='fast_reload': s.reload_time = max(4, int(s.reload_time*0.6))
-                        elif c.kind=='shield': s.shield += 1
-                        crates.remove(c); break
-                else:
-                    continue
-                break
-
-        # cleanup dead
-        prev_red = red_team
-        prev_blue = blue_team
-        # produce kill-feed entries for soldiers who just died
-        newly_dead = [s for s in (prev_red + prev_blue) if getattr(s, 'hp', 0) <= 0]
-        for d in newly_dead:
-            try:
-                killer = getattr(d, 'last_attacker', None) or 'Unknown'
-                feed_text = f"{killer} killed {getattr(d, 'name', 'Soldier')}"
-                kill_feed.append({'text': feed_text, 'life': 180})
-            except Exception:
-                pass
-        red_team = [s for s in red_team if s.hp>0]
-        blue_team = [s for s in blue_team if s.hp>0]
-        # If the controlled player died this frame, clear the player reference so it can no longer act
-        try:
-            if player is not None and getattr(player, 'hp', 0) <= 0:
-                # set a short death display timer
-                death_text_timer = 180
-                player = None
-        except Exception:
-            player = None
-
-        # round logic
-        if round_state == 1:
-            if not red_team or not blue_team:
-                winner = 'red' if blue_team==[] else 'blue'
-                rounds[winner] += 1
-                round_state = 2
-                round_timer = 90
-        elif round_state == 2:
-            round_timer -=1
-            if round_timer<=0:
-                # reset for next round unless match over
-                if rounds['red'] >= (best_of+1)//2 or rounds['blue'] >= (best_of+1)//2:
-                    round_state = 3
-                else:
-                    # respawn teams unless sandbox
-                    if mode != 'sandbox':
-                        # pick which color is Terrorist this round
-                        t_color = random.choice([(255,0,0), (0,0,255)])
-                        if t_color == (255,0,0):
-                            red_team = make_team(50,200,(255,0,0),5, side='T', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                            blue_team = make_team(600,750,(0,0,255),5, side='CT', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                        else:
-                            red_team = make_team(50,200,(255,0,0),5, side='CT', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                            blue_team = make_team(600,750,(0,0,255),5, side='T', sprite_red=sprite_red, sprite_green=sprite_green, weapon_ak=weapon_ak, weapon_m4=weapon_m4, sounds=sounds, screen_h=screen_h)
-                        bullets.clear(); grenades.clear(); particles.clear(); crates.clear()
-                        # reset bomb for normal rounds; place site on CT spawn and give bomb to a T soldier
-                        try:
-                            if (red_team and getattr(red_team[0], 'side', None) == 'CT'):
-                                bomb_site = pygame.Rect(20, screen_h//2 - 48, 96, 96)
-                            else:
-                                bomb_site = pygame.Rect(screen_w-20-96, screen_h//2 - 48, 96, 96)
-                            bomb['site_rect'] = bomb_site
-                            bomb['planted'] = False; bomb['planted_by'] = None; bomb['carried_by'] = None
-                            t_candidates = [s for s in (red_team + blue_team) if getattr(s, 'side', None) == 'T']
-                            if t_candidates:
-                                carrier = random.choice(t_candidates)
-                                carrier.carrying_bomb = True
-                                bomb['carried_by'] = carrier
-                        except Exception:
-                            bomb['carried_by'] = None; bomb['planted'] = False; bomb['planted_by'] = None; bomb['site_rect'] = None
-                        round_state = 1
-
-        # camera shake decay
-        if camera_shake>0:
-            camera_shake = max(0, camera_shake-1)
-
-        # draw
-        screen.fill((50,50,50))
-        shake_x = random.randint(-camera_shake, camera_shake)
-        shake_y = random.randint(-camera_shake, camera_shake)
-
-        # draw a visible map border so the playable area is clear
-        try:
-            # compute inset based on the largest soldier radius so the border matches clamping
-            all_soldiers = red_team + blue_team
-            default_inset = 10
-            if all_soldiers:
-                max_radius = max(getattr(s, 'radius', default_inset) for s in all_soldiers)
-            else:
-                max_radius = default_inset
-            # inset equals pawn radius so clamp matches exactly
-            border_inset = int(max_radius)
-            # draw a 1px inner rect showing playable/clamped area exactly
-            inner_left = border_inset
-            inner_top = border_inset
-            inner_w = max(0, screen_w - border_inset*2)
-            inner_h = max(0, screen_h - border_inset*2)
-            try:
-                color = (255, 120, 50)
-                rect = pygame.Rect(inner_left, inner_top, inner_w, inner_h)
-                # draw an inner rect border (1 px). Using rect fixes asymmetric off-by-one issues.
-                pygame.draw.rect(screen, color, rect, 1)
-            except Exception:
-                pass
-        except Exception:
-            pass
-        for c in covers: c.draw(screen)
-        for s in red_team + blue_team: s.draw(screen)
-        for b in bullets: b.draw(screen)
-        for g in grenades: g.draw(screen)
-        for p in particles: p.draw(screen)
-        # draw explosion animations (if frames available)
-        if explosion_frames:
-            for ea in explosion_anims:
-                fi = ea['frame']
-                if 0 <= fi < len(explosion_frames):
-                    img = explosion_frames[fi]
-                    try:
-                        rect = img.get_rect(center=(int(ea['x']), int(ea['y'])))
-                        screen.blit(img, rect)
-                    except Exception:
-                        pass
-        # draw image particles
-        for ip in image_particles:
-            try:
-                img = ip['img']
-                # scale and rotate per-particle
-                try:
-                    w,h = img.get_size()
-                    tw = max(4, int(w * ip['scale']))
-                    th = max(4, int(h * ip['scale']))
-                    srf = pygame.transform.smoothscale(img, (tw, th))
-                except Exception:
-                    srf = img
-                srf = pygame.transform.rotate(srf, ip['rot'])
-                r = srf.get_rect(center=(int(ip['x']), int(ip['y'])))
-                screen.blit(srf, r)
-            except Exception:
-                pass
-
-        for cr in crates: cr.draw(screen)
-        # draw bomb indicators & carrier visuals (delegated to bomb module)
-        try:
-            draw_bomb(screen, bomb, bomb_img)
-        except Exception:
-            pass
 
-        # draw HUD and overlays via ui module (centralizes HUD code)
-        try:
-            fonts = {'_default_font': _default_font, '_small_font': _small_font, '_ammo_font': _ammo_font, '_title_font': _title_font}
-            state = {'screen_w': screen_w, 'screen_h': screen_h, 'mode': mode, 'round_state': round_state, 'rounds': rounds, 'kill_feed': kill_feed, 'explosion_frames': explosion_frames, 'generic_images': generic_images, 'explosion_anims': explosion_anims, 'image_particles': image_particles, 'player': player, 'death_text_timer': death_text_timer, 'hit_marks': hit_marks}
-            draw_hud(screen, fonts, state)
-        except Exception:
-            pass
+        accumulator = min(accumulator, step_ms * MAX_STEPS_PER_FRAME)
+        while accumulator >= step_ms:
+            world.step(step_scale, controls)
+            if recorder is not None:
+                recorder.record(controls)
+            accumulator -= step_ms
 
+        draw_world(screen, world, fonts, bomb_img, alpha=accumulator / step_ms)
         pygame.display.flip()
 
+    _save_replay(recorder, world)
     pygame.quit()
 
 if __name__ == '__main__':
@@ -0,0 +1,225 @@
+"""Navigation grid and A* pathfinding around covers.
+
+NavGrid rasterizes the covers of a map into NAV_CELL px cells; a cell is
+blocked if any cover touches it. Soldiers only ask for a route when their
+direct step toward a target runs into a cover, and follow the next cell of
+the route instead of retrying shorter steps against the same wall.
+
+Routes are cached by (start cell, goal cell). Every cell on a found route
+also gets its suffix cached for the same goal, so a soldier walking the
+route hits the cache at each new cell. Covers never move during a map, so
+the cache only goes away with the grid (World builds a new NavGrid when the
+covers list is replaced).
+
+FlowFields holds one Dijkstra distance field per shared objective (the
+dropped bomb, each team's centroid). World moves the goals every
+FLOW_REFRESH_TICKS ticks; a field is only rebuilt when its goal changes
+cell and someone reads it, and any number of soldiers then get their next
+step toward that objective from the field in O(1). Objectives with fewer
+than FLOW_MIN_READERS possible readers get no goal, so small matches stay
+on their A* routes.
+"""
+import heapq
+import math
+from collections import OrderedDict
+
+NAV_CELL = 32
+PATH_CACHE_SIZE = 4096
+FLOW_REFRESH_TICKS = 30
+# an objective gets a shared flow field only when at least this many soldiers may read it;
+# fewer are cheaper on their own cached A* routes
+FLOW_MIN_READERS = 16
+_DIAG = math.sqrt(2.0)
+
+
+class NavGrid:
+    def __init__(self, covers=(), width=1280, height=720, cell=NAV_CELL):
+        self.cell = int(cell)
+        self.nx = max(1, -(-int(width) // self.cell))
+        self.ny = max(1, -(-int(height) // self.cell))
+        blocked = bytearray(self.nx * self.ny)
+        for c in covers:
+            r = c.rect
+            for cx in range(max(0, r.left // self.cell), min(self.nx, (r.right - 1) // self.cell + 1)):
+                for cy in range(max(0, r.top // self.cell), min(self.ny, (r.bottom - 1) // self.cell + 1)):
+                    blocked[cy * self.nx + cx] = 1
+        self.blocked = blocked
+        self.cache = OrderedDict()  # (start, goal) -> (route tuple, offset) or None
+        self.searches = 0
+        self.hits = 0
+        # shared per-objective fields (World sets the goals)
+        self.flows = FlowFields(self)
+
+    def cell_of(self, x, y):
+        cx = min(self.nx - 1, max(0, int(x // self.cell)))
+        cy = min(self.ny - 1, max(0, int(y // self.cell)))
+        return cy * self.nx + cx
+
+    def center(self, idx):
+        cy, cx = divmod(idx, self.nx)
+        return (cx + 0.5) * self.cell, (cy + 0.5) * self.cell
+
+    def _neighbours(self, idx):
+        nx, ny, blocked = self.nx, self.ny, self.blocked
+        cy, cx = divmod(idx, nx)
+        for ox, oy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            x = cx + ox; y = cy + oy
+            if 0 <= x < nx and 0 <= y < ny and not blocked[y * nx + x]:
+                yield y * nx + x, 1.0
+        for ox, oy in ((1, 1), (1, -1), (-1, 1), (-1, -1)):
+            x = cx + ox; y = cy + oy
+            # no corner cutting: both side cells must be free too
+            if (0 <= x < nx and 0 <= y < ny and not blocked[y * nx + x]
+                    and not blocked[cy * nx + x] and not blocked[y * nx + cx]):
+                yield y * nx + x, _DIAG
+
+    def _search(self, start, goal):
+        """A* from start to goal cell (both treated as walkable); tuple of cells or None."""
+        self.searches += 1
+        nx = self.nx
+        gy, gx = divmod(goal, nx)
+        goal_blocked = self.blocked[goal]
+
+        def h(i):
+            y, x = divmod(i, nx)
+            ddx = abs(x - gx); ddy = abs(y - gy)
+            return max(ddx, ddy) + (_DIAG - 1.0) * min(ddx, ddy)
+
+        came = {start: None}
+        cost = {start: 0.0}
+        heap = [(h(start), 0, start)]
+        tie = 0
+        while heap:
+            _, _, cur = heapq.heappop(heap)
+            if cur == goal:
+                route = []
+                while cur is not None:
+                    route.append(cur)
+                    cur = came[cur]
+                route.reverse()
+                return tuple(route)
+            g = cost[cur]
+            for nb, step in self._neighbours(cur):
+                ng = g + step
+                if ng < cost.get(nb, math.inf):
+                    cost[nb] = ng
+                    came[nb] = cur
+                    tie += 1
+                    heapq.heappush(heap, (ng + h(nb), tie, nb))
+            # the goal may sit in a blocked cell (targets hug covers); step into it from a neighbour
+            cy, cx = divmod(cur, nx)
+            if goal_blocked and abs(cx - gx) <= 1 and abs(cy - gy) <= 1 and goal not in cost:
+                cost[goal] = g + (1.0 if cx == gx or cy == gy else _DIAG)
+                came[goal] = cur
+                tie += 1
+                heapq.heappush(heap, (cost[goal], tie, goal))
+        return None
+
+    def route(self, start, goal):
+        """Cells from start to goal (inclusive) as (route, offset), or None if unreachable."""
+        key = (start, goal)
+        cache = self.cache
+        if key in cache:
+            self.hits += 1
+            cache.move_to_end(key)
+            return cache[key]
+        found = self._search(start, goal)
+        if found is None:
+            cache[key] = None
+        else:
+            for k, c in enumerate(found[:-1]):
+                if (c, goal) not in cache:
+                    cache[(c, goal)] = (found, k)
+        while len(cache) > PATH_CACHE_SIZE:
+            cache.popitem(last=False)
+        return cache.get(key)
+
+    def waypoint(self, x, y, tx, ty):
+        """Centre of the next cell on the route from (x, y) toward (tx, ty), or None."""
+        start = self.cell_of(x, y)
+        goal = self.cell_of(tx, ty)
+        if start == goal:
+            return None
+        found = self.route(start, goal)
+        if found is None:
+            return None
+        route, k = found
+        return self.center(route[k + 1])
+
+
+class FlowField:
+    """Distance from every cell to one goal cell over a NavGrid, plus memoized next steps."""
+
+    def __init__(self, nav, goal):
+        self.nav = nav
+        self.goal = goal
+        dist = [math.inf] * len(nav.blocked)
+        dist[goal] = 0.0
+        heap = [(0.0, goal)]
+        while heap:
+            d, cur = heapq.heappop(heap)
+            if d > dist[cur]:
+                continue
+            for nb, step in nav._neighbours(cur):
+                nd = d + step
+                if nd < dist[nb]:
+                    dist[nb] = nd
+                    heapq.heappush(heap, (nd, nb))
+        self.dist = dist
+        self._next = {}
+
+    def waypoint(self, x, y, tx=None, ty=None):
+        """Centre of the next cell downhill toward the goal from (x, y), or None
+        (same signature as NavGrid.waypoint; the target is the field's goal)."""
+        nav = self.nav
+        c = nav.cell_of(x, y)
+        if c == self.goal:
+            return None
+        nxt = self._next.get(c)
+        if nxt is None:
+            best = math.inf
+            dist = self.dist
+            for nb, step in nav._neighbours(c):
+                if dist[nb] + step < best:
+                    best = dist[nb] + step
+                    nxt = nb
+            # blocked goal cells are only reachable as the source itself
+            gy, gx = divmod(self.goal, nav.nx)
+            cy, cx = divmod(c, nav.nx)
+            if nxt is None and abs(cx - gx) <= 1 and abs(cy - gy) <= 1:
+                nxt = self.goal
+            self._next[c] = nxt if nxt is not None else -1
+        if nxt is None or nxt < 0:
+            return None
+        return nav.center(nxt)
+
+
+class FlowFields:
+    """Named objectives on one NavGrid; fields are built lazily and kept while the goal cell holds."""
+
+    def __init__(self, nav):
+        self.nav = nav
+        self.goals = {}   # name -> goal cell
+        self.fields = {}  # name -> FlowField for goals[name]
+        self.builds = 0
+
+    def set_goal(self, name, x, y):
+        if x is None or y is None:
+            self.goals.pop(name, None)
+            self.fields.pop(name, None)
+            return
+        cell = self.nav.cell_of(x, y)
+        if self.goals.get(name) != cell:
+            self.goals[name] = cell
+            self.fields.pop(name, None)
+
+    def get(self, name):
+        """FlowField toward objective name, or None if it has no goal."""
+        field = self.fields.get(name)
+        if field is None:
+            goal = self.goals.get(name)
+            if goal is None:
+                return None
+            field = self.fields[name] = FlowField(self.nav, goal)
+            self.builds += 1
+        return field
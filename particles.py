@@ -0,0 +1,114 @@
+"""Vectorized particle system.
+
+ParticlePool stores particles in fixed-capacity NumPy arrays, in slots
+[0, used). Integration, drag and life decay run as whole-array operations
+over that range only (drag factor computed once per frame). Once enough of
+it is dead the survivors are packed to the front, keeping emission order, so
+the cost follows the live count rather than the busiest moment so far. New
+particles take the next slot after used, then dead slots; only when every
+slot is live is the oldest particle overwritten.
+"""
+import numpy as np
+import pygame
+
+PARTICLE_CAPACITY = 20000
+# per-frame velocity multiplier at FRAME_SCALE 1.0 (gentle drag)
+PARTICLE_DRAG = 0.98
+# update() packs the live particles to the front once this share of the used slots is dead
+PARTICLE_COMPACT_SHARE = 0.25
+
+
+class ParticlePool:
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = int(capacity)
+        cap = self.capacity
+        self.x = np.zeros(cap)
+        self.y = np.zeros(cap)
+        self.vx = np.zeros(cap)
+        self.vy = np.zeros(cap)
+        self.life = np.zeros(cap)
+        self.color = np.zeros((cap, 3), dtype=np.uint8)
+        self.radius = np.zeros(cap, dtype=np.int16)
+        self.used = 0   # slots [0, used) hold the particles, live or dead
+        self.head = 0   # next slot to overwrite while every slot is in use
+        self._free = None  # dead slots below used (found when the pool is full), next one at _free_at
+        self._free_at = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.life[:self.used] > 0))
+
+    def __bool__(self):
+        return self.used > 0 and bool((self.life[:self.used] > 0).any())
+
+    def emit(self, x, y, vx, vy, life, color, radius=2):
+        """Spawn one particle (same arguments as game_core.Particle)."""
+        if self.used < self.capacity:
+            i = self.used
+            self.used += 1
+        else:
+            i = self._free_slot()
+            if i is None:
+                i = self.head
+                self.head = (i + 1) % self.capacity
+        self.x[i] = x; self.y[i] = y
+        self.vx[i] = vx; self.vy[i] = vy
+        self.life[i] = life
+        self.color[i] = color
+        self.radius[i] = radius
+
+    def _free_slot(self):
+        if self._free is None:
+            self._free = np.flatnonzero(self.life[:self.used] <= 0)
+            self._free_at = 0
+        if self._free_at < len(self._free):
+            i = int(self._free[self._free_at])
+            self._free_at += 1
+            return i
+        return None
+
+    def append(self, p):
+        """Adopt a game_core.Particle."""
+        self.emit(p.x, p.y, p.vx, p.vy, p.life, p.color, p.radius)
+
+    def clear(self):
+        self.life[:self.used] = 0.0
+        self.head = 0
+        self.used = 0
+        self._free = None
+
+    def update(self, frame_scale=1.0):
+        n = self.used
+        if n == 0:
+            return
+        drag = PARTICLE_DRAG ** frame_scale
+        x, y, vx, vy, life = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n], self.life[:n]
+        x += vx * frame_scale
+        y += vy * frame_scale
+        vx *= drag
+        vy *= drag
+        life -= frame_scale
+        self._free = None
+        alive = life > 0
+        k = int(np.count_nonzero(alive))
+        if n - k >= n * PARTICLE_COMPACT_SHARE:
+            # pack the survivors to the front, in order, so later updates only touch them
+            live = np.flatnonzero(alive)
+            for a in (self.x, self.y, self.vx, self.vy, self.life, self.color, self.radius):
+                a[:k] = a[live]
+            self.used = k
+            self.head = 0
+
+    def alive(self):
+        return np.flatnonzero(self.life[:self.used] > 0)
+
+    def draw(self, screen):
+        idx = self.alive()
+        if len(idx) == 0:
+            return
+        xs = self.x[idx].astype(np.int32).tolist()
+        ys = self.y[idx].astype(np.int32).tolist()
+        rs = self.radius[idx].tolist()
+        cs = [tuple(c) for c in self.color[idx].tolist()]
+        circle = pygame.draw.circle
+        for x, y, r, c in zip(xs, ys, rs, cs):
+            circle(screen, c, (x, y), r)
@@ -0,0 +1,319 @@
+"""Struct-of-arrays bullet storage.
+
+BulletPool keeps every live bullet in parallel NumPy arrays (x, y, vx, vy,
+damage, team, owner id). Integration and offscreen culling are single array
+operations and removals use swap-remove compaction, so cost no longer grows
+with per-object Python overhead. Slots [0, n) are live.
+
+Hits are swept: each bullet is tested as the segment it travelled this
+step (prev_x, prev_y) -> (x, y), so big steps cannot tunnel through thin
+covers or soldiers.
+
+"Threat nearby" queries (Soldier.dodge_bullets) go through a ThreatIndex,
+a grid over the bullets built once THREAT_BUILD_AFTER queries came in
+since they last moved. A query looks at the few cells around the soldier
+instead of every bullet.
+Bullets fired after the build (later in the same AI phase) are checked
+directly. Pools of at most THREAT_LIST_MAX bullets are scanned as plain
+lists instead.
+"""
+import math
+
+import numpy as np
+import pygame
+
+BULLET_SPEED = 7.0
+BULLET_RADIUS = 3
+THREAT_CELL = 64
+# the first this many threat queries after bullets move test every bullet with one array
+# op; the index is only built once enough queries (soldiers) share it
+THREAT_BUILD_AFTER = 64
+# up to this many live bullets, threat queries scan plain lists instead (no array op per query)
+THREAT_LIST_MAX = 16
+# cell coordinates are offset so slightly offscreen bullets still hash to distinct keys
+_THREAT_OFFSET = 1 << 15
+_THREAT_STRIDE = 1 << 16
+
+
+def rect_array(covers):
+    """(k, 4) float array of cover left, top, right, bottom edges."""
+    if not covers:
+        return np.empty((0, 4))
+    return np.array([(c.rect.left, c.rect.top, c.rect.right, c.rect.bottom) for c in covers], dtype=np.float64)
+
+
+def segment_circle_t(x0, y0, dx, dy, cx, cy, r):
+    """First t in [0, 1] where (x0, y0) + t * (dx, dy) comes within r of (cx, cy), else inf.
+
+    Works elementwise on broadcastable arrays; a segment starting inside the circle gives 0.
+    """
+    fx = x0 - cx; fy = y0 - cy
+    a = dx * dx + dy * dy
+    b = fx * dx + fy * dy
+    c = fx * fx + fy * fy - r * r
+    disc = b * b - a * c
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+    hit = (disc >= 0) & (a > 0) & (t >= 0) & (t <= 1)
+    return np.where(c < 0, 0.0, np.where(hit, t, np.inf))
+
+
+class ThreatIndex:
+    """Grid over the first n bullets of a pool as of one moment (pool.threat_index())."""
+
+    def __init__(self, pool, cell=THREAT_CELL):
+        n = self.n = pool.n
+        self.cell = float(cell)
+        cx = np.floor_divide(pool.x[:n], self.cell).astype(np.int64) + _THREAT_OFFSET
+        cy = np.floor_divide(pool.y[:n], self.cell).astype(np.int64) + _THREAT_OFFSET
+        keys = cx * _THREAT_STRIDE + cy
+        # stable sort keeps pool order inside a cell
+        order = np.argsort(keys, kind='stable')
+        uniq, start = np.unique(keys[order], return_index=True)
+        self.cells = {k: b.tolist() for k, b in zip(uniq.tolist(), np.split(order, start[1:]))}
+        self.x = pool.x[:n].tolist(); self.y = pool.y[:n].tolist()
+        self.vx = pool.vx[:n].tolist(); self.vy = pool.vy[:n].tolist()
+
+
+class BulletPool:
+    """All live bullets of a match.
+
+    Teams and owners are stored as small integer ids; colors and owner objects
+    live in registries so the arrays stay numeric.
+    """
+
+    radius = BULLET_RADIUS
+
+    def __init__(self, capacity=256):
+        self.n = 0
+        self._alloc(max(16, int(capacity)))
+        self.colors = []        # team id -> color tuple
+        self._team_ids = {}     # color tuple -> team id
+        self.owners = [None]    # owner id -> Soldier (0 == no owner)
+        self._owner_ids = {}    # id(Soldier) -> owner id
+        self._threat = None     # ThreatIndex, dropped whenever bullets move or are removed
+        self._threat_queries = 0
+        self._threat_rows = None  # plain (x, y, vx, vy) rows for small pools, dropped with it
+
+    def _alloc(self, cap):
+        self.x = np.zeros(cap)
+        self.y = np.zeros(cap)
+        self.vx = np.zeros(cap)
+        self.vy = np.zeros(cap)
+        self.prev_x = np.zeros(cap)
+        self.prev_y = np.zeros(cap)
+        self.damage = np.zeros(cap, dtype=np.int32)  # integer damage, like Soldier.damage
+        self.team = np.zeros(cap, dtype=np.int8)
+        self.owner = np.zeros(cap, dtype=np.int32)
+
+    def _grow(self):
+        old = (self.x, self.y, self.vx, self.vy, self.prev_x, self.prev_y, self.damage, self.team, self.owner)
+        self._alloc(len(self.x) * 2)
+        for dst, src in zip((self.x, self.y, self.vx, self.vy, self.prev_x, self.prev_y, self.damage, self.team, self.owner), old):
+            dst[:self.n] = src[:self.n]
+
+    def __len__(self):
+        return self.n
+
+    def __bool__(self):
+        return self.n > 0
+
+    def team_id(self, color):
+        tid = self._team_ids.get(color)
+        if tid is None:
+            tid = len(self.colors)
+            self.colors.append(color)
+            self._team_ids[color] = tid
+        return tid
+
+    def _owner_id(self, owner):
+        if owner is None:
+            return 0
+        oid = self._owner_ids.get(id(owner))
+        if oid is None or self.owners[oid] is not owner:
+            oid = len(self.owners)
+            self.owners.append(owner)
+            self._owner_ids[id(owner)] = oid
+        return oid
+
+    def owner_of(self, i):
+        return self.owners[int(self.owner[i])]
+
+    def spawn(self, x, y, tx, ty, color, damage=10, owner=None):
+        """Fire a bullet from (x, y) toward (tx, ty); same kinematics as game_core.Bullet."""
+        dx = float(tx) - float(x)
+        dy = float(ty) - float(y)
+        dist = math.hypot(dx, dy) or 1.0
+        self._push(float(x), float(y), dx / dist * BULLET_SPEED, dy / dist * BULLET_SPEED, color, damage, owner)
+
+    def append(self, bullet):
+        """Adopt a game_core.Bullet (so code that builds Bullet objects keeps working)."""
+        self._push(bullet.x, bullet.y, bullet.vx, bullet.vy, bullet.color, bullet.damage, bullet.owner)
+
+    def _push(self, x, y, vx, vy, color, damage, owner):
+        if self.n >= len(self.x):
+            self._grow()
+        i = self.n
+        self.x[i] = x; self.y[i] = y
+        self.prev_x[i] = x; self.prev_y[i] = y
+        self.vx[i] = vx; self.vy[i] = vy
+        self.damage[i] = damage
+        self.team[i] = self.team_id(color)
+        self.owner[i] = self._owner_id(owner)
+        self.n += 1
+
+    def clear(self):
+        self.n = 0
+        self._drop_threats()
+        self.owners = [None]
+        self._owner_ids = {}
+
+    def store_previous(self):
+        n = self.n
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def update(self, frame_scale=1.0):
+        n = self.n
+        self.x[:n] += self.vx[:n] * frame_scale
+        self.y[:n] += self.vy[:n] * frame_scale
+        self._drop_threats()
+
+    def offscreen_mask(self, w, h):
+        x = self.x[:self.n]; y = self.y[:self.n]
+        return (x < 0) | (x > w) | (y < 0) | (y > h)
+
+    def remove(self, idx):
+        """Swap-remove the bullets at indices idx (any order, no duplicates).
+
+        Holes below the new length are filled from surviving bullets at the
+        tail, so only len(idx) slots are moved.
+        """
+        idx = np.asarray(idx, dtype=np.intp)
+        k = len(idx)
+        if k == 0:
+            return
+        m = self.n - k
+        dead = np.zeros(self.n, dtype=bool)
+        dead[idx] = True
+        holes = np.flatnonzero(dead[:m])
+        fillers = m + np.flatnonzero(~dead[m:])
+        for a in (self.x, self.y, self.vx, self.vy, self.prev_x, self.prev_y, self.damage, self.team, self.owner):
+            a[holes] = a[fillers]
+        self.n = m
+        self._drop_threats()
+
+    def segments(self):
+        """(x0, y0, dx, dy) of the path each live bullet travelled this step."""
+        n = self.n
+        x0 = self.prev_x[:n]; y0 = self.prev_y[:n]
+        return x0, y0, self.x[:n] - x0, self.y[:n] - y0
+
+    def sweep_rects(self, rects):
+        """Per live bullet, the first t in [0, 1] at which its path touches any closed
+        (left, top, right, bottom) rect, or inf."""
+        n = self.n
+        out = np.full(n, np.inf)
+        if n == 0 or len(rects) == 0:
+            return out
+        x0, y0, dx, dy = self.segments()
+        x1 = x0 + dx; y1 = y0 + dy
+        # broad phase: only paths whose bounding box overlaps a rect need the slab test
+        bi, ri = np.nonzero((np.minimum(x0, x1)[:, None] <= rects[:, 2]) & (np.maximum(x0, x1)[:, None] >= rects[:, 0])
+                            & (np.minimum(y0, y1)[:, None] <= rects[:, 3]) & (np.maximum(y0, y1)[:, None] >= rects[:, 1]))
+        if len(bi) == 0:
+            return out
+        t0 = np.zeros(len(bi))
+        t1 = np.ones(len(bi))
+        # slab test per axis; inside the bounding box a path parallel to an axis is within that slab
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for p0, d, lo, hi in ((x0[bi], dx[bi], rects[ri, 0], rects[ri, 2]), (y0[bi], dy[bi], rects[ri, 1], rects[ri, 3])):
+                ta = (lo - p0) / d
+                tb = (hi - p0) / d
+                moving = d != 0
+                t0 = np.where(moving, np.maximum(t0, np.minimum(ta, tb)), t0)
+                t1 = np.where(moving, np.minimum(t1, np.maximum(ta, tb)), t1)
+        hit = t0 <= t1
+        np.minimum.at(out, bi[hit], t0[hit])
+        return out
+
+    def _drop_threats(self):
+        # bullets moved or were removed: the index no longer matches the arrays
+        self._threat = None
+        self._threat_queries = 0
+        self._threat_rows = None
+
+    def threat_index(self):
+        """ThreatIndex over the live bullets (built on first use after they last moved)."""
+        if self._threat is None:
+            self._threat = ThreatIndex(self)
+        return self._threat
+
+    def threats(self, x, y, r, approaching=True):
+        """Indices (ascending) of live bullets closer than r to (x, y); with approaching,
+        only those whose velocity points toward (x, y)."""
+        n = self.n
+        if n == 0:
+            return []
+        r2 = r * r
+        if n <= THREAT_LIST_MAX:
+            rows = self._threat_rows
+            if rows is None or len(rows) != n:
+                # (x, y, vx, vy) per bullet; new bullets only append, anything else drops the rows
+                rows = self._threat_rows = list(zip(self.x[:n].tolist(), self.y[:n].tolist(),
+                                                    self.vx[:n].tolist(), self.vy[:n].tolist()))
+            out = []
+            for i, (bx, by, bvx, bvy) in enumerate(rows):
+                dx = x - bx; dy = y - by
+                if dx * dx + dy * dy < r2 and (not approaching or dx * bvx + dy * bvy > 0):
+                    out.append(i)
+            return out
+        if self._threat is None and self._threat_queries < THREAT_BUILD_AFTER:
+            self._threat_queries += 1
+            dx = x - self.x[:n]; dy = y - self.y[:n]
+            near = np.flatnonzero(dx * dx + dy * dy < r2)
+            if approaching and len(near):
+                near = near[dx[near] * self.vx[near] + dy[near] * self.vy[near] > 0]
+            return near.tolist()
+        index = self.threat_index()
+        bx, by, bvx, bvy, cells, cell = index.x, index.y, index.vx, index.vy, index.cells, index.cell
+        out = []
+        cy0 = int((y - r) // cell) + _THREAT_OFFSET
+        cy1 = int((y + r) // cell) + _THREAT_OFFSET
+        for cx in range(int((x - r) // cell) + _THREAT_OFFSET, int((x + r) // cell) + _THREAT_OFFSET + 1):
+            for key in range(cx * _THREAT_STRIDE + cy0, cx * _THREAT_STRIDE + cy1 + 1):
+                bucket = cells.get(key)
+                if bucket is None:
+                    continue
+                for i in bucket:
+                    dx = x - bx[i]; dy = y - by[i]
+                    if dx * dx + dy * dy < r2 and (not approaching or dx * bvx[i] + dy * bvy[i] > 0):
+                        out.append(i)
+        # bullets fired since the index was built
+        for i in range(index.n, n):
+            dx = x - float(self.x[i]); dy = y - float(self.y[i])
+            if dx * dx + dy * dy < r2 and (not approaching or dx * float(self.vx[i]) + dy * float(self.vy[i]) > 0):
+                out.append(i)
+        out.sort()
+        return out
+
+    def first_threat(self, x, y, r, approaching=True):
+        """Position of the first bullet (pool order) that threats() would return, or None."""
+        found = self.threats(x, y, r, approaching)
+        if not found:
+            return None
+        i = found[0]
+        return float(self.x[i]), float(self.y[i])
+
+    def draw(self, screen, alpha=1.0):
+        n = self.n
+        if n == 0:
+            return
+        if alpha < 1.0:
+            xs = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha
+            ys = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha
+        else:
+            xs = self.x[:n]; ys = self.y[:n]
+        colors = self.colors
+        for x, y, t in zip(xs.astype(np.int32).tolist(), ys.astype(np.int32).tolist(), self.team[:n].tolist()):
+            pygame.draw.circle(screen, colors[t], (x, y), BULLET_RADIUS)
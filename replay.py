@@ -0,0 +1,213 @@
+"""Compact binary match replays.
+
+A replay stores only what World needs to re-simulate a match: the seed, the
+map covers (to detect a changed map generator) and the player input of every
+logic tick. Identical consecutive inputs are run-length encoded and the input
+stream is zlib-compressed, so a whole match is a few KB.
+
+Layout (little endian):
+    header   '<4sBQHHBBBH'  magic, version, seed, width, height, mode, logic_hz, best_of, n_covers
+    covers   '<hhhh' * n_covers
+    body     '<I' length + zlib('<HBhh' * runs)   run length, input bits, mouse x, mouse y
+    trailer  '<IBBI'         total ticks, red rounds, blue rounds, World.state_digest() (verifies playback)
+
+Debug keys (sandbox spawns, bomb cheats) and window resizes are not recorded,
+so only matches played without them replay exactly.
+
+    python replay.py replays/<file>.sgr --headless --profile
+"""
+import argparse
+import os
+import struct
+import time
+import zlib
+
+MAGIC = b'SGRP'
+VERSION = 1
+HEADER = struct.Struct('<4sBQHHBBBH')
+COVER = struct.Struct('<hhhh')
+RUN = struct.Struct('<HBhh')
+LENGTH = struct.Struct('<I')
+TRAILER = struct.Struct('<IBBI')
+
+MODES = ['play', 'simulation', 'sandbox', 'battle']
+# bit order of the per-tick input byte
+INPUT_BITS = ('up', 'down', 'left', 'right', 'reload', 'fire')
+MAX_RUN = 0xFFFF
+
+
+def pack_controls(controls):
+    """Reduce a main.read_controls() dict to (bits, mx, my)."""
+    if not controls:
+        return (0, 0, 0)
+    bits = 0
+    for i, name in enumerate(INPUT_BITS):
+        if controls.get(name):
+            bits |= 1 << i
+    return (bits, int(controls.get('mx', 0)), int(controls.get('my', 0)))
+
+
+def unpack_controls(bits, mx, my):
+    controls = {name: bool(bits & (1 << i)) for i, name in enumerate(INPUT_BITS)}
+    controls['mx'] = mx
+    controls['my'] = my
+    return controls
+
+
+class ReplayRecorder:
+    """Collects per-tick input for one match. Call record() once per World.step()."""
+
+    def __init__(self, world, logic_hz=60):
+        self.seed = world.seed
+        self.width = world.width
+        self.height = world.height
+        self.mode = world.mode
+        self.best_of = world.best_of
+        self.logic_hz = logic_hz
+        self.covers = [tuple(c.rect) for c in world.covers]
+        self.runs = []  # [count, bits, mx, my]
+        self.ticks = 0
+
+    def record(self, controls):
+        rec = pack_controls(controls)
+        self.ticks += 1
+        if self.runs:
+            last = self.runs[-1]
+            if last[0] < MAX_RUN and (last[1], last[2], last[3]) == rec:
+                last[0] += 1
+                return
+        self.runs.append([1, rec[0], rec[1], rec[2]])
+
+    def to_bytes(self, world=None):
+        out = [HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height, MODES.index(self.mode),
+                           self.logic_hz, self.best_of, len(self.covers))]
+        out.extend(COVER.pack(*r) for r in self.covers)
+        body = zlib.compress(b''.join(RUN.pack(*r) for r in self.runs), 9)
+        out.append(LENGTH.pack(len(body)))
+        out.append(body)
+        rounds = world.rounds if world is not None else {'red': 0, 'blue': 0}
+        digest = world.state_digest() if world is not None else 0
+        out.append(TRAILER.pack(self.ticks, rounds.get('red', 0), rounds.get('blue', 0), digest))
+        return b''.join(out)
+
+    def save(self, path, world=None):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes(world))
+        return path
+
+
+class Replay:
+    """A decoded replay: header fields, covers and the expanded per-tick inputs."""
+
+    def __init__(self, data):
+        (magic, version, self.seed, self.width, self.height, mode, self.logic_hz,
+         self.best_of, n_covers) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a replay file (or unsupported version)')
+        self.mode = MODES[mode]
+        off = HEADER.size
+        self.covers = []
+        for _ in range(n_covers):
+            self.covers.append(COVER.unpack_from(data, off))
+            off += COVER.size
+        (n,) = LENGTH.unpack_from(data, off)
+        off += LENGTH.size
+        body = zlib.decompress(data[off:off + n])
+        off += n
+        self.ticks, red, blue, self.digest = TRAILER.unpack_from(data, off)
+        self.rounds = {'red': red, 'blue': blue}
+        self.runs = [RUN.unpack_from(body, i) for i in range(0, len(body), RUN.size)]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def inputs(self):
+        """Yield one controls dict per recorded tick."""
+        for count, bits, mx, my in self.runs:
+            controls = unpack_controls(bits, mx, my)
+            for _ in range(count):
+                yield controls
+
+    def make_world(self, **kwargs):
+        """Build a World in the recorded starting state; warns if the map differs.
+        Explosion images are not needed: they only feed World.fx_rng, never the match."""
+        from simulation import World
+        world = World(self.width, self.height, best_of=self.best_of, seed=self.seed, verbose=False, **kwargs)
+        world.start(self.mode)
+        if [tuple(c.rect) for c in world.covers] != [tuple(c) for c in self.covers]:
+            print('REPLAY: warning - regenerated covers differ from the recording; playback will diverge')
+        return world
+
+
+def play(path, speed=1.0, headless=False):
+    """Re-simulate a replay. headless steps as fast as possible; otherwise a window
+    renders it at `speed` times real time. Returns the final World."""
+    from simulation import init_headless
+    rep = Replay.load(path)
+    if headless:
+        init_headless()
+        world = rep.make_world()
+        for controls in rep.inputs():
+            world.step(60.0 / rep.logic_hz, controls)
+    else:
+        import pygame
+        from main import draw_world
+        pygame.init()
+        screen = pygame.display.set_mode((rep.width, rep.height))
+        pygame.display.set_caption(f'Replay {os.path.basename(path)} x{speed:g}')
+        fonts = {'_default_font': pygame.font.SysFont(None, 20), '_small_font': pygame.font.SysFont(None, 18),
+                 '_ammo_font': pygame.font.SysFont(None, 22), '_title_font': pygame.font.SysFont(None, 64)}
+        world = rep.make_world()
+        clock = pygame.time.Clock()
+        step_ms = 1000.0 / rep.logic_hz / max(speed, 1e-6)
+        acc = 0.0
+        inputs = rep.inputs()
+        done = False
+        while not done:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    done = True
+            acc += clock.tick(144)
+            while acc >= step_ms and not done:
+                acc -= step_ms
+                controls = next(inputs, None)
+                if controls is None:
+                    done = True
+                    break
+                world.step(60.0 / rep.logic_hz, controls)
+            draw_world(screen, world, fonts)
+            pygame.display.flip()
+        pygame.quit()
+    if world.tick == rep.ticks and world.state_digest() == rep.digest:
+        print(f'REPLAY: verified {world.tick} ticks, rounds {world.rounds}')
+    else:
+        print(f'REPLAY: finished at tick {world.tick} rounds {world.rounds} (recorded {rep.ticks} ticks, rounds {rep.rounds})')
+    return world
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Play back a recorded match.')
+    ap.add_argument('path')
+    ap.add_argument('--speed', type=float, default=1.0, help='playback speed multiplier (windowed)')
+    ap.add_argument('--headless', action='store_true', help='re-simulate without a window as fast as possible')
+    ap.add_argument('--profile', action='store_true', help='run under cProfile and print the hottest functions')
+    args = ap.parse_args(argv)
+    if args.profile:
+        import cProfile
+        import pstats
+        prof = cProfile.Profile()
+        prof.runcall(play, args.path, args.speed, args.headless)
+        pstats.Stats(prof).sort_stats('cumulative').print_stats(25)
+    else:
+        t0 = time.perf_counter()
+        play(args.path, args.speed, args.headless)
+        print(f'REPLAY: {time.perf_counter() - t0:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Batch runner for AI-only Simulation matches.
+
+Shards matches across a ProcessPoolExecutor (one interpreter per core, so the
+GIL does not serialize the work) and aggregates win rates per side (T/CT),
+per role composition and the average round length.
+
+    python -m sim_batch --matches 10000 --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# 60 logic ticks == one second of game time (FRAME_SCALE 1.0)
+TICKS_PER_SECOND = 60
+
+
+def _init_worker():
+    # headless SDL and no per-soldier spawn/debug logging from the workers
+    from simulation import init_headless
+    init_headless()
+    sys.stdout = open(os.devnull, 'w')
+
+
+def run_match(seed, width=1280, height=720, best_of=5, max_ticks=200000, think_hz=None):
+    """Step one display-free match and return a picklable summary."""
+    from simulation import World
+    world = World(width, height, best_of=best_of, verbose=False, seed=seed, think_hz=think_hz)
+    world.start('simulation')
+    while not world.match_over and world.tick < max_ticks:
+        world.step(1.0)
+    return {
+        'seed': seed,
+        'ticks': world.tick,
+        'finished': world.match_over,
+        'rounds': world.round_results,
+    }
+
+
+def run_chunk(seeds, width, height, best_of, max_ticks, think_hz=None):
+    return [run_match(s, width, height, best_of, max_ticks, think_hz) for s in seeds]
+
+
+def aggregate(results):
+    """Fold match summaries into win rates and round-length statistics."""
+    sides = {'T': {'rounds': 0, 'wins': 0}, 'CT': {'rounds': 0, 'wins': 0}}
+    comps = {}
+    round_ticks = 0
+    n_rounds = 0
+    unfinished = 0
+    for m in results:
+        if not m['finished']:
+            unfinished += 1
+        for r in m['rounds']:
+            n_rounds += 1
+            round_ticks += r['ticks']
+            for team in ('red', 'blue'):
+                side = r.get(team + '_side')
+                won = r['winner'] == team
+                if side in sides:
+                    sides[side]['rounds'] += 1
+                    sides[side]['wins'] += int(won)
+                key = '+'.join(r.get(team + '_roles', []))
+                c = comps.setdefault(key, {'rounds': 0, 'wins': 0})
+                c['rounds'] += 1
+                c['wins'] += int(won)
+    for d in list(sides.values()) + list(comps.values()):
+        d['win_rate'] = d['wins'] / d['rounds'] if d['rounds'] else 0.0
+    avg = round_ticks / n_rounds if n_rounds else 0.0
+    return {
+        'matches': len(results),
+        'unfinished_matches': unfinished,
+        'rounds': n_rounds,
+        'avg_round_ticks': avg,
+        'avg_round_seconds': avg / TICKS_PER_SECOND,
+        'sides': sides,
+        'compositions': dict(sorted(comps.items(), key=lambda kv: -kv[1]['rounds'])),
+    }
+
+
+def run_batch(matches, workers=None, seed=0, chunk=None, width=1280, height=720, best_of=5, max_ticks=200000, think_hz=None):
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + matches))
+    # a few chunks per worker keeps all cores busy without per-match IPC overhead
+    chunk = chunk or max(1, matches // (workers * 4))
+    shards = [seeds[i:i + chunk] for i in range(0, len(seeds), chunk)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(run_chunk, s, width, height, best_of, max_ticks, think_hz) for s in shards]
+        for f in futures:
+            results.extend(f.result())
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Run many headless AI matches in parallel and report balance stats.')
+    ap.add_argument('--matches', type=int, default=100)
+    ap.add_argument('--workers', type=int, default=None, help='processes (default: all cores)')
+    ap.add_argument('--seed', type=int, default=0, help='seed of the first match; match i uses seed+i')
+    ap.add_argument('--chunk', type=int, default=None, help='matches per task')
+    ap.add_argument('--width', type=int, default=1280)
+    ap.add_argument('--height', type=int, default=720)
+    ap.add_argument('--best-of', type=int, default=5)
+    ap.add_argument('--max-ticks', type=int, default=200000, help='give up on a match after this many ticks')
+    ap.add_argument('--think-hz', type=float, default=None, help='AI decision rate (default: every tick)')
+    ap.add_argument('--json', default=None, help='also write the summary to this file')
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    results = run_batch(args.matches, args.workers, args.seed, args.chunk, args.width, args.height, args.best_of, args.max_ticks, args.think_hz)
+    elapsed = time.perf_counter() - t0
+    summary = aggregate(results)
+    summary['elapsed_seconds'] = elapsed
+    summary['matches_per_hour'] = len(results) / elapsed * 3600 if elapsed > 0 else 0.0
+
+    print(f"{summary['matches']} matches ({summary['rounds']} rounds) in {elapsed:.1f}s "
+          f"-> {summary['matches_per_hour']:.0f} matches/hour")
+    for side, d in summary['sides'].items():
+        print(f"  {side:>2}: {d['win_rate'] * 100:5.1f}% of {d['rounds']} rounds")
+    print(f"  avg round: {summary['avg_round_ticks']:.0f} ticks ({summary['avg_round_seconds']:.1f}s game time)")
+    if summary['unfinished_matches']:
+        print(f"  {summary['unfinished_matches']} matches hit --max-ticks")
+    print('  role compositions (win rate / rounds):')
+    for key, d in list(summary['compositions'].items())[:15]:
+        print(f"    {key:<40} {d['win_rate'] * 100:5.1f}% / {d['rounds']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
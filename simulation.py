@@ -0,0 +1,943 @@
+"""Headless match simulation.
+
+`World` owns all of the match state that used to live as locals inside
+`main.main()` (teams, covers, projectiles, crates, bomb, round/score) and
+advances it one frame at a time with `step()`. It never draws and never
+waits on a clock, so it runs under the SDL dummy driver as fast as the CPU
+allows. `main.py` drives the same World for the interactive modes.
+"""
+import os
+import sys
+import math
+import random
+import time
+import zlib
+
+import numpy as np
+import pygame
+
+from game_core import Crate, Soldier, set_screen_size, set_frame_scale
+from helpers import play_sound_obj, spawn_explosion, make_roguelike_covers, make_team
+import game_core
+from bomb import reset_round_bomb
+from projectiles import BulletPool, rect_array, segment_circle_t
+from particles import ParticlePool
+from spatial import CoverField, CoverIndex, SoldierGrid
+from los import LineOfSight
+from visibility import VisibilityTable
+from nav import NavGrid, FLOW_REFRESH_TICKS, FLOW_MIN_READERS
+from snapshot import WorldSnapshot
+
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+# keep only the newest kill feed entries (the HUD only shows a handful)
+KILL_FEED_MAX = 8
+# up to this many live bullets are swept one by one in plain Python instead of as arrays
+BULLET_LIST_MAX = 16
+# bullet x soldier counts up to this are hit-tested as one dense block instead of via the grid
+DENSE_HIT_PAIRS = 32768
+# from this many soldiers, separation/melee switches from the exact sequential pass to the batch solver
+BATCH_SEPARATION_MIN = 64
+# up to this many soldiers the batch solver tests every pair as one dense block instead of via the grid
+DENSE_SEPARATION_MAX = 300
+# from this many soldiers due to think in a tick, decisions come from one WorldSnapshot pass
+SNAPSHOT_THINK_MIN = 12
+# 'battle' mode: a standing stress workload (soldiers per side, role weights, AI think rate)
+BATTLE_TEAM_SIZE = 200
+BATTLE_ROLE_MIX = {'rifle': 4, 'sniper': 1, 'grenadier': 2, 'medic': 2, 'heavy': 1}
+BATTLE_THINK_HZ = 15
+# one logic step should fit into this (ms); battle mode reports how often it does not
+BATTLE_FRAME_BUDGET_MS = 1000.0 / 60
+
+
+def fx_seed(seed):
+    """Seed of a match's effects rng: derived from the match seed but a separate stream."""
+    return f'{seed}:fx'
+
+
+def init_headless():
+    """Select SDL dummy drivers so no window or audio device is opened."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.init()
+
+
+class World:
+    """All state of a single match plus the per-frame game logic.
+
+    assets: optional dict with 'sprite_red', 'sprite_green', 'weapon_ak', 'weapon_m4'
+    sounds: optional dict of pygame Sounds (same keys main.py loads); empty when headless
+    executor: optional thread pool used to update grenades
+    seed: seeds the match's own random.Random; the same seed replays the same match
+    vis_cache_dir: optional directory where per-map visibility tables are cached
+    think_hz: AI decision rate (target/crate/cover/patient choice), staggered across soldiers;
+        None re-thinks every soldier on every tick (BATTLE_THINK_HZ in 'battle' mode)
+    """
+
+    def __init__(self, width=1280, height=720, sounds=None, assets=None, executor=None, best_of=5, verbose=True, seed=None,
+                 vis_cache_dir=None, think_hz=None):
+        # every gameplay random draw of the match goes through self.rng so a seed fully reproduces it;
+        # cosmetic effects (particles, explosion visuals) draw from fx_rng so loaded assets never change the match
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.fx_rng = random.Random(fx_seed(self.seed))
+        self.width = int(width)
+        self.height = int(height)
+        self.sounds = sounds if sounds is not None else {}
+        self.assets = assets if assets is not None else {}
+        self.executor = executor
+        self.vis_cache_dir = vis_cache_dir
+        self.think_hz = think_hz
+        self._think_slots = 0
+        self.best_of = best_of
+        self.verbose = verbose
+        # explosion visuals; main fills these after loading images
+        self.explosion_frames = []
+        self.generic_images = []
+
+        self.mode = 'menu'
+        self.covers = []
+        self.red_team = []
+        self.blue_team = []
+        self.player = None
+
+        self.bullets = BulletPool()
+        self.grenades = []
+        self.particles = ParticlePool()
+        self.explosion_anims = []
+        self.image_particles = []
+        self.crates = []
+        self.hit_marks = []  # small markers for player-hit impact points
+        self.kill_feed = []  # list of {'text': str, 'life': int}
+        self._rects = None
+        self._rects_for = None
+        self._cover_idx = CoverIndex()
+        self._cover_idx_for = None
+        self._vis = None
+        self._vis_for = None
+        self._nav = None
+        self._nav_for = None
+        self._field = None
+        self._field_for = None
+        # line of sight for AI targeting, grenades and player fire (pair cache reset every tick)
+        self.los = LineOfSight()
+        # soldiers bucketed by position; rebuilt whenever they have moved this step
+        self.grid = SoldierGrid()
+        self.death_text_timer = 0
+        self.camera_shake = 0
+
+        # bomb state: carried_by -> Soldier or None; planted boolean and site_rect
+        self.bomb = {'carried_by': None, 'planted': False, 'planted_by': None, 'x': None, 'y': None, 'site_rect': None}
+
+        # round/score
+        self.rounds = {'red': 0, 'blue': 0}
+        self.round_state = 1
+        self.round_timer = 0
+        self.tick = 0
+        self.round_ticks = 0
+        # one entry per finished round: {'winner','winner_side','ticks','red_side','blue_side','red_roles','blue_roles'}
+        self.round_results = []
+        self._round_info = None
+        # soldiers per team spawned by spawn_round() ('battle' mode uses battle_size and battle_roles)
+        self.team_size = 5
+        self.battle_size = BATTLE_TEAM_SIZE
+        self.battle_roles = dict(BATTLE_ROLE_MIX)
+        # wall time of the last step() and how many steps went over frame_budget_ms
+        self.frame_budget_ms = BATTLE_FRAME_BUDGET_MS
+        self.step_ms = 0.0
+        self.steps_timed = 0
+        self.steps_over_budget = 0
+        # per-phase seconds accumulated by step() when set to a dict (see benchmarks/)
+        self.timings = None
+
+        set_screen_size(self.width, self.height)
+
+    # ------------------------------------------------------------------ setup
+    def resize(self, w, h):
+        self.width, self.height = int(w), int(h)
+        set_screen_size(self.width, self.height)
+
+    def clear_entities(self):
+        self.bullets.clear(); self.grenades.clear(); self.particles.clear(); self.crates.clear()
+
+    def reset(self):
+        """Drop the current match and go back to the (empty) menu state."""
+        self.mode = 'menu'
+        self.clear_entities()
+        self.red_team = []
+        self.blue_team = []
+        self.player = None
+        self.round_state = 1
+        self.round_timer = 0
+        self.rounds = {'red': 0, 'blue': 0}
+
+    def start(self, mode, seed=None):
+        """Start a new match in mode 'play', 'simulation', 'battle' or 'sandbox' (optionally reseeding)."""
+        if seed is not None:
+            self.seed = seed
+            self.rng = random.Random(seed)
+            self.fx_rng = random.Random(fx_seed(seed))
+        set_screen_size(self.width, self.height)
+        self._think_slots = 0
+        # generate roguelike-style covers for more walls
+        self.covers = make_roguelike_covers(self.width, self.height, cell=96, fill_prob=0.18, rng=self.rng)
+        vis = self.visibility()
+        if self.verbose:
+            src = 'loaded' if vis.from_cache else 'built'
+            print(f"VISIBILITY: {src} {len(vis)} cells in {vis.build_ms:.1f} ms ({vis.blocked_fraction() * 100:.0f}% of cell pairs blocked)")
+        self.clear_entities()
+        self.player = None
+        self.round_results = []
+        self.tick = 0
+        self.steps_timed = 0
+        self.steps_over_budget = 0
+        if mode == 'sandbox':
+            # sandbox: empty scene for debugging; no teams, user spawns via debug keys
+            self.red_team = []
+            self.blue_team = []
+            self.explosion_anims.clear(); self.image_particles.clear()
+            # ensure no bomb in sandbox
+            self.bomb['carried_by'] = None; self.bomb['planted'] = False; self.bomb['planted_by'] = None; self.bomb['site_rect'] = None
+        self.mode = mode
+        if mode != 'sandbox':
+            self.spawn_round()
+        # reset round state and scores
+        self.round_state = 1
+        self.rounds = {'red': 0, 'blue': 0}
+
+    def make_team(self, xmin, xmax, color, side, n=5, roles=None):
+        a = self.assets
+        # hundreds of spawn lines would drown the log; battle mode prints one summary instead
+        return make_team(xmin, xmax, color, n, side=side, sprite_red=a.get('sprite_red'), sprite_green=a.get('sprite_green'),
+                         weapon_ak=a.get('weapon_ak'), weapon_m4=a.get('weapon_m4'), sounds=self.sounds, screen_h=self.height,
+                         verbose=self.verbose and self.mode != 'battle', rng=self.rng, roles=roles)
+
+    def spawn_round(self):
+        """Spawn both teams for a new round, pick T/CT and reset the bomb."""
+        w = self.width
+        # pick randomly which color becomes T (they carry/plant the bomb)
+        t_color = self.rng.choice([RED, BLUE])
+        red_side = 'T' if t_color == RED else 'CT'
+        blue_side = 'CT' if red_side == 'T' else 'T'
+        if self.mode == 'battle':
+            n, roles = self.battle_size, self.battle_roles
+        else:
+            n, roles = self.team_size, None
+        self.red_team = self.make_team(50, int(w * 0.25), RED, red_side, n=n, roles=roles)
+        self.blue_team = self.make_team(int(w * 0.75), w - 50, BLUE, blue_side, n=n, roles=roles)
+        if self.mode == 'play':
+            self.player = self._make_player(red_side)
+            # replace one AI with the player so the player is part of the red team
+            if self.red_team:
+                self.red_team[0] = self.player
+        elif self.mode in ('simulation', 'battle'):
+            # simulation / battle: full AI, no player control
+            self.player = None
+            for s in self.red_team + self.blue_team:
+                s.controlled = False
+                s.mag_capacity = 30; s.mag = 30; s.reserve = 90; s.reload_time_frames = 90
+        self.clear_entities()
+        # place bomb site on CT spawn and give the bomb to a random T soldier
+        try:
+            reset_round_bomb(self.bomb, self.red_team, self.blue_team, self.width, self.height, rng=self.rng)
+        except Exception:
+            self.bomb['carried_by'] = None; self.bomb['planted'] = False; self.bomb['planted_by'] = None; self.bomb['site_rect'] = None
+        self.round_ticks = 0
+        self._round_info = {
+            'red_side': red_side,
+            'blue_side': blue_side,
+            'red_roles': sorted(s.role for s in self.red_team),
+            'blue_roles': sorted(s.role for s in self.blue_team),
+        }
+        if self.mode == 'battle' and self.verbose:
+            print(f"BATTLE: {len(self.red_team)}v{len(self.blue_team)} roles={self.battle_roles} "
+                  f"think={self.think_hz or BATTLE_THINK_HZ} Hz budget={self.frame_budget_ms:.1f} ms/step")
+
+    def _make_player(self, side):
+        player = Soldier(100, self.height // 2, RED, role='rifle', rng=self.rng)
+        player.controlled = True
+        player.side = side
+        player.mag_capacity = 30; player.mag = 30; player.reserve = 90
+        # full-auto rifle: short per-shot cooldown but a realistic reload (~3 seconds)
+        player.reload_time_frames = 180
+        player.reload_time = 6
+        player.sprite = self.assets.get('sprite_red'); player.weapon_img = self.assets.get('weapon_m4'); player.weapon_sound = self.sounds.get('m4a1')
+        player.weapon_key = 'm4a1'
+        player.prepare_sprites()
+        if self.verbose:
+            print(f"SPAWN_PLAYER: name={player.name} weapon_key={player.weapon_key} sound_loaded={'yes' if self.sounds.get(player.weapon_key) else 'no'}")
+        return player
+
+    def state_digest(self):
+        """CRC32 over soldier positions/hp, score and tick (replay verification)."""
+        data = repr([(s.name, round(s.x, 3), round(s.y, 3), s.hp) for s in self.soldiers] + [self.rounds, self.tick])
+        return zlib.crc32(data.encode())
+
+    @property
+    def soldiers(self):
+        return self.red_team + self.blue_team
+
+    @property
+    def match_over(self):
+        return self.round_state == 3
+
+    # ---------------------------------------------------------- debug actions
+    def plant_bomb(self):
+        """Plant the bomb if its carrier stands inside the site; awards the round."""
+        bomb = self.bomb
+        if bomb.get('carried_by') is None or bomb.get('site_rect') is None:
+            return False
+        cb = bomb['carried_by']
+        if not bomb['site_rect'].collidepoint(int(cb.x), int(cb.y)):
+            return False
+        bomb['planted'] = True
+        bomb['planted_by'] = cb
+        bomb['carried_by'] = None
+        # award round to planting team and advance round
+        team_name = 'blue' if getattr(cb, 'color', None) == BLUE else 'red'
+        self.rounds[team_name] = self.rounds.get(team_name, 0) + 1
+        self.round_state = 2; self.round_timer = 180
+        print(f"BOMB: planted by {getattr(cb, 'name', None)} team={team_name}")
+        return True
+
+    def explode_at(self, x, y, magnitude=1.0):
+        spawn_explosion(x, y, self.explosion_frames, self.generic_images, self.explosion_anims, self.image_particles, magnitude=magnitude, rng=self.fx_rng)
+
+    # ------------------------------------------------------------- simulation
+    def step(self, frame_scale=1.0, controls=None):
+        """Advance the match by one frame.
+
+        frame_scale: 1.0 == one 60 FPS frame (pushed into game_core.FRAME_SCALE)
+        controls: player input dict from main.read_controls() (play mode only)
+        """
+        try:
+            set_frame_scale(frame_scale)
+        except Exception:
+            pass
+        started = time.perf_counter()
+        self.tick += 1
+        self.round_ticks += 1
+        self._store_previous_positions()
+        self.los.new_tick(self.cover_index(), self.visibility())
+        # with self.timings set, each _lap() adds the phase's seconds to it
+        mark = time.perf_counter()
+        self._spawn_crates(frame_scale)
+        if self.mode == 'play' and self.player and getattr(self.player, 'hp', 0) > 0 and controls is not None:
+            self._update_player(controls, frame_scale)
+        mark = self._lap('player', mark)
+        self._update_ai()
+        mark = self._lap('ai', mark)
+        self._update_projectiles()
+        mark = self._lap('projectiles', mark)
+        self._resolve_soldier_overlap()
+        mark = self._lap('separation', mark)
+        self._resolve_bullets()
+        mark = self._lap('bullet_hits', mark)
+        self._resolve_grenades()
+        mark = self._lap('explosions', mark)
+        self._update_effects(frame_scale)
+        self._update_crates()
+        self._cleanup_dead()
+        self._update_round()
+        self._lap('other', mark)
+        # camera shake decay
+        if self.camera_shake > 0:
+            self.camera_shake = max(0, self.camera_shake - 1)
+        self.step_ms = (time.perf_counter() - started) * 1000.0
+        self.steps_timed += 1
+        if self.step_ms > self.frame_budget_ms:
+            self.steps_over_budget += 1
+
+    def over_budget(self):
+        """Fraction of steps since start() that took longer than frame_budget_ms."""
+        return self.steps_over_budget / self.steps_timed if self.steps_timed else 0.0
+
+    def _lap(self, phase, since):
+        # add the seconds since `since` to timings[phase] (when timing is on); returns the new mark
+        timings = self.timings
+        if timings is None:
+            return since
+        now = time.perf_counter()
+        timings[phase] = timings.get(phase, 0.0) + (now - since)
+        return now
+
+    def _store_previous_positions(self):
+        # remember where moving entities were before this step so rendering can interpolate
+        for group in (self.red_team, self.blue_team, self.grenades):
+            for o in group:
+                o.prev_x = o.x; o.prev_y = o.y
+        self.bullets.store_previous()
+
+    def _spawn_crates(self, frame_scale):
+        # spawn occasional crate (rate scales with frame_scale)
+        rng = self.rng
+        if rng.random() < 0.002 * frame_scale and len(self.crates) < 3:
+            kind = rng.choice(['heal', 'fast_reload', 'shield'])
+            self.crates.append(Crate(rng.randint(100, self.width - 100), rng.randint(50, self.height - 50), kind))
+
+    def _update_player(self, controls, frame_scale):
+        player = self.player
+        covers = self.cover_index()
+        # movement WASD
+        mvx = mvy = 0
+        if controls.get('up'): mvy -= player.speed * 1.8
+        if controls.get('down'): mvy += player.speed * 1.8
+        if controls.get('left'): mvx -= player.speed * 1.8
+        if controls.get('right'): mvx += player.speed * 1.8
+        # attempt movement but avoid entering covers (slide along if blocked)
+        cand_x = player.x + mvx
+        cand_y = player.y + mvy
+        if not covers.contains(cand_x, cand_y):
+            player.x = cand_x; player.y = cand_y
+        else:
+            # try sliding on X only
+            blocked_x = covers.contains(cand_x, player.y)
+            blocked_y = covers.contains(player.x, cand_y)
+            if not blocked_x:
+                player.x = cand_x
+            elif not blocked_y:
+                player.y = cand_y
+        player.stay_in_bounds()
+        mx, my = controls.get('mx', 0), controls.get('my', 0)
+        # face based on mouse position so the texture mirrors correctly
+        player.facing_right = (mx > player.x)
+        # reload key
+        if controls.get('reload') and not player.reloading and player.mag < player.mag_capacity and player.reserve > 0:
+            player.reloading = True; player.reload_timer = player.reload_time_frames
+        # AUTO-RELOAD: if mag empty and there is reserve, start reload automatically
+        if player.mag <= 0 and player.reserve > 0 and not player.reloading:
+            player.reloading = True
+            player.reload_timer = player.reload_time_frames
+        # shooting with left mouse, frame-scaled timing (matches AI which uses FRAME_SCALE)
+        player.reload_counter += frame_scale
+        if controls.get('fire') and not player.reloading and player.reload_counter >= player.reload_time and player.mag > 0:
+            # prevent player shooting through solid covers
+            if not self.los.blocked(player.x, player.y, mx, my):
+                self.bullets.spawn(player.x + player.weapon_length, player.y, mx, my, player.color, damage=player.damage, owner=player)
+            try:
+                # prefer weapon_key mapping to avoid accidental explosion sound usage
+                sounds = self.sounds
+                wk = getattr(player, 'weapon_key', None)
+                if wk and sounds.get(wk):
+                    s = sounds.get(wk)
+                else:
+                    s = (sounds.get('shoot_red') if player.color == RED else sounds.get('shoot_blue'))
+                if s and s is not sounds.get('explosion') and s is not sounds.get('grenade'):
+                    play_sound_obj(s, sounds)
+            except Exception:
+                pass
+            player.mag -= 1
+            player.reload_counter = 0
+        # handle player reload timer if reloading (frame-scaled)
+        if player.reloading:
+            player.reload_timer -= frame_scale
+            if player.reload_timer <= 0:
+                needed = max(0, player.mag_capacity - player.mag)
+                to_load = min(needed, player.reserve)
+                player.reserve -= to_load
+                player.mag += to_load
+                player.reloading = False
+
+    def _update_ai(self):
+        # update entities (skip controlled player as it's handled above)
+        covers = self.cover_index()
+        nav = self.nav_grid()
+        if (self.round_ticks - 1) % FLOW_REFRESH_TICKS == 0:
+            self._update_flow_goals(nav.flows)
+        # think (decisions) on a staggered schedule, act (movement, firing) every tick
+        period = self.think_period()
+        timings = self.timings
+        clock = time.perf_counter
+        due = []  # (soldier, its team, the enemy team)
+        for team, enemies in ((self.red_team, self.blue_team), (self.blue_team, self.red_team)):
+            for s in team:
+                if getattr(s, 'controlled', False):
+                    continue
+                if s.think_slot is None:
+                    s.think_slot = self._think_slots
+                    self._think_slots += 1
+                if period <= 1 or (self.tick + s.think_slot) % period == 0 or s.think_due():
+                    due.append((s, team, enemies))
+        if due:
+            t0 = clock()
+            if len(due) >= SNAPSHOT_THINK_MIN:
+                # decide phase: commands for everyone due to think, read from the snapshot alone
+                # (positions as of now); apply writes them back in list order
+                snap = WorldSnapshot(self.red_team, self.blue_team, self.crates, covers, self.cover_field())
+                thinkers = [s for s, _, _ in due]
+                snap.apply(thinkers, snap.decide(thinkers))
+            else:
+                # a few thinkers: per-soldier scans beat building the arrays and pick the same
+                # choices (no one has moved yet this phase)
+                for s, team, enemies in due:
+                    s.think(enemies, self.crates, covers, team)
+            if timings is not None:
+                timings['ai_think'] = timings.get('ai_think', 0.0) + (clock() - t0)
+        # act phase: serial, it moves soldiers and draws from the match rng
+        for team, enemies in ((self.red_team, self.blue_team), (self.blue_team, self.red_team)):
+            for s in list(team):
+                if getattr(s, 'controlled', False):
+                    continue
+                s.update(enemies, self.bullets, self.grenades, covers, self.crates, team, self.sounds, self.bomb, self.los, nav, think=False)
+
+    def think_period(self):
+        """Ticks between two think() calls of one soldier (1 == every tick)."""
+        hz = self.think_hz or (BATTLE_THINK_HZ if self.mode == 'battle' else None)
+        if not hz:
+            return 1
+        # one tick == FRAME_SCALE / 60 s
+        return max(1, int(round(60.0 / (hz * max(game_core.FRAME_SCALE, 1e-6)))))
+
+    def _update_flow_goals(self, flows):
+        # shared objectives: dropped bomb (T soldiers fetch it) and each team's centroid (its
+        # enemies steer toward it), each only once enough soldiers may read its field
+        bomb = self.bomb
+        t_side = sum(1 for s in self.soldiers if getattr(s, 'side', None) == 'T')
+        if bomb.get('carried_by') is None and t_side >= FLOW_MIN_READERS:
+            flows.set_goal('bomb', bomb.get('x'), bomb.get('y'))
+        else:
+            flows.set_goal('bomb', None, None)
+        for name, team, readers in (('red', self.red_team, self.blue_team), ('blue', self.blue_team, self.red_team)):
+            alive = [s for s in team if s.hp > 0]
+            if alive and len(readers) >= FLOW_MIN_READERS:
+                flows.set_goal(name, sum(s.x for s in alive) / len(alive), sum(s.y for s in alive) / len(alive))
+            else:
+                flows.set_goal(name, None, None)
+
+    def _update_projectiles(self):
+        grenades = self.grenades
+        # bullets and particles integrate as vectorized array updates
+        self.bullets.update(game_core.FRAME_SCALE)
+        self.particles.update(game_core.FRAME_SCALE)
+        if self.executor is not None:
+            # parallel updates for cheap objects - safe because these do not access pygame surfaces
+            try:
+                if grenades:
+                    list(self.executor.map(lambda o: o.update(), grenades))
+                return
+            except Exception:
+                pass
+        for g in grenades: g.update()
+
+    def _resolve_soldier_overlap(self):
+        # Prevent any soldiers (including teammates) from occupying the same space.
+        # If two opposing soldiers overlap, a melee attack is attempted (subject to melee cooldown).
+        # Pairs are visited in the same (i, j) order as a full scan, but row i only looks at
+        # grid neighbours of soldier i. Within row i only a and the current b move, so the
+        # search radius just has to cover how far a has been pushed since the row began.
+        all_soldiers = self.red_team + self.blue_team
+        grid = self.grid
+        grid.rebuild(all_soldiers)
+        if len(all_soldiers) >= BATCH_SEPARATION_MIN:
+            self._separate_batch(all_soldiers)
+            return
+        reach = 2 * grid.max_radius
+        moved = False
+        for i, a in enumerate(all_soldiers):
+            ax, ay = a.x, a.y
+            slack = grid.max_radius
+            row = grid.row(i, ax, ay, reach + slack)
+            k = 0
+            while k < len(row):
+                j = row[k]; k += 1
+                b = all_soldiers[j]
+                dx = b.x - a.x; dy = b.y - a.y
+                dist = math.hypot(dx, dy) or 0.001
+                min_dist = a.radius + b.radius
+                if dist >= min_dist:
+                    continue
+                self._separate_pair(a, b, dx, dy, dist, min_dist)
+                moved = True
+                grid.move(i); grid.move(j)
+                drift = math.hypot(a.x - ax, a.y - ay)
+                if drift > slack:
+                    slack = drift + grid.max_radius
+                    row = row[:k] + grid.row(j, ax, ay, reach + slack)
+        # bullets, grenades and crates below query the post-separation positions
+        if moved:
+            grid.rebuild(all_soldiers)
+
+    def _separate_batch(self, all_soldiers):
+        # Big battles: find every overlapping pair from the position arrays at once and push
+        # all of them apart in one simultaneous step (sequential pushes would each move soldiers
+        # that later pairs already measured, so results differ from the exact pass, which small
+        # teams keep). Melee then runs over the opposing pairs in the same (i, j) order.
+        grid = self.grid
+        x, y, r = grid.arrays()
+        n = len(all_soldiers)
+        if n <= DENSE_SEPARATION_MAX:
+            reach = r[:, None] + r
+            dx = x - x[:, None]; dy = y - y[:, None]
+            i, j = np.nonzero(np.triu(dx * dx + dy * dy < reach * reach, 1))
+        else:
+            i, j = grid.touch_pairs(x, y, grid.max_radius)
+            keep = i < j
+            i, j = i[keep], j[keep]
+        dx = x[j] - x[i]; dy = y[j] - y[i]
+        dist = np.hypot(dx, dy)
+        dist[dist == 0] = 0.001
+        min_dist = r[i] + r[j]
+        over = dist < min_dist
+        if not over.any():
+            return
+        i, j, dx, dy, dist, min_dist = i[over], j[over], dx[over], dy[over], dist[over], min_dist[over]
+        # separate each pair equally so it no longer overlaps
+        overlap = (min_dist - dist) / 2.0
+        px = dx / dist * overlap; py = dy / dist * overlap
+        mx = np.zeros(n); my = np.zeros(n)
+        np.add.at(mx, i, -px); np.add.at(mx, j, px)
+        np.add.at(my, i, -py); np.add.at(my, j, py)
+        nx = np.maximum(r, np.minimum(game_core.SCREEN_W - r, x + mx))
+        ny = np.maximum(r, np.minimum(game_core.SCREEN_H - r, y + my))
+        for k in np.flatnonzero((mx != 0) | (my != 0)).tolist():
+            s = all_soldiers[k]
+            s.x = float(nx[k]); s.y = float(ny[k])
+        colors = {}
+        cid = np.array([colors.setdefault(s.color, len(colors)) for s in all_soldiers])
+        opp = cid[i] != cid[j]
+        for a, b in zip(i[opp].tolist(), j[opp].tolist()):
+            self._melee(all_soldiers[a], all_soldiers[b])
+        grid.rebuild(all_soldiers)
+
+    def _separate_pair(self, a, b, dx, dy, dist, min_dist):
+        # separate two overlapping soldiers equally so they no longer overlap
+        overlap = (min_dist - dist) / 2.0
+        nx, ny = dx / dist, dy / dist
+        a.x -= nx * overlap
+        a.y -= ny * overlap
+        b.x += nx * overlap
+        b.y += ny * overlap
+        a.stay_in_bounds(); b.stay_in_bounds()
+        self._melee(a, b)
+
+    def _melee(self, a, b):
+        # If they're on opposing teams, resolve melee (cooldown enforced)
+        if getattr(a, 'color', None) is not None and getattr(b, 'color', None) is not None and a.color != b.color:
+            try:
+                if getattr(a, 'melee_timer', 0) <= 0:
+                    b.hp -= getattr(a, 'melee_damage', 10)
+                    a.melee_timer = getattr(a, 'melee_cooldown_frames', 180)
+                    a.face_expression = 'hit'; a.speech_text = 'Slash!'; a.speech_timer = 20
+                if getattr(b, 'melee_timer', 0) <= 0:
+                    a.hp -= getattr(b, 'melee_damage', 10)
+                    b.melee_timer = getattr(b, 'melee_cooldown_frames', 180)
+                    b.face_expression = 'hit'; b.speech_text = 'Slash!'; b.speech_timer = 20
+            except Exception:
+                pass
+
+    def cover_index(self):
+        """self.covers as a spatial.CoverIndex (rebuilt when the covers list is replaced)."""
+        if self._cover_idx_for is not self.covers:
+            self._cover_idx = CoverIndex(self.covers)
+            self._cover_idx_for = self.covers
+        return self._cover_idx
+
+    def nav_grid(self):
+        """NavGrid (A* routes around covers) for the current covers; its path cache lives as long as the map."""
+        if self._nav_for is not self.covers:
+            self._nav = NavGrid(self.covers, self.width, self.height)
+            self._nav_for = self.covers
+        return self._nav
+
+    def visibility(self):
+        """VisibilityTable for the current covers (rebuilt, or loaded from vis_cache_dir, when they change)."""
+        if self._vis_for is not self.covers:
+            self._vis = VisibilityTable.for_map(self.width, self.height, self.covers, self.vis_cache_dir)
+            self._vis_for = self.covers
+        return self._vis
+
+    def _cover_rects(self):
+        # cover edges as an array for the vectorized bullet tests (covers are static per match)
+        if self._rects_for is not self.covers:
+            self._rects = rect_array(self.covers)
+            self._rects_for = self.covers
+        return self._rects
+
+    def cover_field(self):
+        """Nearest-cover CoverField for the current covers (rebuilt when they change)."""
+        if self._field_for is not self.covers:
+            self._field = CoverField(self.covers, self.width, self.height)
+            self._field_for = self.covers
+        return self._field
+
+    def _sweep_bullets_list(self, soldiers):
+        # Few bullets: the same sweep as _sweep_bullets_arrays, bullet by bullet in plain
+        # Python (per-call NumPy overhead would dominate at these sizes). Same float64 math,
+        # so both give identical hits.
+        pool = self.bullets
+        n = pool.n
+        x0s = pool.prev_x[:n].tolist(); y0s = pool.prev_y[:n].tolist()
+        x1s = pool.x[:n].tolist(); y1s = pool.y[:n].tolist()
+        teams = pool.team[:n].tolist()
+        rects = self._cover_rects().tolist()
+        targets = [(s.x, s.y, s.radius + pool.radius, pool.team_id(s.color)) for s in soldiers]
+        w, h = self.width, self.height
+        hits, gone = [], []
+        for i in range(n):
+            x0 = x0s[i]; y0 = y0s[i]; x1 = x1s[i]; y1 = y1s[i]
+            dx = x1 - x0; dy = y1 - y0
+            lox = min(x0, x1); hix = max(x0, x1); loy = min(y0, y1); hiy = max(y0, y1)
+            # covers: slab test on the rects the path's bounding box overlaps
+            t_best = math.inf
+            for left, top, right, bottom in rects:
+                if lox > right or hix < left or loy > bottom or hiy < top:
+                    continue
+                t0 = 0.0; t1 = 1.0
+                if dx != 0:
+                    ta = (left - x0) / dx; tb = (right - x0) / dx
+                    t0 = max(t0, min(ta, tb)); t1 = min(t1, max(ta, tb))
+                if dy != 0:
+                    ta = (top - y0) / dy; tb = (bottom - y0) / dy
+                    t0 = max(t0, min(ta, tb)); t1 = min(t1, max(ta, tb))
+                if t0 <= t1 and t0 < t_best:
+                    t_best = t0
+            # soldiers: earliest enemy strictly before the cover, lowest index on ties
+            si = -1
+            team = teams[i]
+            for k, (cx, cy, r, steam) in enumerate(targets):
+                if steam == team or lox > cx + r or hix < cx - r or loy > cy + r or hiy < cy - r:
+                    continue
+                fx = x0 - cx; fy = y0 - cy
+                c = fx * fx + fy * fy - r * r
+                if c < 0:
+                    t = 0.0
+                else:
+                    a = dx * dx + dy * dy
+                    b = fx * dx + fy * dy
+                    disc = b * b - a * c
+                    if disc < 0 or a <= 0:
+                        continue
+                    t = (-b - math.sqrt(disc)) / a
+                    if t < 0 or t > 1:
+                        continue
+                if t < t_best:
+                    t_best = t; si = k
+            if t_best != math.inf:
+                hits.append((i, x0 + dx * t_best, y0 + dy * t_best, si))
+            elif x1 < 0 or x1 > w or y1 < 0 or y1 > h:
+                # bullets that got off the screen without hitting anything just vanish
+                gone.append(i)
+        return hits, gone
+
+    def _sweep_bullets_arrays(self, soldiers):
+        # (bullet, impact x, impact y, soldier index or -1 for a cover) per stopped bullet in
+        # pool order, and the bullets that left the screen
+        pool = self.bullets
+        n = pool.n
+        x0, y0, dx, dy = pool.segments()
+        t_cover = pool.sweep_rects(self._cover_rects())
+        # soldier hits: earliest enemy along the path (list order breaks ties, red team first).
+        # Small matches pair every bullet with every soldier whose circle reaches the path's
+        # bounding box; larger ones only with the grid neighbours of the path.
+        grid = self.grid
+        hit_by = np.full(n, -1)
+        t_hit = np.full(n, np.inf)
+        if soldiers:
+            sx, sy, sr = grid.arrays()
+            if n * len(soldiers) <= DENSE_HIT_PAIRS:
+                reach = sr + pool.radius
+                x1 = x0 + dx; y1 = y0 + dy
+                bi, si = np.nonzero((np.minimum(x0, x1)[:, None] <= sx + reach) & (np.maximum(x0, x1)[:, None] >= sx - reach)
+                                    & (np.minimum(y0, y1)[:, None] <= sy + reach) & (np.maximum(y0, y1)[:, None] >= sy - reach))
+            else:
+                # candidates around each path's midpoint, widened by the longest half path
+                half = float(np.sqrt(dx * dx + dy * dy).max()) * 0.5
+                bi, si = grid.touch_pairs(x0 + dx * 0.5, y0 + dy * 0.5, pool.radius + half)
+            steam = np.array([pool.team_id(s.color) for s in soldiers])
+            keep = pool.team[bi] != steam[si]
+            bi, si = bi[keep], si[keep]
+            t = segment_circle_t(x0[bi], y0[bi], dx[bi], dy[bi], sx[si], sy[si], sr[si] + pool.radius)
+            ok = t < t_cover[bi]
+            bi, si, t = bi[ok], si[ok], t[ok]
+            if len(bi):
+                # earliest pair per bullet, then lowest soldier index
+                order = np.lexsort((si, t, bi))
+                bi, si, t = bi[order], si[order], t[order]
+                first = np.unique(bi, return_index=True)[1]
+                hit_by[bi[first]] = si[first]
+                t_hit[bi[first]] = t[first]
+        blocked = np.isfinite(t_cover) & (hit_by < 0)
+        t = np.where(blocked, t_cover, t_hit)
+        dead = np.flatnonzero(blocked | (hit_by >= 0))
+        hits = [(i, float(x0[i] + dx[i] * t[i]), float(y0[i] + dy[i] * t[i]), int(hit_by[i])) for i in dead.tolist()]
+        gone = np.flatnonzero(pool.offscreen_mask(self.width, self.height) & ~blocked & (hit_by < 0)).tolist()
+        return hits, gone
+
+    def _resolve_bullets(self):
+        pool, particles, covers, bomb, sounds = self.bullets, self.particles, self.cover_index(), self.bomb, self.sounds
+        rng, fx = self.rng, self.fx_rng
+        n = pool.n
+        if n == 0:
+            return
+        # every bullet is swept along its path this step: it stops at whichever it reaches
+        # first, a cover (covers act like walls) or an enemy soldier (ties go to the cover)
+        soldiers = self.grid.soldiers
+        if n <= BULLET_LIST_MAX:
+            hits, gone = self._sweep_bullets_list(soldiers)
+        else:
+            hits, gone = self._sweep_bullets_arrays(soldiers)
+        for i, bx, by, si in hits:
+            # effects at the point of impact
+            if si < 0:
+                # spawn small impact particles; bullet is removed below
+                for _ in range(4): particles.emit(bx, by, fx.uniform(-1.5, 1.5), fx.uniform(-1.5, 1.5), fx.randint(6, 12), (180, 180, 180))
+                continue
+            s = soldiers[si]
+            owner = pool.owner_of(i)
+            if not s.in_cover(covers):
+                if s.shield > 0:
+                    s.shield -= 1
+                else:
+                    # record last attacker for kill feed
+                    s.last_attacker = getattr(owner, 'name', None)
+                    s.hp -= int(pool.damage[i])
+                    s.face_expression = 'hit'; s.speech_text = 'Ouch!'; s.speech_timer = 30
+                    # if soldier was carrying the bomb, drop it here
+                    if getattr(s, 'carrying_bomb', False):
+                        s.carrying_bomb = False
+                        if bomb.get('carried_by') is s:
+                            bomb['carried_by'] = None
+                            # place dropped bomb near soldier
+                            bomb['x'] = int(s.x + rng.randint(-8, 8))
+                            bomb['y'] = int(s.y + rng.randint(-8, 8))
+                            bomb['planted'] = False
+                    # play damage sound if available
+                    if sounds.get('damage'):
+                        try: play_sound_obj(sounds['damage'], sounds)
+                        except Exception: pass
+                    # spawn a hit mark if this bullet was fired by the player in play mode
+                    if self.mode == 'play' and owner is not None and getattr(owner, 'controlled', False):
+                        self.hit_marks.append({'x': bx, 'y': by, 'life': 30})
+            # particles
+            for _ in range(6): particles.emit(bx, by, fx.uniform(-2, 2), fx.uniform(-2, 2), fx.randint(8, 16), (255, 200, 100))
+        pool.remove([h[0] for h in hits] + gone)
+
+    def _resolve_grenades(self):
+        for g in self.grenades[:]:
+            if g.timer <= 0:
+                # explosion logic: handle damage and small particles (in grenades.explode)
+                g.explode(self.grid.near(g.x, g.y, game_core.GRENADE_BLAST_RADIUS), self.particles)
+                if self.sounds.get('explosion'):
+                    try: play_sound_obj(self.sounds['explosion'], self.sounds)
+                    except Exception: pass
+                self.camera_shake = 12
+                # spawn visuals using the shared helper (faster animation + random generic images)
+                self.explode_at(g.x, g.y, magnitude=1.0)
+                try: self.grenades.remove(g)
+                except ValueError: pass
+
+    def _update_effects(self, frame_scale):
+        # explosion animations, tick scaled by frame_scale so animation speed is stable across fps
+        for ea in self.explosion_anims[:]:
+            ea['tick'] -= frame_scale
+            if ea['tick'] <= 0:
+                ea['frame'] += 1
+                ea['tick'] = 2.0
+            if ea['frame'] >= len(self.explosion_frames):
+                try: self.explosion_anims.remove(ea)
+                except ValueError: pass
+
+        # image particles
+        for ip in self.image_particles[:]:
+            ip['x'] += ip['vx'] * frame_scale
+            ip['y'] += ip['vy'] * frame_scale
+            ip['vy'] += 0.05 * frame_scale  # slight gravity
+            ip['rot'] += ip['rot_speed'] * frame_scale
+            ip['life'] -= 1 * frame_scale
+            if ip['life'] <= 0:
+                try: self.image_particles.remove(ip)
+                except ValueError: pass
+
+        # hit marks
+        for hm in self.hit_marks[:]:
+            hm['life'] -= 1
+            if hm['life'] <= 0:
+                try: self.hit_marks.remove(hm)
+                except ValueError: pass
+
+        # kill feed entries fade out (the HUD only draws them)
+        for k in self.kill_feed[:]:
+            k['life'] -= 1
+            if k['life'] <= 0:
+                try: self.kill_feed.remove(k)
+                except ValueError: pass
+
+        if self.death_text_timer > 0:
+            self.death_text_timer -= 1
+
+    def _update_crates(self):
+        # crates pickup
+        crates = self.crates
+        for c in crates[:]:
+            c.timer -= 1
+            if c.timer <= 0: crates.remove(c); continue
+            for s in self.grid.near(c.x, c.y, 20):
+                if math.hypot(c.x - s.x, c.y - s.y) < 20:
+                    if c.kind == 'heal': s.hp = min(s.max_hp, s.hp + 40)
+                    elif c.kind == 'fast_reload': s.reload_time = max(4, int(s.reload_time * 0.6))
+                    elif c.kind == 'shield': s.shield += 1
+                    crates.remove(c); break
+
+    def _cleanup_dead(self):
+        # produce kill-feed entries for soldiers who just died
+        for d in self.red_team + self.blue_team:
+            if getattr(d, 'hp', 0) <= 0:
+                killer = getattr(d, 'last_attacker', None) or 'Unknown'
+                self.kill_feed.append({'text': f"{killer} killed {getattr(d, 'name', 'Soldier')}", 'life': 180})
+        if len(self.kill_feed) > KILL_FEED_MAX:
+            del self.kill_feed[:-KILL_FEED_MAX]
+        self.red_team = [s for s in self.red_team if s.hp > 0]
+        self.blue_team = [s for s in self.blue_team if s.hp > 0]
+        # If the controlled player died this frame, clear the player reference so it can no longer act
+        if self.player is not None and getattr(self.player, 'hp', 0) <= 0:
+            # set a short death display timer
+            self.death_text_timer = 180
+            self.player = None
+
+    def _update_round(self):
+        if self.round_state == 1:
+            if not self.red_team or not self.blue_team:
+                winner = 'red' if not self.blue_team else 'blue'
+                self.rounds[winner] += 1
+                self._record_round(winner)
+                self.round_state = 2
+                self.round_timer = 90
+        elif self.round_state == 2:
+            self.round_timer -= 1
+            if self.round_timer <= 0:
+                # reset for next round unless match over
+                if self.rounds['red'] >= (self.best_of + 1) // 2 or self.rounds['blue'] >= (self.best_of + 1) // 2:
+                    self.round_state = 3
+                elif self.mode != 'sandbox':
+                    self.spawn_round()
+                    self.round_state = 1
+
+    def _record_round(self, winner):
+        info = dict(self._round_info or {})
+        info['winner'] = winner
+        info['winner_side'] = info.get(winner + '_side')
+        info['ticks'] = self.round_ticks
+        self.round_results.append(info)
+
+
+def run_headless(seed=None, width=1280, height=720, max_ticks=200000, best_of=5, verbose=False):
+    """Play one full AI-vs-AI match without a window and return the World."""
+    world = World(width, height, best_of=best_of, verbose=verbose, seed=seed)
+    world.start('simulation')
+    while not world.match_over and world.tick < max_ticks:
+        world.step(1.0)
+    return world
+
+
+if __name__ == '__main__':
+    init_headless()
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    t0 = time.perf_counter()
+    ticks = 0
+    for i in range(n):
+        w = run_headless(seed=i)
+        ticks += w.tick
+        print(f"match {i}: rounds={w.rounds} ticks={w.tick}")
+    dt = time.perf_counter() - t0
+    print(f"{n} matches, {ticks} ticks in {dt:.2f}s ({ticks / max(dt, 1e-9):.0f} ticks/s)")
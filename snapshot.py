@@ -0,0 +1,106 @@
+"""Per-tick snapshot of positions and distances for AI decisions.
+
+World builds one WorldSnapshot at the start of the AI phase. The AI then
+runs in two phases:
+
+- decide: decide_rows() turns the snapshot's plain arrays into one command
+  per thinking soldier (indices of its target, crate, cover and, for medics,
+  patient). It reads nothing else and writes nothing.
+- apply: WorldSnapshot.apply() resolves the indices back to objects and
+  writes them to the soldiers in list order.
+
+The act part of Soldier.update (movement, firing, grenades, heals) then runs
+serially on those decisions: it draws from the match rng and moves soldiers
+one after another, and replays depend on that order.
+
+Positions are taken when the snapshot is built: soldiers that already
+moved earlier in the same tick are seen where they started it. Ties go to
+the first candidate in list order, like min().
+"""
+import numpy as np
+
+from spatial import CoverField
+
+
+def _nearest(rx, ry, points):
+    """Index of the nearest of points (k, 2) for each (rx, ry), or -1 if there are none."""
+    if not len(points):
+        return np.full(len(rx), -1, dtype=np.intp)
+    d = np.hypot(points[None, :, 0] - rx[:, None], points[None, :, 1] - ry[:, None])
+    return d.argmin(axis=1)
+
+
+def decide_rows(x, y, red, hurt, medic, crate_xy, cover_field, rows):
+    """Decision commands for the soldiers in rows: an (len(rows), 4) int array of
+    (enemy, crate, cover, patient) indices, -1 where there is none.
+
+    x, y, red, hurt, medic are per-soldier arrays (red team first); crate_xy is a
+    (k, 2) point array and cover_field a spatial.CoverField (or None). Pure
+    function of its arguments.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    k = len(rows)
+    out = np.full((k, 4), -1, dtype=np.intp)
+    if not k:
+        return out
+    rx = x[rows]; ry = y[rows]
+    d = np.hypot(x[None, :] - rx[:, None], y[None, :] - ry[:, None])
+    other = red[None, :] != red[rows][:, None]
+    de = np.where(other, d, np.inf)
+    best = de.argmin(axis=1)
+    out[:, 0] = np.where(np.isfinite(de[np.arange(k), best]), best, -1)
+    out[:, 1] = _nearest(rx, ry, crate_xy)
+    if cover_field is not None:
+        out[:, 2] = cover_field.nearest_many(rx, ry)
+    m = np.nonzero(medic[rows])[0]
+    if len(m):
+        # living teammates missing at least 10 hp, never the medic itself
+        dp = np.where(~other[m] & hurt[None, :], d[m], np.inf)
+        dp[np.arange(len(m)), rows[m]] = np.inf
+        best = dp.argmin(axis=1)
+        out[m, 3] = np.where(np.isfinite(dp[np.arange(len(m)), best]), best, -1)
+    return out
+
+
+class WorldSnapshot:
+    def __init__(self, red_team, blue_team, crates=(), covers=(), cover_field=None):
+        self.soldiers = list(red_team) + list(blue_team)
+        self.n_red = len(red_team)
+        self.crates = list(crates)
+        self.covers = covers
+        self.cover_field = cover_field
+        self.index = {id(s): i for i, s in enumerate(self.soldiers)}
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.soldiers)
+
+    def arrays(self):
+        """The plain arrays decide_rows() reads (everything but the rows)."""
+        if self._arrays is None:
+            soldiers = self.soldiers
+            n = len(soldiers)
+            x = np.array([s.x for s in soldiers], dtype=np.float64)
+            y = np.array([s.y for s in soldiers], dtype=np.float64)
+            red = np.arange(n) < self.n_red
+            hurt = np.array([s.hp > 0 and s.hp <= s.max_hp - 10 for s in soldiers], dtype=bool)
+            medic = np.array([s.role == 'medic' for s in soldiers], dtype=bool)
+            crate_xy = np.array([(c.x, c.y) for c in self.crates], dtype=np.float64).reshape(-1, 2)
+            if self.cover_field is None and self.covers:
+                self.cover_field = CoverField(self.covers)
+            self._arrays = (x, y, red, hurt, medic, crate_xy, self.cover_field)
+        return self._arrays
+
+    def decide(self, soldiers):
+        """Commands (see decide_rows) for soldiers, in the same order."""
+        rows = np.array([self.index[id(s)] for s in soldiers], dtype=np.intp)
+        return decide_rows(*self.arrays(), rows)
+
+    def apply(self, soldiers, commands):
+        """Write decided commands to soldiers (ai_target, ai_crate, ai_cover, ai_patient)."""
+        everyone, crates, covers = self.soldiers, self.crates, self.covers
+        for s, (e, c, k, p) in zip(soldiers, commands.tolist()):
+            s.ai_target = everyone[e] if e >= 0 else None
+            s.ai_crate = crates[c] if c >= 0 else None
+            s.ai_cover = covers[k] if k >= 0 else None
+            s.ai_patient = everyone[p] if p >= 0 else None
@@ -0,0 +1,297 @@
+"""Spatial indices: a hash grid over soldiers and a static grid over covers.
+
+SoldierGrid: World rebuilds the grid before separation (which then moves soldiers
+incrementally with move()) and again before bullet/grenade/crate resolution.
+Every "which soldiers are near here" query visits only the cells around the
+point instead of every soldier. Queries return candidates in soldier list
+order (red team first, then blue), so callers that take the first match get
+the same soldier a full scan would pick. Callers still do the exact distance
+test themselves.
+
+CoverIndex: covers never move after make_roguelike_covers, so their rects are
+baked into a grid once per map. Point queries look at one cell; segment
+queries walk the cells along the segment. Both return covers in list order
+and the final test is still pygame's own collidepoint/clipline, so answers
+match a scan over every cover.
+
+CoverField: the nearest cover (by rect centre, like the AI's old min() scan)
+as a per-map table. Every FIELD_CELL px cell keeps the covers that can be
+nearest to some point inside it: a cover is dropped only if another cover's
+farthest distance to the cell is shorter than its closest distance. The
+exact answer is then the nearest among a few candidates, with ties going to
+the first cover in list order.
+"""
+import math
+
+import numpy as np
+
+SOLDIER_CELL = 64
+# up to this many soldiers, row() returns every later soldier (cheaper than the cell lookups)
+PAIR_SCAN_MAX = 24
+COVER_CELL = 64
+FIELD_CELL = 32
+# covers are entered in every cell within this many px of their rect: pygame tests
+# truncated points and integer line endpoints, which can sit ~1.5 px off the real segment
+COVER_PAD = 2
+# cell coordinates are offset so slightly negative positions still hash to distinct keys
+_OFFSET = 1 << 12
+_STRIDE = 1 << 14
+
+
+def _key(cx, cy):
+    return (cx + _OFFSET) * _STRIDE + (cy + _OFFSET)
+
+
+class SoldierGrid:
+    def __init__(self, cell=SOLDIER_CELL):
+        self.cell = float(cell)
+        self.rebuild([])
+
+    def __len__(self):
+        return len(self.soldiers)
+
+    def rebuild(self, soldiers):
+        """Index soldiers at their current positions. Buckets and arrays are built lazily."""
+        self.soldiers = soldiers
+        self.max_radius = max([s.radius for s in soldiers], default=0.0)
+        self.cells = None
+        self._where = None
+        self.x = None
+        self.keys = None
+
+    def _buckets(self):
+        if self.cells is None:
+            cell = self.cell
+            cells = {}
+            where = []
+            for i, s in enumerate(self.soldiers):
+                key = (int(s.x // cell), int(s.y // cell))
+                where.append(key)
+                bucket = cells.get(key)
+                if bucket is None:
+                    cells[key] = [i]
+                else:
+                    bucket.append(i)
+            self.cells = cells
+            self._where = where
+        return self.cells
+
+    def arrays(self):
+        """(x, y, radius) float arrays in soldier list order, as of the last rebuild()."""
+        if self.x is None:
+            soldiers = self.soldiers
+            self.x = np.array([s.x for s in soldiers], dtype=np.float64)
+            self.y = np.array([s.y for s in soldiers], dtype=np.float64)
+            self.radius = np.array([s.radius for s in soldiers], dtype=np.float64)
+        return self.x, self.y, self.radius
+
+    def move(self, i):
+        """Re-bucket soldier i after it moved. Only the buckets follow; call rebuild()
+        before using arrays() or touch_pairs() again."""
+        if self.cells is None:
+            return
+        s = self.soldiers[i]
+        key = (int(s.x // self.cell), int(s.y // self.cell))
+        old = self._where[i]
+        if key != old:
+            self.cells[old].remove(i)
+            self.cells.setdefault(key, []).append(i)
+            self._where[i] = key
+
+    def _index(self):
+        if self.keys is None:
+            x, y, _ = self.arrays()
+            self.cx = np.floor_divide(x, self.cell).astype(np.int64)
+            self.cy = np.floor_divide(y, self.cell).astype(np.int64)
+            keys = _key(self.cx, self.cy)
+            # stable sort keeps list order inside a cell
+            self.order = np.argsort(keys, kind='stable')
+            self.keys = keys[self.order]
+
+    def _gather(self, qkeys):
+        """(query, soldier) index pairs for every soldier stored under each query key."""
+        self._index()
+        start = np.searchsorted(self.keys, qkeys, 'left')
+        counts = np.searchsorted(self.keys, qkeys, 'right') - start
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        q = np.repeat(np.arange(len(qkeys)), counts)
+        offs = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return q, self.order[np.repeat(start, counts) + offs]
+
+    def _around(self, cx, cy, reach):
+        """All (query, soldier) pairs for queries in cells cx/cy whose soldiers may be within reach."""
+        span = int(np.ceil(reach / self.cell)) if reach > 0 else 0
+        qs = []; ss = []
+        for ox in range(-span, span + 1):
+            for oy in range(-span, span + 1):
+                q, s = self._gather(_key(cx + ox, cy + oy))
+                if len(q):
+                    qs.append(q); ss.append(s)
+        if not qs:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        return np.concatenate(qs), np.concatenate(ss)
+
+    def candidates(self, x, y, r):
+        """Indices (ascending) of soldiers whose centre may lie within r of (x, y)."""
+        cell = self.cell
+        cells = self._buckets()
+        out = []
+        for cx in range(int((x - r) // cell), int((x + r) // cell) + 1):
+            for cy in range(int((y - r) // cell), int((y + r) // cell) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    out.extend(bucket)
+        if len(out) > 1:
+            out.sort()
+        return out
+
+    def near(self, x, y, r):
+        """Candidate soldiers around (x, y) in list order (superset of those within r)."""
+        soldiers = self.soldiers
+        return [soldiers[i] for i in self.candidates(x, y, r)]
+
+    def row(self, after, x, y, r):
+        """Ascending indices j > after of soldiers whose centre may lie within r of (x, y)."""
+        n = len(self.soldiers)
+        if n <= PAIR_SCAN_MAX:
+            return list(range(after + 1, n))
+        return [j for j in self.candidates(x, y, r) if j > after]
+
+    def touch_pairs(self, px, py, pad):
+        """Candidate (point, soldier) pairs for points px/py against circles of
+        soldier radius + pad, sorted by point then soldier index."""
+        if len(px) == 0 or not self.soldiers:
+            empty = np.empty(0, dtype=np.intp)
+            return empty, empty
+        cx = np.floor_divide(px, self.cell).astype(np.int64)
+        cy = np.floor_divide(py, self.cell).astype(np.int64)
+        p, s = self._around(cx, cy, self.max_radius + pad)
+        order = np.lexsort((s, p))
+        return p[order], s[order]
+
+
+class CoverIndex(list):
+    """The covers of a match (still a plain list of Cover) plus a static grid of their rects.
+
+    Build a new index if the cover list changes.
+    """
+
+    def __init__(self, covers=(), cell=COVER_CELL):
+        list.__init__(self, covers)
+        self.cell = cell
+        cells = {}
+        for i, c in enumerate(self):
+            r = c.rect
+            for cx in range((r.left - COVER_PAD) // cell, (r.right - 1 + COVER_PAD) // cell + 1):
+                for cy in range((r.top - COVER_PAD) // cell, (r.bottom - 1 + COVER_PAD) // cell + 1):
+                    cells.setdefault((cx, cy), []).append(i)
+        self.cells = cells
+
+    def point_cover(self, x, y, start=0):
+        """Index of the first cover (at or after start) whose rect contains (x, y), else None."""
+        # collidepoint truncates the point, so look up the cell of the truncated pixel
+        bucket = self.cells.get((int(x) // self.cell, int(y) // self.cell))
+        if bucket:
+            for i in bucket:
+                if i >= start and self[i].rect.collidepoint(x, y):
+                    return i
+        return None
+
+    def contains(self, x, y):
+        """True if (x, y) lies inside any cover."""
+        bucket = self.cells.get((int(x) // self.cell, int(y) // self.cell))
+        if bucket:
+            for i in bucket:
+                if self[i].rect.collidepoint(x, y):
+                    return True
+        return False
+
+    def segment_cells(self, x1, y1, x2, y2):
+        """Yield the grid cells crossed by the segment (x1, y1)-(x2, y2), in order from the start."""
+        cell = self.cell
+        cx, cy = int(x1 // cell), int(y1 // cell)
+        ex, ey = int(x2 // cell), int(y2 // cell)
+        dx = x2 - x1; dy = y2 - y1
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        t_x = ((cx + (step_x > 0)) * cell - x1) / dx if dx else math.inf
+        t_y = ((cy + (step_y > 0)) * cell - y1) / dy if dy else math.inf
+        dt_x = cell / abs(dx) if dx else math.inf
+        dt_y = cell / abs(dy) if dy else math.inf
+        yield (cx, cy)
+        for _ in range(abs(ex - cx) + abs(ey - cy)):
+            if abs(t_x - t_y) < 1e-9:
+                # passing (almost) exactly through a corner: take both side cells
+                yield (cx + step_x, cy)
+                yield (cx, cy + step_y)
+            if t_x < t_y:
+                cx += step_x; t_x += dt_x
+            else:
+                cy += step_y; t_y += dt_y
+            yield (cx, cy)
+
+
+class CoverField:
+    """Nearest-cover table for one cover layout. Holds arrays only (no Cover objects),
+    so it can be handed to worker processes."""
+
+    def __init__(self, covers=(), width=1280, height=720, cell=FIELD_CELL):
+        self.cell = float(cell)
+        self.nx = max(1, -(-int(width) // int(cell)))
+        self.ny = max(1, -(-int(height) // int(cell)))
+        if covers:
+            self.centers = np.array([(c.rect.centerx, c.rect.centery) for c in covers], dtype=np.float64)
+        else:
+            self.centers = np.empty((0, 2))
+        k = len(self.centers)
+        # cell boxes, row-major (cy * nx + cx)
+        cy, cx = np.divmod(np.arange(self.nx * self.ny), self.nx)
+        x0 = cx * self.cell; y0 = cy * self.cell
+        x1 = x0 + self.cell; y1 = y0 + self.cell
+        if k:
+            px = self.centers[:, 0][None, :]; py = self.centers[:, 1][None, :]
+            near = np.hypot(np.maximum(np.maximum(x0[:, None] - px, px - x1[:, None]), 0.0),
+                            np.maximum(np.maximum(y0[:, None] - py, py - y1[:, None]), 0.0))
+            far = np.hypot(np.maximum(np.abs(px - x0[:, None]), np.abs(px - x1[:, None])),
+                           np.maximum(np.abs(py - y0[:, None]), np.abs(py - y1[:, None])))
+            # small slack so rounding in hypot never drops the true nearest
+            keep = near <= far.min(axis=1)[:, None] + 1e-9
+            width_c = int(keep.sum(axis=1).max())
+            # candidates per cell in list order, padded with -1
+            order = np.argsort(~keep, axis=1, kind='stable')[:, :width_c]
+            self.candidates = np.where(np.take_along_axis(keep, order, axis=1), order, -1)
+        else:
+            self.candidates = np.full((self.nx * self.ny, 0), -1, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.centers)
+
+    def nearest_many(self, x, y):
+        """Index of the nearest cover centre for each point of the arrays x, y (-1 if no covers)."""
+        x = np.asarray(x, dtype=np.float64); y = np.asarray(y, dtype=np.float64)
+        m = len(x)
+        if not len(self.centers):
+            return np.full(m, -1, dtype=np.intp)
+        cx = np.floor_divide(x, self.cell).astype(np.intp)
+        cy = np.floor_divide(y, self.cell).astype(np.intp)
+        inside = (cx >= 0) & (cx < self.nx) & (cy >= 0) & (cy < self.ny)
+        cand = self.candidates[np.where(inside, cy * self.nx + cx, 0)]
+        safe = np.maximum(cand, 0)
+        d = np.hypot(self.centers[safe, 0] - x[:, None], self.centers[safe, 1] - y[:, None])
+        d[cand < 0] = np.inf
+        out = cand[np.arange(m), d.argmin(axis=1)]
+        if not inside.all():
+            # off the grid: scan every cover
+            o = np.flatnonzero(~inside)
+            d = np.hypot(self.centers[None, :, 0] - x[o, None], self.centers[None, :, 1] - y[o, None])
+            out[o] = d.argmin(axis=1)
+        return out
+
+    def nearest(self, x, y):
+        """Index of the cover whose centre is nearest to (x, y), or None."""
+        i = int(self.nearest_many([x], [y])[0])
+        return i if i >= 0 else None
@@ -0,0 +1,117 @@
+"""Pre-scaled / pre-rotated sprite cache.
+
+Scaling and rotating a Surface every frame is expensive. SpriteCache keeps the
+transformed copies, keyed by source image, scale quantized to SCALE_STEP and
+angle quantized to ROTATION_STEPS, so drawing a transformed sprite is a dict
+lookup plus one blit. sized() caches exact pixel sizes (optionally mirrored)
+the same way; soldiers prepare their body and weapon variants when they get
+their images. Entries are evicted least recently used once the cached
+pixels exceed the memory budget.
+"""
+from collections import OrderedDict
+
+import pygame
+
+ROTATION_STEPS = 64
+SCALE_STEP = 0.05
+MEMORY_BUDGET = 32 * 1024 * 1024  # bytes of cached pixels
+
+
+class SpriteCache:
+    def __init__(self, budget=MEMORY_BUDGET, rotation_steps=ROTATION_STEPS, scale_step=SCALE_STEP):
+        self.budget = budget
+        self.rotation_steps = rotation_steps
+        self.scale_step = scale_step
+        self._entries = OrderedDict()  # key -> (surface, bytes)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def key(self, img, scale=1.0, angle=0.0, flip=False):
+        qs = max(1, int(round(scale / self.scale_step)))
+        qa = int(round(angle * self.rotation_steps / 360.0)) % self.rotation_steps
+        return (id(img), qs, qa, bool(flip))
+
+    def get(self, img, scale=1.0, angle=0.0, flip=False, min_size=1):
+        """img scaled, rotated by angle degrees (counter-clockwise, like
+        pygame.transform.rotate) and optionally mirrored horizontally."""
+        k = self.key(img, scale, angle, flip) + (min_size,)
+        entry = self._entries.get(k)
+        if entry is not None and entry[2] is img:
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        srf = self._render(img, k[1] * self.scale_step, k[2] * 360.0 / self.rotation_steps, flip, min_size)
+        self._store(k, srf, img)
+        return srf
+
+    def sized(self, img, w, h, flip=False):
+        """img smoothscaled to exactly (w, h) pixels and optionally mirrored horizontally."""
+        k = ('sized', id(img), int(w), int(h), bool(flip))
+        entry = self._entries.get(k)
+        if entry is not None and entry[2] is img:
+            self._entries.move_to_end(k)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        try:
+            srf = pygame.transform.smoothscale(img, (int(w), int(h)))
+        except Exception:
+            # smoothscale needs 24/32-bit surfaces
+            srf = pygame.transform.scale(img, (int(w), int(h)))
+        if flip:
+            srf = pygame.transform.flip(srf, True, False)
+        self._store(k, srf, img)
+        return srf
+
+    def _render(self, img, scale, angle, flip, min_size):
+        srf = img
+        if scale != 1.0:
+            w, h = img.get_size()
+            try:
+                srf = pygame.transform.smoothscale(img, (max(min_size, int(w * scale)), max(min_size, int(h * scale))))
+            except Exception:
+                srf = img
+        if flip:
+            srf = pygame.transform.flip(srf, True, False)
+        if angle:
+            srf = pygame.transform.rotate(srf, angle)
+        return srf
+
+    def _store(self, k, srf, img):
+        size = srf.get_width() * srf.get_height() * srf.get_bytesize()
+        old = self._entries.pop(k, None)
+        if old is not None:
+            self.bytes -= old[1]
+        # the source image is kept in the entry so a recycled id() can never alias it
+        self._entries[k] = (srf, size, img)
+        self.bytes += size
+        while self.bytes > self.budget and len(self._entries) > 1:
+            _, (_, b, _) = self._entries.popitem(last=False)
+            self.bytes -= b
+
+    def prewarm(self, images, scales=(1.0,), min_size=1):
+        """Render every image at every given scale and all rotation steps up front."""
+        step = 360.0 / self.rotation_steps
+        for img in images:
+            for scale in scales:
+                for r in range(self.rotation_steps):
+                    self.get(img, scale, r * step, min_size=min_size)
+
+
+def scale_range(lo, hi, step=SCALE_STEP):
+    """Quantized scales covering [lo, hi]."""
+    n = int(round((hi - lo) / step))
+    return [lo + i * step for i in range(n + 1)]
+
+
+# shared by the renderer (main.draw_world)
+sprite_cache = SpriteCache()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# the game modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulation import init_headless
+
+init_headless()
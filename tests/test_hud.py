@@ -0,0 +1,27 @@
+import pygame
+
+from main import draw_world
+from simulation import World
+
+
+class CountingFont:
+    """Stands in for a pygame Font and remembers every string it renders."""
+
+    def __init__(self):
+        self.texts = []
+
+    def render(self, text, antialias, color):
+        self.texts.append(text)
+        return pygame.Surface((max(1, len(text)), 10))
+
+
+def test_battle_frame_draws_the_hud():
+    world = World(seed=2, verbose=False)
+    world.battle_size = 20
+    world.start('battle')
+    world.step()
+    screen = pygame.Surface((world.width, world.height))
+    fonts = {name: CountingFont() for name in ('_default_font', '_small_font', '_ammo_font', '_title_font')}
+    draw_world(screen, world, fonts)
+    assert any(t.startswith('Round:') for t in fonts['_default_font'].texts)
+    assert any(t.startswith('Battle 20v20') for t in fonts['_small_font'].texts)
@@ -0,0 +1,38 @@
+from particles import ParticlePool
+
+
+def test_expired_particles_free_their_slots():
+    pool = ParticlePool(capacity=100)
+    for i in range(90):
+        pool.emit(i, 0, 1.0, 0.0, 2, (255, 0, 0))
+    for i in range(10):
+        pool.emit(i, 50, 0.0, 1.0, 100, (0, 0, 255))
+    assert pool.used == 100
+    for _ in range(3):
+        pool.update()
+    # only the long-lived particles are left, packed to the front in emission order
+    assert pool.used == len(pool) == 10
+    assert pool.x[:10].tolist() == list(range(10))
+    assert (pool.y[:10] > 50).all()
+    for _ in range(100):
+        pool.update()
+    assert pool.used == 0 and not pool
+
+
+def test_full_pool_overwrites_the_oldest():
+    pool = ParticlePool(capacity=4)
+    for i in range(6):
+        pool.emit(i, 0, 0.0, 0.0, 10, (255, 255, 255))
+    assert pool.used == 4
+    assert sorted(pool.x[:4].tolist()) == [2, 3, 4, 5]
+
+
+def test_full_pool_reuses_dead_slots_before_live_ones():
+    pool = ParticlePool(capacity=10)
+    for i in range(10):
+        pool.emit(i, 0, 0.0, 0.0, 1 if i == 6 else 10, (255, 255, 255))
+    pool.update()
+    assert pool.used == 10 and len(pool) == 9
+    pool.emit(99, 0, 0.0, 0.0, 10, (255, 255, 255))
+    assert len(pool) == 10
+    assert pool.x[6] == 99 and pool.x[0] == 0
@@ -0,0 +1,89 @@
+import math
+
+import numpy as np
+
+from game_core import Cover, Soldier
+from projectiles import BULLET_SPEED, BulletPool, segment_circle_t
+from simulation import BLUE, RED, World
+
+# one step moves a bullet this far, much more than the thin cover or the soldier it must not skip
+STEP_SCALE = 40.0
+
+
+def _sandbox():
+    world = World(seed=1, verbose=False)
+    world.start('sandbox')
+    world.covers = []
+    return world
+
+
+def test_sweep_finds_a_thin_cover_between_two_positions():
+    pool = BulletPool()
+    pool.spawn(0, 100, 1000, 100, RED)
+    pool.store_previous()
+    pool.update(STEP_SCALE)
+    assert pool.x[0] > 160  # the bullet ends the step beyond the cover
+    t = pool.sweep_rects(np.array([[150.0, 80.0, 152.0, 120.0]]))
+    assert math.isclose(t[0], 150.0 / (BULLET_SPEED * STEP_SCALE))
+
+
+def test_segment_circle_t_finds_a_circle_the_step_jumps_over():
+    t = segment_circle_t(0.0, 0.0, 300.0, 0.0, 150.0, 0.0, 10.0)
+    assert math.isclose(t, 140.0 / 300.0)
+    assert segment_circle_t(0.0, 0.0, 300.0, 0.0, 150.0, 40.0, 10.0) == np.inf
+
+
+def test_fast_bullet_stops_at_a_thin_cover():
+    world = _sandbox()
+    world.covers = [Cover(600, 300, 4, 120)]
+    world.bullets.spawn(500, 360, 1200, 360, RED)
+    world.step(STEP_SCALE)
+    assert len(world.bullets) == 0
+    # impact particles sit on the near face of the cover, not past it
+    xs = world.particles.x[world.particles.alive()]
+    assert len(xs) and (xs < 620).all()
+
+
+def test_fast_bullet_hits_a_soldier_it_would_step_over():
+    world = _sandbox()
+    target = Soldier(640, 360, BLUE, rng=world.rng)
+    target.controlled = True  # keep the AI from moving it
+    world.blue_team = [target]
+    hp = target.hp
+    world.bullets.spawn(500, 360, 1200, 360, RED, damage=10)
+    world.step(STEP_SCALE)
+    assert len(world.bullets) == 0
+    assert target.hp == hp - 10
+
+
+def test_list_sweep_matches_array_sweep():
+    world = World(seed=3, verbose=False)
+    world.start('simulation')
+    for _ in range(300):
+        world.step()
+    rng = np.random.default_rng(0)
+    pool = world.bullets
+    pool.clear()
+    soldiers = world.red_team + world.blue_team
+    for k in range(60):
+        s = soldiers[k % len(soldiers)]
+        # from near each soldier, some of them leaving the screen within the step
+        x, y = s.x + rng.uniform(-80, 80), s.y + rng.uniform(-80, 80)
+        pool.spawn(x, y, x + rng.uniform(-1, 1), y + rng.uniform(-1, 1), RED if k % 2 else BLUE, owner=s)
+    pool.store_previous()
+    pool.update(STEP_SCALE)
+    world.grid.rebuild(soldiers)
+    hits, gone = world._sweep_bullets_list(soldiers)
+    assert hits and any(si >= 0 for _, _, _, si in hits) and gone
+    assert (hits, gone) == world._sweep_bullets_arrays(soldiers)
+
+
+def test_small_pool_threats_match_the_array_scan():
+    pool = BulletPool()
+    for k in range(12):
+        pool.spawn(40 * k, 100 + 5 * k, 200, 150, RED)
+    for x, y in ((100, 110), (200, 150), (420, 160)):
+        listed = pool.threats(x, y, 60)
+        near = [i for i in range(pool.n) if (x - pool.x[i]) ** 2 + (y - pool.y[i]) ** 2 < 3600
+                and (x - pool.x[i]) * pool.vx[i] + (y - pool.y[i]) * pool.vy[i] > 0]
+        assert listed == near
@@ -0,0 +1,37 @@
+import pygame
+
+from replay import Replay, ReplayRecorder
+from simulation import World
+
+
+def _world(images, seed=5):
+    world = World(seed=seed, verbose=False)
+    if images:
+        img = pygame.Surface((8, 8))
+        world.explosion_frames = [img] * 4
+        world.generic_images = [img] * 3
+    world.start('simulation')
+    return world
+
+
+def test_explosion_images_do_not_change_the_match():
+    with_images, without = _world(True), _world(False)
+    for _ in range(4000):
+        with_images.step()
+        without.step()
+    assert with_images.state_digest() == without.state_digest()
+    assert with_images.rounds == without.rounds
+
+
+def test_replay_recorded_with_images_verifies_without_them():
+    world = _world(True, seed=7)
+    rec = ReplayRecorder(world)
+    for _ in range(2000):
+        world.step()
+        rec.record(None)
+    rep = Replay(rec.to_bytes(world))
+    played = rep.make_world()
+    for controls in rep.inputs():
+        played.step(60.0 / rep.logic_hz, controls)
+    assert played.tick == rep.ticks
+    assert played.state_digest() == rep.digest
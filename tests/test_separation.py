@@ -0,0 +1,75 @@
+import math
+import random
+
+import simulation
+from game_core import Soldier
+from simulation import BLUE, RED, World
+
+
+def _full_scan(world):
+    # the original O(n^2) separation/melee pass every later version has to reproduce at 5v5
+    soldiers = world.red_team + world.blue_team
+    for i in range(len(soldiers)):
+        for j in range(i + 1, len(soldiers)):
+            a = soldiers[i]; b = soldiers[j]
+            dx = b.x - a.x; dy = b.y - a.y
+            dist = math.hypot(dx, dy) or 0.001
+            min_dist = a.radius + b.radius
+            if dist < min_dist:
+                world._separate_pair(a, b, dx, dy, dist, min_dist)
+    world.grid.rebuild(soldiers)
+
+
+def _match(seed, separate=None):
+    world = World(seed=seed, verbose=False)
+    if separate is not None:
+        world._resolve_soldier_overlap = lambda: separate(world)
+    world.start('simulation')
+    for _ in range(2000):
+        world.step()
+    return world.state_digest(), world.rounds
+
+
+def test_small_match_matches_the_full_scan():
+    for seed in (1, 4):
+        assert _match(seed) == _match(seed, _full_scan)
+
+
+def _crowd(batch, n=simulation.BATCH_SEPARATION_MIN + 6, side=400, seed=0):
+    rng = random.Random(seed)
+    world = World(seed=1, verbose=False)
+    world.start('sandbox')
+    soldiers = [Soldier(rng.uniform(400, 400 + side), rng.uniform(150, 150 + side), RED if k % 2 else BLUE, rng=world.rng)
+                for k in range(n)]
+    start = [(s.x, s.y) for s in soldiers]
+    world.red_team = [s for s in soldiers if s.color == RED]
+    world.blue_team = [s for s in soldiers if s.color == BLUE]
+    saved = simulation.BATCH_SEPARATION_MIN
+    simulation.BATCH_SEPARATION_MIN = saved if batch else n + 1
+    try:
+        world._resolve_soldier_overlap()
+    finally:
+        simulation.BATCH_SEPARATION_MIN = saved
+    return start, soldiers
+
+
+def _overlap(points, radius):
+    return sum(max(0.0, 2 * radius - math.hypot(ax - bx, ay - by))
+               for i, (ax, ay) in enumerate(points) for bx, by in points[i + 1:])
+
+
+def test_batch_solver_tracks_the_sequential_pass_in_a_crowd():
+    start, seq = _crowd(batch=False)
+    _, bat = _crowd(batch=True)
+    radius = seq[0].radius
+    # same soldiers end up close to the same places ...
+    mean_gap = sum(math.hypot(a.x - b.x, a.y - b.y) for a, b in zip(seq, bat)) / len(seq)
+    assert mean_gap < radius / 2
+    # ... both passes remove most of the overlap ...
+    before = _overlap(start, radius)
+    assert _overlap([(s.x, s.y) for s in seq], radius) < before / 2
+    assert _overlap([(s.x, s.y) for s in bat], radius) < before / 2
+    # ... and melee deals about the same damage
+    dmg_seq = sum(s.max_hp - s.hp for s in seq)
+    dmg_bat = sum(s.max_hp - s.hp for s in bat)
+    assert dmg_seq > 0 and abs(dmg_seq - dmg_bat) <= 0.15 * dmg_seq
@@ -0,0 +1,29 @@
+from simulation import World
+from snapshot import WorldSnapshot
+
+
+def _choices(soldiers):
+    return [(s.ai_target, s.ai_crate, s.ai_cover, s.ai_patient) for s in soldiers]
+
+
+def test_decide_apply_matches_think():
+    world = World(seed=3, verbose=False)
+    world.battle_size = 60
+    world.start('battle')
+    covers = world.cover_index()
+    checked = 0
+    for tick in range(240):
+        world.step()
+        if tick % 40:
+            continue
+        soldiers = world.soldiers
+        snap = WorldSnapshot(world.red_team, world.blue_team, world.crates, covers, world.cover_field())
+        snap.apply(soldiers, snap.decide(soldiers))
+        decided = _choices(soldiers)
+        for team, enemies in ((world.red_team, world.blue_team), (world.blue_team, world.red_team)):
+            for s in team:
+                s.think(enemies, world.crates, covers, team)
+        assert _choices(soldiers) == decided
+        checked += sum(1 for s in soldiers if s.ai_patient is not None)
+    # medics found patients, so the patient column was compared too
+    assert checked
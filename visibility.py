@@ -0,0 +1,196 @@
+"""Precomputed cell-to-cell visibility for a static cover layout.
+
+The map is split into VIS_CELL px cells and every cell gets a bitset of the
+cells it may see. A bit is cleared only when a single cover provably cuts
+every segment between the two cell boxes, so "not visible" is a safe O(1)
+reject before the exact ray test in los.py, and "visible" just means "ask the
+ray test". Results are identical with or without the table.
+
+A cover blocks all segments between boxes A and B if A and B lie on
+opposite sides of a vertical line x = xc through the cover and every
+segment crosses that line within the cover's y-range (same for horizontal
+lines). The crossing range is exact: with t = (xc - xa) / (xb - xa) its
+extremes sit at the box corners.
+
+Tables are cached on disk (npz) keyed by a hash of the map geometry, which
+is a function of the map seed.
+"""
+import hashlib
+import os
+import time
+
+import numpy as np
+
+VIS_CELL = 48
+
+
+def map_key(width, height, covers, cell=VIS_CELL):
+    """Hex digest identifying a cover layout (and grid) for the disk cache."""
+    rects = [tuple(c.rect) for c in covers]
+    return hashlib.sha1(repr((int(width), int(height), int(cell), rects)).encode()).hexdigest()[:16]
+
+
+def _crossing_blocked(a_lo, a_hi, b_lo, b_hi, a_top, a_bot, b_top, b_bot, c_lo, c_hi, c_top, c_bot):
+    """Mask over the (A, B) pairs given as flat arrays: True where A and B are separated along
+    one axis by a line through the cover [c_lo, c_hi] and every segment between them crosses
+    that line inside [c_top, c_bot].
+
+    a_lo/a_hi: extent of A along the separating axis, b_lo/b_hi: same for B;
+    a_top/a_bot, b_top/b_bot: extent along the other axis.
+    """
+    lo = np.maximum(c_lo, a_hi)
+    hi = np.minimum(c_hi, b_lo)
+    blocked = np.zeros(len(lo), dtype=bool)
+    for xc in (lo, hi):
+        # t over the four corner combinations of (xa, xb); a_hi < b_lo so no division by zero
+        t1 = (xc - a_lo) / (b_lo - a_lo)
+        t2 = (xc - a_lo) / (b_hi - a_lo)
+        t3 = (xc - a_hi) / (b_lo - a_hi)
+        t4 = (xc - a_hi) / (b_hi - a_hi)
+        tmin = np.minimum(np.minimum(t1, t2), np.minimum(t3, t4))
+        tmax = np.maximum(np.maximum(t1, t2), np.maximum(t3, t4))
+        ymin = np.minimum(a_top * (1 - tmin) + b_top * tmin, a_top * (1 - tmax) + b_top * tmax)
+        ymax = np.maximum(a_bot * (1 - tmin) + b_bot * tmin, a_bot * (1 - tmax) + b_bot * tmax)
+        blocked |= (ymin >= c_top) & (ymax <= c_bot)
+    return blocked
+
+
+def _separated_pairs(lo, hi, c_lo, c_hi):
+    """(A, B) cell index pairs with A before B along an axis and room for a line
+    x = xc in [c_lo, c_hi] with A's end <= xc <= B's start."""
+    ia = np.nonzero(hi <= c_hi)[0]
+    ib = np.nonzero(lo >= c_lo)[0]
+    if not len(ia) or not len(ib):
+        return ia, ib
+    a = np.repeat(ia, len(ib)); b = np.tile(ib, len(ia))
+    keep = (hi[a] < lo[b]) & (np.maximum(c_lo, hi[a]) <= np.minimum(c_hi, lo[b]))
+    return a[keep], b[keep]
+
+
+def _centre_crosses(a, b, lo, hi, mid, mid_other, c_lo, c_hi, c_top, c_bot):
+    """Cheap necessary condition for _crossing_blocked: the segment between the cell
+    centres crosses the line at either end of [max(c_lo, A end), min(c_hi, B start)]
+    inside [c_top, c_bot]."""
+    ma = mid[a]; mb = mid[b]; oa = mid_other[a]; ob = mid_other[b]
+    span = mb - ma
+    keep = np.zeros(len(a), dtype=bool)
+    for xc in (np.maximum(c_lo, hi[a]), np.minimum(c_hi, lo[b])):
+        y = oa + (xc - ma) / span * (ob - oa)
+        keep |= (y >= c_top) & (y <= c_bot)
+    return keep
+
+
+class VisibilityTable:
+    """Cell-to-cell visibility of one map; rows[a] bit b is set if cell b may be visible from cell a."""
+
+    def __init__(self, width, height, cell=VIS_CELL):
+        self.width = int(width)
+        self.height = int(height)
+        self.cell = int(cell)
+        self.nx = -(-self.width // self.cell)
+        self.ny = -(-self.height // self.cell)
+        n = self.nx * self.ny
+        self.blocked = np.zeros((n, n), dtype=bool)
+        self.rows = []
+        self.build_ms = 0.0
+        self.from_cache = False
+
+    def __len__(self):
+        return self.nx * self.ny
+
+    def _cell_boxes(self):
+        i = np.arange(self.nx * self.ny)
+        cx = i // self.ny; cy = i % self.ny
+        left = cx * float(self.cell); top = cy * float(self.cell)
+        return left, top, left + self.cell, top + self.cell
+
+    def build(self, covers):
+        t0 = time.perf_counter()
+        left, top, right, bottom = self._cell_boxes()
+        n = len(left)
+        mx = (left + right) * 0.5; my = (top + bottom) * 0.5
+        blocked = np.zeros((n, n), dtype=bool)
+        for c in covers:
+            r = c.rect
+            # vertical separating line (A left of B), then horizontal (A above B)
+            a, b = _separated_pairs(left, right, r.left, r.right)
+            keep = _centre_crosses(a, b, left, right, mx, my, r.left, r.right, r.top, r.bottom)
+            a = a[keep]; b = b[keep]
+            if len(a):
+                hit = _crossing_blocked(left[a], right[a], left[b], right[b], top[a], bottom[a],
+                                        top[b], bottom[b], r.left, r.right, r.top, r.bottom)
+                blocked[a[hit], b[hit]] = True
+            a, b = _separated_pairs(top, bottom, r.top, r.bottom)
+            keep = _centre_crosses(a, b, top, bottom, my, mx, r.top, r.bottom, r.left, r.right)
+            a = a[keep]; b = b[keep]
+            if len(a):
+                hit = _crossing_blocked(top[a], bottom[a], top[b], bottom[b], left[a], right[a],
+                                        left[b], right[b], r.top, r.bottom, r.left, r.right)
+                blocked[a[hit], b[hit]] = True
+        self.blocked = blocked | blocked.T
+        self._make_rows()
+        self.build_ms = (time.perf_counter() - t0) * 1000.0
+        return self
+
+    def _make_rows(self):
+        # one int bitset per cell: bit j set == cell j may be visible
+        visible = np.packbits(~self.blocked, axis=1, bitorder='little')
+        self.rows = [int.from_bytes(row.tobytes(), 'little') for row in visible]
+
+    def cell_of(self, x, y):
+        cx = int(x // self.cell); cy = int(y // self.cell)
+        if 0 <= cx < self.nx and 0 <= cy < self.ny:
+            return cx * self.ny + cy
+        return -1
+
+    def maybe_visible(self, x1, y1, x2, y2):
+        """False only if no line between the two points can be clear."""
+        a = self.cell_of(x1, y1)
+        b = self.cell_of(x2, y2)
+        if a < 0 or b < 0:
+            return True
+        return bool((self.rows[a] >> b) & 1)
+
+    def blocked_fraction(self):
+        n = len(self)
+        return float(self.blocked.sum()) / (n * n) if n else 0.0
+
+    def save(self, path):
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        np.savez_compressed(path, blocked=np.packbits(self.blocked), shape=np.array(self.blocked.shape),
+                            grid=np.array([self.width, self.height, self.cell]))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        w, h, cell = (int(v) for v in data['grid'])
+        table = cls(w, h, cell)
+        shape = tuple(int(v) for v in data['shape'])
+        table.blocked = np.unpackbits(data['blocked'], count=shape[0] * shape[1]).reshape(shape).astype(bool)
+        table._make_rows()
+        table.from_cache = True
+        return table
+
+    @classmethod
+    def for_map(cls, width, height, covers, cache_dir=None, cell=VIS_CELL):
+        """Load the table for this cover layout from cache_dir, or build (and store) it."""
+        path = None
+        if cache_dir:
+            path = os.path.join(cache_dir, f'vis_{map_key(width, height, covers, cell)}.npz')
+            if os.path.exists(path):
+                try:
+                    t0 = time.perf_counter()
+                    table = cls.load(path)
+                    table.build_ms = (time.perf_counter() - t0) * 1000.0
+                    return table
+                except Exception:
+                    pass
+        table = cls(width, height, cell).build(covers)
+        if path:
+            try:
+                table.save(path)
+            except Exception:
+                pass
+        return table